@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for AI response JSON extraction.
+
+Compares extract_json_object against the previous json.loads + regex
+fallback on typical model outputs.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_json_extract.py
+"""
+
+import json
+import re
+import timeit
+
+from ai_navigator.json_extract import extract_json_object
+
+SAMPLES = {
+    "bare": '{"start": "北京", "end": "上海"}',
+    "prose": 'Here is the result: {"start": "广州", "end": "深圳"} Let me know if you need more.',
+    "fenced_nested": (
+        '```json\n{"tool_name": "maps_geo", "arguments": {"address": "北京市朝阳区", "city": "北京"}, '
+        '"reasoning": "Use the geocoding tool for an address lookup"}\n```'
+    ),
+    "long_trailing": '{"mode": "car", "policy": 1, "callnative": 1, "description": "fastest"}' + " explanation" * 200,
+}
+
+
+def legacy_parse(text: str) -> dict:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        match = re.search(r'\{[^}]+\}', text)
+        if match:
+            return json.loads(match.group())
+        raise ValueError("Failed to parse AI response")
+
+
+def bench(func, text: str, number: int = 20000) -> str:
+    try:
+        func(text)
+    except (ValueError, json.JSONDecodeError):
+        return "fails"
+    seconds = timeit.timeit(lambda: func(text), number=number)
+    return f"{seconds / number * 1e6:8.2f} us"
+
+
+def main():
+    print(f"{'sample':<16}{'extract_json_object':>22}{'legacy regex':>16}")
+    for name, text in SAMPLES.items():
+        print(f"{name:<16}{bench(extract_json_object, text):>22}{bench(legacy_parse, text):>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,18 +4,117 @@ AI Provider Abstraction Layer
 Supports multiple AI providers: Anthropic Claude and OpenAI-compatible APIs
 """
 
+import asyncio
 import os
 import json
+import logging
 from abc import ABC, abstractmethod
 from typing import Dict, Any, List, Optional
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
 import httpx
+from ai_navigator.response_cache import ResponseCache, make_cache_key, create_response_cache
+from ai_navigator.json_extract import JSONObjectScanner, extract_json_object
+from ai_navigator.circuit_breaker import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+# Limits applied to raw MCP tool results before they are embedded in a prompt
+MCP_RESPONSE_MAX_RESULTS = 5
+MCP_RESPONSE_MAX_CHARS = 4000
+
+# Fields worth keeping from geocoding / POI payloads; everything else is dropped
+MCP_CANDIDATE_FIELDS = (
+    "name", "address", "formatted_address", "location", "longitude", "latitude",
+    "adcode", "province", "city", "district"
+)
+MCP_META_FIELDS = ("status", "count", "isError")
+
+
+def _compact_value(value: Any, max_results: int) -> Any:
+    """Recursively keep candidate fields and the top-N items of every list."""
+    if isinstance(value, str):
+        stripped = value.strip()
+        if stripped[:1] in ("{", "["):
+            try:
+                return _compact_value(json.loads(stripped), max_results)
+            except json.JSONDecodeError:
+                pass
+        return value
+    
+    if isinstance(value, list):
+        items = []
+        for item in value[:max_results]:
+            compacted = _compact_value(item, max_results)
+            if compacted not in (None, {}, []):
+                items.append(compacted)
+        return items
+    
+    if isinstance(value, dict):
+        compacted = {}
+        for key, item in value.items():
+            if key in MCP_CANDIDATE_FIELDS or key in MCP_META_FIELDS:
+                if item not in (None, "", [], {}):
+                    compacted[key] = item
+            elif key == "text" and isinstance(item, str):
+                parsed = _compact_value(item, max_results)
+                compacted[key] = parsed if not isinstance(parsed, str) else parsed[:MCP_RESPONSE_MAX_CHARS]
+            elif isinstance(item, (dict, list)):
+                nested = _compact_value(item, max_results)
+                if nested not in (None, {}, []):
+                    compacted[key] = nested
+        return compacted
+    
+    return value
+
+
+def compact_mcp_response(
+    raw_response: Any,
+    max_results: int = MCP_RESPONSE_MAX_RESULTS,
+    max_chars: int = MCP_RESPONSE_MAX_CHARS
+) -> str:
+    """
+    Shrink a raw MCP tool result before it is embedded in a parsing prompt.
+    
+    JSON text content is decoded, only candidate fields (location, name,
+    address, adcode, ...) are kept, lists are cut to the top-N results and the
+    serialized payload is capped at ``max_chars``.
+    
+    Args:
+        raw_response: The raw response from an MCP tool
+        max_results: Maximum number of items kept from each result list
+        max_chars: Maximum length of the returned string
+    
+    Returns:
+        Compact JSON string suitable for inclusion in a prompt
+    """
+    compacted = _compact_value(raw_response, max_results)
+    if compacted in (None, {}, []):
+        compacted = raw_response
+    
+    text = json.dumps(compacted, ensure_ascii=False, separators=(",", ":"), default=str)
+    
+    # Drop trailing results until the payload fits, keeping at least one
+    while len(text) > max_chars and max_results > 1:
+        max_results //= 2
+        compacted = _compact_value(raw_response, max_results) or compacted
+        text = json.dumps(compacted, ensure_ascii=False, separators=(",", ":"), default=str)
+    
+    if len(text) > max_chars:
+        text = text[:max_chars] + "...(truncated)"
+    
+    return text
 
 
 class AIProvider(ABC):
-    def __init__(self):
+    provider_name: str = "unknown"
+    model: str = ""
+    
+    def __init__(self, response_cache: Optional[ResponseCache] = None, streaming: bool = False):
         self.context_history: List[Dict[str, str]] = []
         self.context_summary: str = ""
+        self.response_cache = response_cache
+        self.bypass_cache = False
+        self.streaming = streaming
     
     def set_context(self, context_history: List[Dict[str, str]], context_summary: str = ""):
         """
@@ -32,68 +131,46 @@ class AIProvider(ABC):
         """Clear conversation context."""
         self.context_history = []
         self.context_summary = ""
-    @abstractmethod
-    async def parse_navigation_request(self, user_input: str) -> dict:
-        """Parse user's navigation request and extract locations."""
-        pass
+    
+    def _parse_json_response(self, response_text: str) -> dict:
+        """Extract the JSON object from a completion (handles nesting, code fences and prose)."""
+        return extract_json_object(response_text)
     
     @abstractmethod
-    async def select_mcp_tool(
-        self,
-        user_intent: str,
-        available_tools: List[Dict[str, Any]],
-        context: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, Any]:
+    async def _complete(self, messages: List[Dict[str, str]], max_tokens: int) -> str:
         """
-        Intelligently select the most appropriate MCP tool based on user intent.
-        
-        Args:
-            user_intent: Description of what the user wants to accomplish
-            available_tools: List of available MCP tools with their descriptions and parameters
-            context: Optional additional context (e.g., user preferences, location, etc.)
+        Send messages to the backend and return the raw completion text.
         
-        Returns:
-            {
-                "tool_name": str,  # Name of the selected tool
-                "arguments": dict,  # Arguments to pass to the tool
-                "reasoning": str   # Explanation of why this tool was chosen
-            }
+        When ``streaming`` is enabled, implementations stop reading the stream
+        as soon as the first top-level JSON object has closed and return just
+        that object.
         """
         pass
     
-    @abstractmethod
-    async def parse_mcp_response(
-        self,
-        raw_response: Dict[str, Any],
-        expected_info: str,
-        context: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, Any]:
+    async def _request_json(self, method: str, messages: List[Dict[str, str]], max_tokens: int) -> dict:
         """
-        Parse and extract information from MCP tool response using AI understanding.
-        
-        Args:
-            raw_response: The raw response from an MCP tool
-            expected_info: Description of what information to extract
-            context: Optional context about what the information will be used for
+        Run a completion and parse its JSON result, consulting the response cache.
         
-        Returns:
-            Extracted and structured information as a dictionary
+        Only successfully parsed results are cached. Set ``bypass_cache`` to
+        force a fresh request; the fresh result still refreshes the cache.
         """
-        pass
-    
-    @abstractmethod
-    async def generate_navigation_url(self, start_coords: dict, end_coords: dict, user_preference: str = None) -> dict:
-        """Generate navigation URL parameters based on coordinates and user preferences."""
-        pass
-
-
-class ClaudeProvider(AIProvider):
-    def __init__(self, api_key: str):
-        super().__init__()
-        self.client = Anthropic(api_key=api_key)
-        self.model = "claude-3-5-sonnet-20241022"
+        cache_key = None
+        if self.response_cache is not None:
+            cache_key = make_cache_key(self.provider_name, self.model, method, messages)
+            if not self.bypass_cache:
+                cached = self.response_cache.get(cache_key)
+                if cached is not None:
+                    return cached
+        
+        response_text = await self._complete(messages, max_tokens)
+        result = self._parse_json_response(response_text)
+        
+        if cache_key is not None:
+            self.response_cache.set(cache_key, result)
+        return result
     
     async def parse_navigation_request(self, user_input: str) -> dict:
+        """Parse user's navigation request and extract locations."""
         context_str = f"\n\nContext:\n{self.context_summary}" if self.context_summary else ""
         
         prompt = f"""Parse this navigation request and extract the start location (A) and end location (B).
@@ -110,15 +187,8 @@ Only return the JSON, no other text."""
         if self.context_history:
             messages.extend(self.context_history[-3:])
         messages.append({"role": "user", "content": prompt})
-
-        message = self.client.messages.create(
-            model=self.model,
-            max_tokens=200,
-            messages=messages
-        )
         
-        response_text = message.content[0].text.strip()
-        return self._parse_json_response(response_text)
+        return await self._request_json("parse_navigation_request", messages, max_tokens=200)
     
     async def select_mcp_tool(
         self,
@@ -126,6 +196,21 @@ Only return the JSON, no other text."""
         available_tools: List[Dict[str, Any]],
         context: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
+        """
+        Intelligently select the most appropriate MCP tool based on user intent.
+        
+        Args:
+            user_intent: Description of what the user wants to accomplish
+            available_tools: List of available MCP tools with their descriptions and parameters
+            context: Optional additional context (e.g., user preferences, location, etc.)
+        
+        Returns:
+            {
+                "tool_name": str,  # Name of the selected tool
+                "arguments": dict,  # Arguments to pass to the tool
+                "reasoning": str   # Explanation of why this tool was chosen
+            }
+        """
         tools_description = json.dumps(available_tools, indent=2, ensure_ascii=False)
         context_str = json.dumps(context, ensure_ascii=False) if context else "None"
         
@@ -152,14 +237,8 @@ Response format:
 
 Only return the JSON, no other text."""
 
-        message = self.client.messages.create(
-            model=self.model,
-            max_tokens=500,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        response_text = message.content[0].text.strip()
-        return self._parse_json_response(response_text)
+        messages = [{"role": "user", "content": prompt}]
+        return await self._request_json("select_mcp_tool", messages, max_tokens=500)
     
     async def parse_mcp_response(
         self,
@@ -167,7 +246,18 @@ Only return the JSON, no other text."""
         expected_info: str,
         context: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        response_str = json.dumps(raw_response, indent=2, ensure_ascii=False)
+        """
+        Parse and extract information from MCP tool response using AI understanding.
+        
+        Args:
+            raw_response: The raw response from an MCP tool
+            expected_info: Description of what information to extract
+            context: Optional context about what the information will be used for
+        
+        Returns:
+            Extracted and structured information as a dictionary
+        """
+        response_str = compact_mcp_response(raw_response)
         context_str = json.dumps(context, ensure_ascii=False) if context else "None"
         
         prompt = f"""You are an intelligent response parser. Extract the requested information from the MCP tool response.
@@ -191,14 +281,8 @@ Example for location coordinates:
 
 Only return the JSON, no other text."""
 
-        message = self.client.messages.create(
-            model=self.model,
-            max_tokens=500,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        response_text = message.content[0].text.strip()
-        return self._parse_json_response(response_text)
+        messages = [{"role": "user", "content": prompt}]
+        return await self._request_json("parse_mcp_response", messages, max_tokens=500)
     
     async def generate_navigation_url(self, start_coords: dict, end_coords: dict, user_preference: str = None) -> dict:
         """Generate navigation URL using AI to determine best format and parameters."""
@@ -225,14 +309,8 @@ Return JSON format:
 
 Only return JSON, no other text."""
 
-        message = self.client.messages.create(
-            model=self.model,
-            max_tokens=300,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        response_text = message.content[0].text.strip()
-        params = self._parse_json_response(response_text)
+        messages = [{"role": "user", "content": prompt}]
+        params = await self._request_json("generate_navigation_url", messages, max_tokens=300)
         
         sname = urllib.parse.quote(start_coords['name'])
         dname = urllib.parse.quote(end_coords['name'])
@@ -254,55 +332,83 @@ Only return JSON, no other text."""
             "callnative": params.get('callnative', 1),
             "description": params.get('description', 'AI-generated navigation parameters')
         }
+
+
+class ClaudeProvider(AIProvider):
+    provider_name = "anthropic"
     
-    def _parse_json_response(self, response_text: str) -> dict:
-        try:
-            return json.loads(response_text)
-        except json.JSONDecodeError:
-            import re
-            json_match = re.search(r'\{[^}]+\}', response_text)
-            if json_match:
-                return json.loads(json_match.group())
-            raise ValueError("Failed to parse AI response")
+    def __init__(
+        self,
+        api_key: str,
+        response_cache: Optional[ResponseCache] = None,
+        streaming: bool = False
+    ):
+        super().__init__(response_cache, streaming)
+        self.client = AsyncAnthropic(api_key=api_key)
+        self.model = "claude-3-5-sonnet-20241022"
+    
+    async def _complete(self, messages: List[Dict[str, str]], max_tokens: int) -> str:
+        # Async client, so cancelling the task (e.g. a losing hedge) closes the
+        # HTTP request instead of leaving a worker thread to finish it
+        if self.streaming:
+            return await self._complete_streaming(messages, max_tokens)
+        
+        message = await self.client.messages.create(
+            model=self.model,
+            max_tokens=max_tokens,
+            messages=messages
+        )
+        return message.content[0].text.strip()
+    
+    async def _complete_streaming(self, messages: List[Dict[str, str]], max_tokens: int) -> str:
+        scanner = JSONObjectScanner()
+        
+        # Leaving the context manager early closes the response and cancels generation
+        async with self.client.messages.stream(
+            model=self.model,
+            max_tokens=max_tokens,
+            messages=messages
+        ) as stream:
+            async for text in stream.text_stream:
+                if scanner.feed(text) is not None:
+                    break
+        
+        return scanner.result if scanner.done else scanner.text.strip()
 
 
 class OpenAICompatibleProvider(AIProvider):
-    def __init__(self, api_key: str, base_url: str, model: str):
-        super().__init__()
+    provider_name = "openai"
+    
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str,
+        model: str,
+        response_cache: Optional[ResponseCache] = None,
+        streaming: bool = False
+    ):
+        super().__init__(response_cache, streaming)
         self.api_key = api_key
         self.base_url = base_url.rstrip('/')
         self.model = model
     
-    async def parse_navigation_request(self, user_input: str) -> dict:
-        context_str = f"\n\nContext:\n{self.context_summary}" if self.context_summary else ""
-        
-        prompt = f"""Parse this navigation request and extract the start location (A) and end location (B).
-Return a JSON object with 'start' and 'end' keys.
-
-User request: {user_input}{context_str}
-
-Response format:
-{{"start": "location A", "end": "location B"}}
-
-Only return the JSON, no other text."""
-
+    async def _complete(self, messages: List[Dict[str, str]], max_tokens: int) -> str:
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
         
-        messages = []
-        if self.context_history:
-            messages.extend(self.context_history[-3:])
-        messages.append({"role": "user", "content": prompt})
-        
         payload = {
             "model": self.model,
             "messages": messages,
-            "max_tokens": 200,
+            "max_tokens": max_tokens,
             "temperature": 0.7
         }
         
+        if self.streaming:
+            payload["stream"] = True
+            return await self._complete_streaming(headers, payload)
+        
         async with httpx.AsyncClient(timeout=30.0) as client:
             response = await client.post(
                 f"{self.base_url}/chat/completions",
@@ -313,207 +419,191 @@ Only return the JSON, no other text."""
             data = await response.aread()
             data = json.loads(data.decode('utf-8'))
             
-            response_text = data["choices"][0]["message"]["content"].strip()
-            return self._parse_json_response(response_text)
+            return data["choices"][0]["message"]["content"].strip()
     
-    async def select_mcp_tool(
-        self,
-        user_intent: str,
-        available_tools: List[Dict[str, Any]],
-        context: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, Any]:
-        tools_description = json.dumps(available_tools, indent=2, ensure_ascii=False)
-        context_str = json.dumps(context, ensure_ascii=False) if context else "None"
-        
-        prompt = f"""You are an intelligent tool selector. Based on the user's intent and available MCP tools, select the most appropriate tool and generate the correct arguments.
-
-User Intent: {user_intent}
-
-Available Tools:
-{tools_description}
-
-Context: {context_str}
-
-Analyze the intent and select the best tool. Return a JSON object with:
-- tool_name: The name of the selected tool
-- arguments: A dictionary of arguments for the tool
-- reasoning: Brief explanation of why you chose this tool
-
-Response format:
-{{
-  "tool_name": "selected_tool_name",
-  "arguments": {{"param1": "value1"}},
-  "reasoning": "explanation"
-}}
-
-Only return the JSON, no other text."""
-
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "model": self.model,
-            "messages": [
-                {"role": "user", "content": prompt}
-            ],
-            "max_tokens": 500,
-            "temperature": 0.7
-        }
+    async def _complete_streaming(self, headers: Dict[str, str], payload: Dict[str, Any]) -> str:
+        scanner = JSONObjectScanner()
         
         async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
+            # Leaving the stream context early closes the connection and cancels generation
+            async with client.stream(
+                "POST",
                 f"{self.base_url}/chat/completions",
                 headers=headers,
                 json=payload
-            )
-            response.raise_for_status()
-            data = await response.aread()
-            data = json.loads(data.decode('utf-8'))
-            
-            response_text = data["choices"][0]["message"]["content"].strip()
-            return self._parse_json_response(response_text)
+            ) as response:
+                response.raise_for_status()
+                
+                # Some compatible endpoints ignore "stream" and answer with a plain completion
+                if "text/event-stream" not in response.headers.get("content-type", ""):
+                    data = json.loads((await response.aread()).decode('utf-8'))
+                    return data["choices"][0]["message"]["content"].strip()
+                
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    
+                    try:
+                        event = json.loads(data)
+                    except json.JSONDecodeError:
+                        continue
+                    
+                    choices = event.get("choices") or [{}]
+                    delta = choices[0].get("delta", {}).get("content")
+                    if delta and scanner.feed(delta) is not None:
+                        break
+        
+        return scanner.result if scanner.done else scanner.text.strip()
+
+
+class FailoverProvider(AIProvider):
+    """
+    Composite provider that hedges requests across several backends.
     
-    async def parse_mcp_response(
+    The first healthy backend is asked first. If it has not produced a valid
+    JSON answer within ``hedge_delay`` seconds (or fails outright), the same
+    request is sent to the next backend and the first valid result wins; the
+    slower request is cancelled. Each backend has a circuit breaker, so a
+    backend that keeps failing is skipped until its cool-down has elapsed.
+    """
+    provider_name = "failover"
+    
+    def __init__(
         self,
-        raw_response: Dict[str, Any],
-        expected_info: str,
-        context: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, Any]:
-        response_str = json.dumps(raw_response, indent=2, ensure_ascii=False)
-        context_str = json.dumps(context, ensure_ascii=False) if context else "None"
-        
-        prompt = f"""You are an intelligent response parser. Extract the requested information from the MCP tool response.
-
-MCP Tool Response:
-{response_str}
-
-Expected Information: {expected_info}
-
-Context: {context_str}
-
-Analyze the response and extract the requested information. Return a JSON object with the extracted data in a clean, structured format.
-
-Example for location coordinates:
-{{
-  "name": "location name",
-  "longitude": 116.123,
-  "latitude": 39.456,
-  "formatted_address": "full address"
-}}
-
-Only return the JSON, no other text."""
-
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "model": self.model,
-            "messages": [
-                {"role": "user", "content": prompt}
-            ],
-            "max_tokens": 500,
-            "temperature": 0.7
-        }
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"{self.base_url}/chat/completions",
-                headers=headers,
-                json=payload
+        backends: List[AIProvider],
+        hedge_delay: float = 2.0,
+        failure_threshold: int = 3,
+        recovery_timeout: float = 30.0,
+        response_cache: Optional[ResponseCache] = None
+    ):
+        if not backends:
+            raise ValueError("FailoverProvider requires at least one backend")
+        
+        super().__init__(response_cache)
+        self.backends = backends
+        self.hedge_delay = hedge_delay
+        self.model = "+".join(f"{b.provider_name}:{b.model}" for b in backends)
+        self.breakers: List[CircuitBreaker] = [
+            CircuitBreaker(
+                name=f"{b.provider_name}:{b.model}",
+                failure_threshold=failure_threshold,
+                recovery_timeout=recovery_timeout
             )
-            response.raise_for_status()
-            data = await response.aread()
-            data = json.loads(data.decode('utf-8'))
-            
-            response_text = data["choices"][0]["message"]["content"].strip()
-            return self._parse_json_response(response_text)
+            for b in backends
+        ]
     
-    async def generate_navigation_url(self, start_coords: dict, end_coords: dict, user_preference: str = None) -> dict:
-        """Generate navigation URL using AI to determine best format and parameters."""
-        import urllib.parse
-        
-        prompt = f"""Generate navigation URL parameters for Amap (高德地图) based on these coordinates:
-
-Start: {start_coords['name']} ({start_coords['longitude']}, {start_coords['latitude']})
-End: {end_coords['name']} ({end_coords['longitude']}, {end_coords['latitude']})
-User preference: {user_preference or 'default'}
-
-Provide:
-1. navigation_mode: car/bus/walk/bike (default: car)
-2. route_policy: 0=fastest/1=no_highway/2=avoid_congestion/3=save_money/4=highway_first (default: 1)
-3. use_native_app: true/false (true for better experience, use callnative=1; false for web, use callnative=0)
-
-Return JSON format:
-{{
-  "mode": "car",
-  "policy": 1,
-  "callnative": 1,
-  "description": "Brief explanation of choices"
-}}
-
-Only return JSON, no other text."""
-
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "model": self.model,
-            "messages": [
-                {"role": "user", "content": prompt}
-            ],
-            "max_tokens": 300,
-            "temperature": 0.7
-        }
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"{self.base_url}/chat/completions",
-                headers=headers,
-                json=payload
-            )
-            response.raise_for_status()
-            data = await response.aread()
-            data = json.loads(data.decode('utf-8'))
-            
-            response_text = data["choices"][0]["message"]["content"].strip()
-            params = self._parse_json_response(response_text)
-        
-        sname = urllib.parse.quote(start_coords['name'])
-        dname = urllib.parse.quote(end_coords['name'])
-        
-        url = (
-            f"https://uri.amap.com/navigation?"
-            f"from={start_coords['longitude']},{start_coords['latitude']},{sname}&"
-            f"to={end_coords['longitude']},{end_coords['latitude']},{dname}&"
-            f"mode={params.get('mode', 'car')}&"
-            f"policy={params.get('policy', 1)}&"
-            f"src=ai-navigator&coordinate=gaode&"
-            f"callnative={params.get('callnative', 1)}"
-        )
-        
-        return {
-            "url": url,
-            "mode": params.get('mode', 'car'),
-            "policy": params.get('policy', 1),
-            "callnative": params.get('callnative', 1),
-            "description": params.get('description', 'AI-generated navigation parameters')
-        }
+    def get_backend_health(self) -> List[Dict[str, Any]]:
+        """Return circuit state and failure count for every backend."""
+        return [
+            {
+                "backend": breaker.name,
+                "state": breaker.state.value,
+                "failures": breaker.failure_count
+            }
+            for breaker in self.breakers
+        ]
     
-    def _parse_json_response(self, response_text: str) -> dict:
+    async def _attempt(self, index: int, messages: List[Dict[str, str]], max_tokens: int) -> str:
+        backend = self.backends[index]
+        breaker = self.breakers[index]
         try:
-            return json.loads(response_text)
-        except json.JSONDecodeError:
-            import re
-            json_match = re.search(r'\{[^}]+\}', response_text)
-            if json_match:
-                return json.loads(json_match.group())
-            raise ValueError("Failed to parse AI response")
+            response_text = await backend._complete(messages, max_tokens)
+            # Only a parseable answer counts as a success
+            extract_json_object(response_text)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+        return response_text
+    
+    async def _complete(self, messages: List[Dict[str, str]], max_tokens: int) -> str:
+        remaining = list(range(len(self.backends)))
+        pending: Dict[asyncio.Task, int] = {}
+        launched = 0
+        ignore_breakers = False
+        last_error: Optional[BaseException] = None
+        
+        def launch_next() -> bool:
+            # Breakers are asked only right before a launch, so a half-open
+            # backend's probe slot is not taken by a request it never sees
+            nonlocal launched
+            while remaining:
+                index = remaining.pop(0)
+                if not ignore_breakers and not self.breakers[index].allow_request():
+                    continue
+                launched += 1
+                if launched > 1:
+                    logger.info(f"Hedging request to backend {self.breakers[index].name}")
+                pending[asyncio.create_task(self._attempt(index, messages, max_tokens))] = index
+                return True
+            return False
+        
+        if not launch_next():
+            # Every circuit is open: still try the backends rather than failing outright
+            ignore_breakers = True
+            remaining.extend(range(len(self.backends)))
+            launch_next()
+        try:
+            while pending:
+                can_hedge = bool(remaining)
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=self.hedge_delay if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                
+                if not done:
+                    launch_next()
+                    continue
+                
+                for task in done:
+                    del pending[task]
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+                
+                # A backend failed outright: fail over without waiting for the hedge delay
+                launch_next()
+        finally:
+            for task, index in pending.items():
+                if not task.done():
+                    task.cancel()
+                    # A cancelled attempt proves nothing either way; free its probe slot
+                    self.breakers[index].release()
+        
+        raise last_error if last_error else RuntimeError("No AI backend available")
+
+
+def _create_claude_provider(response_cache: Optional[ResponseCache], streaming: bool) -> ClaudeProvider:
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise ValueError("ANTHROPIC_API_KEY environment variable not set")
+    return ClaudeProvider(api_key, response_cache=response_cache, streaming=streaming)
+
+
+def _create_openai_provider(response_cache: Optional[ResponseCache], streaming: bool) -> OpenAICompatibleProvider:
+    api_key = os.getenv("OPENAI_API_KEY")
+    base_url = os.getenv("OPENAI_BASE_URL")
+    model = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+    
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY environment variable not set")
+    if not base_url:
+        raise ValueError("OPENAI_BASE_URL environment variable not set")
+    
+    return OpenAICompatibleProvider(
+        api_key,
+        base_url,
+        model,
+        response_cache=response_cache,
+        streaming=streaming
+    )
 
 
 def create_ai_provider() -> AIProvider:
@@ -521,31 +611,44 @@ def create_ai_provider() -> AIProvider:
     Factory function to create appropriate AI provider based on environment variables.
     
     Environment variables:
-    - AI_PROVIDER: 'anthropic' or 'openai' (default: 'anthropic')
+    - AI_PROVIDER: 'anthropic', 'openai' or 'failover' (default: 'anthropic')
     - ANTHROPIC_API_KEY: API key for Claude (required if AI_PROVIDER='anthropic')
     - OPENAI_API_KEY: API key for OpenAI-compatible service (required if AI_PROVIDER='openai')
     - OPENAI_BASE_URL: Base URL for OpenAI-compatible API (required if AI_PROVIDER='openai')
     - OPENAI_MODEL: Model name to use (default: 'gpt-3.5-turbo')
+    - AI_STREAMING: 'true' or 'false', stream completions and stop at the first
+      complete JSON object (default: 'true')
+    - AI_CACHE_*: Response cache settings, see ``create_response_cache``
+    
+    Failover mode (AI_PROVIDER='failover', requires both Anthropic and OpenAI settings):
+    - AI_PRIMARY_PROVIDER: Backend asked first, 'anthropic' or 'openai' (default: 'anthropic')
+    - AI_HEDGE_DELAY: Seconds before a hedged request goes to the secondary (default: 2.0)
+    - AI_CIRCUIT_FAILURE_THRESHOLD: Consecutive failures that open a backend's circuit (default: 3)
+    - AI_CIRCUIT_RECOVERY_TIMEOUT: Seconds before an open circuit is probed again (default: 30)
     """
     provider_type = os.getenv("AI_PROVIDER", "anthropic").lower()
+    streaming = os.getenv("AI_STREAMING", "true").lower() == "true"
     
     if provider_type == "anthropic":
-        api_key = os.getenv("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise ValueError("ANTHROPIC_API_KEY environment variable not set")
-        return ClaudeProvider(api_key)
+        return _create_claude_provider(create_response_cache(), streaming)
     
     elif provider_type == "openai":
-        api_key = os.getenv("OPENAI_API_KEY")
-        base_url = os.getenv("OPENAI_BASE_URL")
-        model = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
-        
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY environment variable not set")
-        if not base_url:
-            raise ValueError("OPENAI_BASE_URL environment variable not set")
-        
-        return OpenAICompatibleProvider(api_key, base_url, model)
+        return _create_openai_provider(create_response_cache(), streaming)
+    
+    elif provider_type == "failover":
+        # Backends share the composite's cache instead of keeping their own
+        claude = _create_claude_provider(None, streaming)
+        openai = _create_openai_provider(None, streaming)
+        primary = os.getenv("AI_PRIMARY_PROVIDER", "anthropic").lower()
+        backends = [openai, claude] if primary == "openai" else [claude, openai]
+        
+        return FailoverProvider(
+            backends,
+            hedge_delay=float(os.getenv("AI_HEDGE_DELAY", "2.0")),
+            failure_threshold=int(os.getenv("AI_CIRCUIT_FAILURE_THRESHOLD", "3")),
+            recovery_timeout=float(os.getenv("AI_CIRCUIT_RECOVERY_TIMEOUT", "30")),
+            response_cache=create_response_cache()
+        )
     
     else:
-        raise ValueError(f"Unsupported AI provider: {provider_type}. Use 'anthropic' or 'openai'")
+        raise ValueError(f"Unsupported AI provider: {provider_type}. Use 'anthropic', 'openai' or 'failover'")
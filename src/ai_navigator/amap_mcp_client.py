@@ -11,6 +11,41 @@ from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 from anthropic import Anthropic
 
+
+def amap_server_config(server_url: Optional[str] = None, api_key: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Connection settings (URL, transport, auth) for the Amap MCP server over HTTP.
+    
+    The main MCP path and AmapMCPClient both connect with these settings, so
+    they map to the same connection pool key and share one connection.
+    
+    Args:
+        server_url: Server URL (default: AMAP_MCP_SERVER_URL)
+        api_key: Amap API key (default: AMAP_API_KEY)
+        
+    Returns:
+        Keyword arguments for MCPConnectionPool.acquire / create_mcp_client
+    """
+    from ai_navigator.mcp_client import TransportType, AuthType
+    
+    server_url = server_url or os.getenv("AMAP_MCP_SERVER_URL")
+    api_key = api_key if api_key is not None else os.getenv("AMAP_API_KEY", "")
+    
+    if "sse" in server_url.lower():
+        transport_type = TransportType.HTTP_SSE
+    elif "stream" in server_url.lower():
+        transport_type = TransportType.HTTP_STREAM
+    else:
+        transport_type = TransportType.HTTP_SSE
+    
+    return {
+        "server_url": server_url,
+        "transport_type": transport_type,
+        "auth_type": AuthType.API_KEY if api_key else AuthType.NONE,
+        "auth_token": api_key or None
+    }
+
+
 class AmapMCPClient:
     """Client for interacting with Amap MCP Server."""
     
@@ -36,23 +71,17 @@ class AmapMCPClient:
     async def connect(self):
         """Connect to the Amap MCP server."""
         if self.server_url:
-            # 使用HTTP方式连接
-            from ai_navigator.mcp_client import MCPConfig, TransportType, AuthType, HTTPSSETransport
+            # 使用HTTP方式连接, 与主流程共享连接池中的同一连接
+            from ai_navigator.mcp_pool import get_connection_pool
             
             # SECURITY: Do not extract API keys from URLs - use AMAP_API_KEY environment variable
             if 'key=' in self.server_url:
                 print("⚠️  WARNING: API key detected in URL. Use AMAP_API_KEY environment variable instead for security.")
             
-            config = MCPConfig(
-                server_url=self.server_url,
-                transport_type=TransportType.HTTP_SSE,
-                auth_type=AuthType.API_KEY if self._api_key else AuthType.NONE,
-                auth_token=self._api_key,
+            self.client = await get_connection_pool().acquire(
+                **amap_server_config(self.server_url, self._api_key),
                 timeout=30
             )
-            
-            self.client = HTTPSSETransport(config)
-            await self.client.connect()
         else:
             # 使用标准输入输出方式连接
             server_params = StdioServerParameters(
@@ -74,10 +103,7 @@ class AmapMCPClient:
         """Call a tool on the MCP server."""
         if self.client:
             # 使用HTTP客户端调用工具
-            return await self.client.send_request("call_tool", {
-                "tool": tool_name,
-                "arguments": arguments
-            })
+            return await self.client.call_tool(tool_name, arguments)
         elif self.session:
             # 使用标准输入输出客户端调用工具
             return await self.session.call_tool(tool_name, arguments)
@@ -87,7 +113,8 @@ class AmapMCPClient:
     async def disconnect(self):
         """Disconnect from the Amap MCP server."""
         if self.client:
-            await self.client.disconnect()
+            from ai_navigator.mcp_pool import get_connection_pool
+            await get_connection_pool().release(self.client)
             self.client = None
         elif self.session:
             await self.session.__aexit__(None, None, None)
@@ -0,0 +1,113 @@
+"""
+Circuit Breaker
+
+Tracks the health of a remote backend (AI provider, MCP server, ...) so that
+callers fail fast while it is unhealthy and probe it again after a cool-down.
+
+States:
+- CLOSED: requests flow normally; consecutive failures are counted
+- OPEN: requests are rejected until ``recovery_timeout`` has elapsed
+- HALF_OPEN: a limited number of trial requests decide whether to close again
+"""
+
+import logging
+import time
+from enum import Enum
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised when a call is rejected because the circuit is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a half-open probe phase."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.failure_count = 0
+        self.opened_at: Optional[float] = None
+        self._state = CircuitState.CLOSED
+        self._half_open_calls = 0
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state == CircuitState.OPEN and self._cooldown_elapsed():
+            self._transition(CircuitState.HALF_OPEN)
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Return True if a call may be attempted now."""
+        state = self.state
+
+        if state == CircuitState.CLOSED:
+            return True
+
+        if state == CircuitState.HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+            self._half_open_calls += 1
+            return True
+
+        return False
+
+    def record_success(self) -> None:
+        """Record a successful call; closes the circuit."""
+        self.failure_count = 0
+        if self._state != CircuitState.CLOSED:
+            self._transition(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        """Record a failed call; opens the circuit once the threshold is reached."""
+        self.failure_count += 1
+
+        if self._state == CircuitState.HALF_OPEN or self.failure_count >= self.failure_threshold:
+            self._transition(CircuitState.OPEN)
+
+    def release(self) -> None:
+        """Give back a half-open probe slot for a call that ended without an outcome (e.g. cancelled)."""
+        if self._state == CircuitState.HALF_OPEN and self._half_open_calls > 0:
+            self._half_open_calls -= 1
+
+    def reset(self) -> None:
+        """Force the circuit back to CLOSED."""
+        self.failure_count = 0
+        self._transition(CircuitState.CLOSED)
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit allows a probe (0 if not open)."""
+        if self._state != CircuitState.OPEN or self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.recovery_timeout - time.monotonic())
+
+    def _cooldown_elapsed(self) -> bool:
+        return self.opened_at is not None and time.monotonic() - self.opened_at >= self.recovery_timeout
+
+    def _transition(self, new_state: CircuitState) -> None:
+        if new_state == self._state and new_state != CircuitState.OPEN:
+            return
+
+        if new_state == CircuitState.OPEN:
+            self.opened_at = time.monotonic()
+        elif new_state == CircuitState.CLOSED:
+            self.opened_at = None
+        self._half_open_calls = 0
+
+        if new_state != self._state:
+            logger.info(f"Circuit '{self.name}': {self._state.value} -> {new_state.value}")
+        self._state = new_state
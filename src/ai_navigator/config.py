@@ -17,14 +17,24 @@ def load_config(env_file: Optional[str] = None) -> None:
                  .env in the project root directory.
     
     Environment variables loaded:
-        AI_PROVIDER: AI provider type ('anthropic' or 'openai')
+        AI_PROVIDER: AI provider type ('anthropic', 'openai' or 'failover')
+        AI_PRIMARY_PROVIDER: Backend asked first in failover mode
+        AI_HEDGE_DELAY: Seconds before a hedged request goes to the secondary backend
         ANTHROPIC_API_KEY: Anthropic API key
         OPENAI_API_KEY: OpenAI-compatible API key
         OPENAI_BASE_URL: OpenAI API base URL
         OPENAI_MODEL: OpenAI model name
+        AI_STREAMING: Stream AI completions and stop at the first JSON object
+        AI_CACHE_ENABLED: Enable the AI response cache ('true' or 'false', default 'false')
+        AI_CACHE_TTL: AI response cache entry lifetime in seconds
+        AI_CACHE_MAX_ENTRIES: Maximum in-memory AI response cache entries
+        AI_CACHE_DIR: Directory for the on-disk AI response cache
         AMAP_MCP_SERVER_URL: Amap MCP server URL
         AMAP_MCP_SERVER_PATH: Amap MCP server path
         AMAP_API_KEY: Amap API key
+        MCP_CAPABILITY_CACHE_DIR: Directory for cached MCP server tool listings
+        MCP_POOL_IDLE_TIMEOUT: Seconds before an unused pooled MCP connection is closed
+        MCP_POOL_HEALTH_CHECK_INTERVAL: Minimum seconds between pings of a pooled MCP connection
     
     Note:
         - Environment variables already set in the system take precedence
@@ -0,0 +1,491 @@
+"""
+File Index
+
+In-memory index of paths, sizes, mtimes and content hashes under a set of
+root directories, optionally persisted to SQLite. The file MCP server uses it
+to answer listings, file_info and search file enumeration without walking the
+filesystem on every call.
+
+Refreshes are incremental: a directory is only re-listed when its mtime
+changed, and a file is only re-hashed when its size or mtime changed. When the
+optional ``watchdog`` package is installed, filesystem events mark the
+affected directories and a refresh revisits only those.
+"""
+
+import dataclasses
+import hashlib
+import logging
+import os
+import sqlite3
+import stat
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    is_dir INTEGER NOT NULL,
+    is_link INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    ctime REAL NOT NULL,
+    atime REAL NOT NULL,
+    mode INTEGER NOT NULL,
+    content_hash TEXT
+);
+"""
+
+_COLUMNS = ("path", "name", "is_dir", "is_link", "size", "mtime_ns", "ctime", "atime", "mode", "content_hash")
+
+
+# Content hash constructors by name; blake2b (256-bit) is the default used for content_hash
+HASH_ALGORITHMS = {
+    "blake2b": lambda: hashlib.blake2b(digest_size=32),
+    "sha256": hashlib.sha256,
+}
+if xxhash is not None:
+    HASH_ALGORITHMS["xxh64"] = xxhash.xxh64
+    HASH_ALGORITHMS["xxh3_64"] = xxhash.xxh3_64
+
+
+def hash_file(path: str, algorithm: str = "blake2b") -> str:
+    """Hex digest of a file's contents, read in chunks."""
+    if algorithm not in HASH_ALGORITHMS:
+        raise ValueError(f"Unsupported hash algorithm: {algorithm}")
+    digest = HASH_ALGORITHMS[algorithm]()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class IndexedEntry:
+    """Indexed metadata for one file or directory"""
+    path: str
+    name: str
+    is_dir: bool
+    is_link: bool
+    size: int
+    mtime_ns: int
+    ctime: float
+    atime: float
+    mode: int
+    content_hash: Optional[str] = None
+
+    @property
+    def mtime(self) -> float:
+        return self.mtime_ns / 1e9
+
+
+class _DirtyTracker(FileSystemEventHandler):
+    """watchdog handler that marks changed paths for the next refresh"""
+
+    def __init__(self, index: "FileIndex"):
+        super().__init__()
+        self.index = index
+
+    def on_any_event(self, event: Any) -> None:
+        self.index.mark_dirty(event.src_path)
+        dest_path = getattr(event, "dest_path", None)
+        if dest_path:
+            self.index.mark_dirty(dest_path)
+
+
+class FileIndex:
+    """
+    Incrementally refreshed index of the files under a set of roots.
+
+    Readers see each record either before or after a concurrent refresh;
+    refreshes themselves are serialized.
+    """
+
+    def __init__(
+        self,
+        roots: Iterable[str],
+        db_path: Optional[str] = None,
+        hash_contents: bool = True,
+        max_hash_size: int = 64 * 1024 * 1024,
+        max_age: float = 5.0,
+        watch: bool = True
+    ):
+        """
+        Args:
+            roots: Directories to index
+            db_path: SQLite file to persist the index in (None = memory only)
+            hash_contents: Record a BLAKE2b hash of each file's contents
+            max_hash_size: Files larger than this are indexed without a hash
+            max_age: Seconds before ``ensure_fresh`` re-checks the tree when
+                no filesystem watcher is available
+            watch: Use watchdog to track changes if it is installed
+        """
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.db_path = db_path
+        self.hash_contents = hash_contents
+        self.max_hash_size = max_hash_size
+        self.max_age = max_age
+        self._entries: Dict[str, IndexedEntry] = {}
+        self._children: Dict[str, List[str]] = {}
+        self._lock = threading.RLock()
+        self._dirty: Set[str] = set()
+        self._dirty_trees: Set[str] = set()
+        self._dirty_lock = threading.Lock()
+        self._last_refresh: Optional[float] = None
+        self._pending_writes: Dict[str, IndexedEntry] = {}
+        self._pending_deletes: Set[str] = set()
+        self._db: Optional[sqlite3.Connection] = None
+        self._observer = None
+
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.executescript(_INDEX_SCHEMA)
+            self._load()
+
+        if watch and Observer is not None:
+            self._observer = Observer()
+            handler = _DirtyTracker(self)
+            for root in self.roots:
+                if os.path.isdir(root):
+                    self._observer.schedule(handler, root, recursive=True)
+            self._observer.daemon = True
+            self._observer.start()
+
+    @property
+    def watching(self) -> bool:
+        return self._observer is not None
+
+    def covers(self, path: str) -> bool:
+        """True if the path lies inside one of the indexed roots."""
+        path = os.path.abspath(path)
+        return any(path == root or path.startswith(root + os.sep) for root in self.roots)
+
+    def get(self, path: str) -> Optional[IndexedEntry]:
+        return self._entries.get(os.path.abspath(path))
+
+    def mark_dirty(self, path: str, recursive: bool = False) -> None:
+        """
+        Record that a path (and so its parent directory's listing) changed.
+
+        With ``recursive`` the next refresh also revisits everything below
+        the path, for changes that may have touched a whole subtree.
+        """
+        path = os.path.abspath(path)
+        with self._dirty_lock:
+            self._dirty.add(path)
+            self._dirty.add(os.path.dirname(path))
+            if recursive:
+                self._dirty_trees.add(path)
+
+    def ensure_fresh(self) -> Optional[Dict[str, Any]]:
+        """
+        Bring the index up to date if it may be stale.
+
+        Paths marked dirty (by the watcher or by ``mark_dirty`` callers) are
+        always revisited. Without a watcher the whole tree is also re-checked
+        once ``max_age`` has passed.
+
+        Returns:
+            Refresh statistics, or None if nothing needed refreshing
+        """
+        with self._lock:
+            with self._dirty_lock:
+                dirty, self._dirty = self._dirty, set()
+                trees, self._dirty_trees = self._dirty_trees, set()
+
+            if self._last_refresh is None:
+                return self.refresh()
+
+            if self._observer is None and time.monotonic() - self._last_refresh >= self.max_age:
+                return self.refresh()
+
+            return self.refresh_paths(dirty, trees) if dirty else None
+
+    def refresh(self) -> Dict[str, Any]:
+        """Re-check every root, re-listing changed directories and re-hashing changed files."""
+        with self._lock:
+            started = time.monotonic()
+            stats = {"directories_listed": 0, "files_hashed": 0, "removed": 0}
+
+            for root in self.roots:
+                try:
+                    root_stat = os.stat(root)
+                except OSError:
+                    self._remove(root, stats)
+                    continue
+                self._refresh_dir(root, root_stat, stats, recursive=True)
+
+            return self._finish_refresh(stats, started)
+
+    def refresh_paths(self, paths: Iterable[str], trees: Iterable[str] = ()) -> Dict[str, Any]:
+        """
+        Refresh only the given directories (and anything new inside them).
+
+        Directories listed in ``trees`` are refreshed with everything below them.
+        """
+        with self._lock:
+            started = time.monotonic()
+            stats = {"directories_listed": 0, "files_hashed": 0, "removed": 0}
+            targets = {os.path.abspath(path): False for path in paths}
+            targets.update((os.path.abspath(path), True) for path in trees)
+
+            for path, recursive in sorted(targets.items()):
+                if not self.covers(path):
+                    continue
+                try:
+                    path_stat = os.stat(path)
+                except OSError:
+                    self._remove(path, stats)
+                    continue
+                if stat.S_ISDIR(path_stat.st_mode):
+                    self._refresh_dir(path, path_stat, stats, recursive=recursive)
+
+            return self._finish_refresh(stats, started)
+
+    def iter_tree(
+        self,
+        path: str,
+        recursive: bool = False,
+        include_hidden: bool = False,
+        max_depth: Optional[int] = None,
+        resume_after: Optional[List[str]] = None,
+        depth: int = 0
+    ) -> Iterator[Tuple[IndexedEntry, str]]:
+        """
+        Yield (entry, relative path) in name order, each directory before its contents.
+
+        Mirrors the file server's scandir traversal, including ``resume_after``
+        cursors and not descending into symlinked directories.
+        """
+        path = os.path.abspath(path)
+        descend = recursive and (max_depth is None or depth + 1 < max_depth)
+
+        for name in self._children.get(path, ()):
+            if not include_hidden and name.startswith('.'):
+                continue
+            entry = self._entries.get(os.path.join(path, name))
+            if entry is None:
+                continue
+
+            if resume_after:
+                if name < resume_after[0]:
+                    continue
+                if name == resume_after[0]:
+                    if descend and entry.is_dir and not entry.is_link:
+                        for child, relative in self.iter_tree(
+                            entry.path, recursive, include_hidden, max_depth, resume_after[1:], depth + 1
+                        ):
+                            yield child, f"{name}/{relative}"
+                    resume_after = None
+                    continue
+                resume_after = None
+
+            yield entry, name
+
+            if descend and entry.is_dir and not entry.is_link:
+                for child, relative in self.iter_tree(
+                    entry.path, recursive, include_hidden, max_depth, None, depth + 1
+                ):
+                    yield child, f"{name}/{relative}"
+
+    def close(self) -> None:
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _refresh_dir(self, path: str, dir_stat: os.stat_result, stats: Dict[str, Any], recursive: bool) -> None:
+        known = self._entries.get(path)
+        names = self._children.get(path)
+
+        if known is not None and not known.is_dir:
+            self._remove(path, stats)
+            known = names = None
+
+        if names is None or known is None or known.mtime_ns != dir_stat.st_mtime_ns:
+            try:
+                with os.scandir(path) as it:
+                    listed = sorted(entry.name for entry in it)
+            except OSError:
+                listed = []
+            stats["directories_listed"] += 1
+
+            for name in set(names or ()).difference(listed):
+                self._remove(os.path.join(path, name), stats)
+            names = listed
+
+        kept = []
+        for name in names:
+            child = os.path.join(path, name)
+            try:
+                child_lstat = os.lstat(child)
+            except OSError:
+                self._remove(child, stats)
+                continue
+            kept.append(name)
+
+            is_link = stat.S_ISLNK(child_lstat.st_mode)
+            child_stat = child_lstat
+            if is_link:
+                try:
+                    child_stat = os.stat(child)
+                except OSError:
+                    pass
+
+            previous = self._entries.get(child)
+            if stat.S_ISDIR(child_stat.st_mode):
+                if is_link:
+                    self._store(self._make_entry(child, child_stat, is_dir=True, is_link=True))
+                elif recursive or child not in self._children:
+                    self._refresh_dir(child, child_stat, stats, recursive=True)
+            else:
+                if previous is not None and previous.is_dir:
+                    self._remove(child, stats)
+                    previous = None
+                self._refresh_file(child, child_stat, is_link, previous, stats)
+
+        self._children[path] = kept
+        self._store(self._make_entry(path, dir_stat, is_dir=True, is_link=False))
+
+    def _refresh_file(
+        self,
+        path: str,
+        file_stat: os.stat_result,
+        is_link: bool,
+        previous: Optional[IndexedEntry],
+        stats: Dict[str, Any]
+    ) -> None:
+        if previous is not None and previous.size == file_stat.st_size and previous.mtime_ns == file_stat.st_mtime_ns:
+            if (previous.mode, previous.ctime) != (file_stat.st_mode, file_stat.st_ctime):
+                self._store(dataclasses.replace(
+                    previous, mode=file_stat.st_mode, ctime=file_stat.st_ctime, atime=file_stat.st_atime
+                ))
+            return
+
+        entry = self._make_entry(path, file_stat, is_dir=False, is_link=is_link)
+        if self.hash_contents and file_stat.st_size <= self.max_hash_size:
+            try:
+                entry.content_hash = hash_file(path)
+                stats["files_hashed"] += 1
+            except OSError as e:
+                logger.debug(f"Could not hash {path}: {e}")
+        self._store(entry)
+
+    @staticmethod
+    def _make_entry(path: str, path_stat: os.stat_result, is_dir: bool, is_link: bool) -> IndexedEntry:
+        return IndexedEntry(
+            path=path,
+            name=os.path.basename(path),
+            is_dir=is_dir,
+            is_link=is_link,
+            size=0 if is_dir else path_stat.st_size,
+            mtime_ns=path_stat.st_mtime_ns,
+            ctime=path_stat.st_ctime,
+            atime=path_stat.st_atime,
+            mode=path_stat.st_mode
+        )
+
+    def _store(self, entry: IndexedEntry) -> None:
+        self._entries[entry.path] = entry
+        self._pending_writes[entry.path] = entry
+        self._pending_deletes.discard(entry.path)
+
+    def _remove(self, path: str, stats: Dict[str, Any]) -> None:
+        for name in self._children.pop(path, ()):
+            self._remove(os.path.join(path, name), stats)
+        if self._entries.pop(path, None) is not None:
+            stats["removed"] += 1
+            self._pending_writes.pop(path, None)
+            self._pending_deletes.add(path)
+
+    def _finish_refresh(self, stats: Dict[str, Any], started: float) -> Dict[str, Any]:
+        self._persist()
+        self._last_refresh = time.monotonic()
+        stats["entries"] = len(self._entries)
+        stats["duration"] = round(self._last_refresh - started, 4)
+        logger.debug(f"File index refreshed: {stats}")
+        return stats
+
+    def _persist(self) -> None:
+        writes, self._pending_writes = self._pending_writes, {}
+        deletes, self._pending_deletes = self._pending_deletes, set()
+        if self._db is None or not (writes or deletes):
+            return
+
+        with self._db:
+            self._db.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in deletes])
+            self._db.executemany(
+                f"INSERT OR REPLACE INTO files ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                [
+                    (e.path, e.name, int(e.is_dir), int(e.is_link), e.size, e.mtime_ns,
+                     e.ctime, e.atime, e.mode, e.content_hash)
+                    for e in writes.values()
+                ]
+            )
+
+    def _load(self) -> None:
+        rows = self._db.execute(f"SELECT {', '.join(_COLUMNS)} FROM files").fetchall()
+        for row in rows:
+            entry = IndexedEntry(
+                path=row[0], name=row[1], is_dir=bool(row[2]), is_link=bool(row[3]), size=row[4],
+                mtime_ns=row[5], ctime=row[6], atime=row[7], mode=row[8], content_hash=row[9]
+            )
+            self._entries[entry.path] = entry
+            if entry.is_dir and not entry.is_link:
+                self._children.setdefault(entry.path, [])
+
+        for path in self._entries:
+            if path in self.roots:
+                continue
+            parent = os.path.dirname(path)
+            if parent in self._children:
+                self._children[parent].append(os.path.basename(path))
+
+        for names in self._children.values():
+            names.sort()
+
+        logger.info(f"Loaded {len(self._entries)} file index entries from {self.db_path}")
+
+
+def create_file_index_from_env() -> Optional[FileIndex]:
+    """
+    Build a FileIndex from environment variables, or None if no roots are configured.
+
+    Environment variables:
+    - MCP_FILE_INDEX_ROOTS: Directories to index, separated by os.pathsep
+    - MCP_FILE_INDEX_DB: SQLite file to persist the index in (optional)
+    - MCP_FILE_INDEX_MAX_AGE: Seconds between full re-checks without a watcher (default: 5)
+    """
+    roots = [root for root in os.getenv("MCP_FILE_INDEX_ROOTS", "").split(os.pathsep) if root]
+    if not roots:
+        return None
+
+    return FileIndex(
+        roots,
+        db_path=os.getenv("MCP_FILE_INDEX_DB") or None,
+        max_age=float(os.getenv("MCP_FILE_INDEX_MAX_AGE", "5"))
+    )
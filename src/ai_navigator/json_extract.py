@@ -0,0 +1,183 @@
+"""
+Incremental JSON Extraction
+
+Helpers for pulling the first JSON object out of model output. The scanner
+consumes text chunk by chunk (as delivered by a streaming completion) and
+reports the object as soon as its closing brace arrives, so callers can stop
+reading the stream instead of waiting for trailing prose.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Characters that matter while scanning, outside and inside string literals
+_STRUCTURAL = re.compile(r'[{}\[\]"]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+_DECODER = json.JSONDecoder()
+
+
+class JSONObjectScanner:
+    """
+    Balanced-brace scanner that detects the first complete top-level JSON object.
+
+    Braces inside string literals are ignored. A balanced candidate that is
+    not valid JSON (e.g. a stray ``{`` in leading prose) is skipped; objects
+    nested inside it are still found, and scanning resumes after it.
+
+    Every character is scanned once: only the text of the open candidate is
+    kept for scanning, as a list of chunks joined when the candidate closes.
+    """
+
+    def __init__(self):
+        self.result: Optional[str] = None
+        self.value: Optional[Dict[str, Any]] = None
+        self._chunks: List[str] = []
+        self._length = 0
+        # Open candidate: its chunks, the offset of its opening brace, the
+        # offsets of brackets still open in it and the "{" spans closed inside it
+        self._candidate: List[str] = []
+        self._candidate_start = -1
+        self._stack: List[Tuple[int, str]] = []
+        self._inner: List[Tuple[int, int]] = []
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def done(self) -> bool:
+        return self.result is not None
+
+    @property
+    def text(self) -> str:
+        """All text fed so far"""
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """
+        Append a chunk of text and continue scanning.
+
+        Returns:
+            The JSON object text once the top-level object has closed, else None
+        """
+        if self.result is not None:
+            return self.result
+
+        base = self._length
+        self._chunks.append(chunk)
+        self._length += len(chunk)
+        if self._stack:
+            self._candidate.append(chunk)
+        return self._scan(chunk, base)
+
+    def _scan(self, chunk: str, base: int) -> Optional[str]:
+        length = len(chunk)
+        i = 0
+
+        while i < length:
+            if not self._stack:
+                i = chunk.find("{", i)
+                if i == -1:
+                    return None
+                self._stack.append((base + i, "{"))
+                self._candidate = [chunk[i:]]
+                self._candidate_start = base + i
+                i += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                    i += 1
+                    continue
+                match = _STRING_SPECIAL.search(chunk, i)
+                if match is None:
+                    return None
+                i = match.start()
+                if chunk[i] == "\\":
+                    self._escape = True
+                else:
+                    self._in_string = False
+                i += 1
+                continue
+
+            match = _STRUCTURAL.search(chunk, i)
+            if match is None:
+                return None
+            i = match.start()
+            ch = chunk[i]
+
+            if ch == '"':
+                self._in_string = True
+            elif ch == "{" or ch == "[":
+                self._stack.append((base + i, ch))
+            else:
+                start, opener = self._stack.pop()
+                if self._stack:
+                    if opener == "{":
+                        self._inner.append((start, base + i))
+                else:
+                    result = self._close_candidate(base + i)
+                    if result is not None:
+                        return result
+            i += 1
+
+        return None
+
+    def _close_candidate(self, end: int) -> Optional[str]:
+        """Check a balanced candidate, then the objects nested in it, earliest start first."""
+        text = "".join(self._candidate)
+        offset = self._candidate_start
+        spans = [(offset, end)] + sorted(self._inner)
+        self._candidate = []
+        self._inner = []
+        self._in_string = False
+        self._escape = False
+
+        for start, stop in spans:
+            candidate = text[start - offset:stop - offset + 1]
+            try:
+                parsed = json.loads(candidate)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(parsed, dict):
+                self.result = candidate
+                self.value = parsed
+                return candidate
+        return None
+
+
+def extract_json_object(text: str) -> Dict[str, Any]:
+    """
+    Extract the first JSON object from model output.
+
+    Handles bare JSON, markdown code fences, leading/trailing prose and nested
+    objects in a single pass over the text.
+
+    Args:
+        text: Raw completion text
+
+    Returns:
+        The parsed JSON object
+
+    Raises:
+        ValueError: If the text contains no JSON object
+    """
+    # Fast path: decode directly from the first brace, ignoring whatever follows
+    start = text.find("{")
+    if start == -1:
+        raise ValueError("Failed to parse AI response")
+    try:
+        parsed, _ = _DECODER.raw_decode(text, start)
+        if isinstance(parsed, dict):
+            return parsed
+    except json.JSONDecodeError:
+        pass
+
+    scanner = JSONObjectScanner()
+    scanner.feed(text)
+    if scanner.done:
+        return scanner.value
+
+    raise ValueError("Failed to parse AI response")
@@ -12,8 +12,9 @@ import logging
 from typing import Optional, Dict, Any
 from ai_navigator.config import load_config
 from ai_navigator.ai_provider import create_ai_provider
-from ai_navigator.mcp_client import create_mcp_client, TransportType, AuthType, _sanitize_url
-from ai_navigator.amap_mcp_client import create_amap_client
+from ai_navigator.mcp_client import create_mcp_client, _sanitize_url
+from ai_navigator.mcp_pool import get_connection_pool
+from ai_navigator.amap_mcp_client import amap_server_config, create_amap_client
 from ai_navigator.voice_recognizer import get_voice_input
 from ai_navigator.constants import (
     DEFAULT_LOCATION,
@@ -563,6 +564,8 @@ async def main():
         print("  export OPENAI_API_KEY='your-api-key'")
         print("  export OPENAI_BASE_URL='https://api.example.com/v1'")
         print("  export OPENAI_MODEL='gpt-3.5-turbo'")
+        print("- For hedged failover across both (configure both providers above):")
+        print("  export AI_PROVIDER='failover'")
         print("- For MCP Server:")
         print("  export AMAP_MCP_SERVER_URL='https://mcp.amap.com/sse'")
         print("  export AMAP_API_KEY='your-amap-api-key'")
@@ -583,15 +586,18 @@ async def main():
             import sys
             python_command = sys.executable
             print(f"   Using Python executable: {python_command}")
-            success = await mcp_manager.register_server(
-                name="browser",
-                server_path=browser_server_path,
-                transport=TransportMethod.STDIO,
-                command=python_command
-            )
+            # The browser server is only needed at the last step: spawn it on first use
+            results = await mcp_manager.register_servers([
+                {
+                    "name": "browser",
+                    "server_path": browser_server_path,
+                    "transport": TransportMethod.STDIO,
+                    "command": python_command
+                }
+            ], lazy=True)
             
-            if success:
-                print("✓ Browser control MCP server registered")
+            if results["browser"].success:
+                print("✓ Browser control MCP server registered (starts on first use)")
             else:
                 print("⚠️  Failed to register browser control MCP server, falling back to direct control")
                 mcp_manager = None
@@ -633,19 +639,13 @@ async def main():
             use_mcp = False
         else:
             print(f"   Using MCP server: {_sanitize_url(server_url)}")
-            if "sse" in server_url.lower():
-                transport_type = TransportType.HTTP_SSE
-            elif "stream" in server_url.lower():
-                transport_type = TransportType.HTTP_STREAM
-            else:
-                transport_type = TransportType.HTTP_SSE
-            auth_type = AuthType.NONE
-        
+            
+            # Same settings as the Amap fallback client, so both share one pooled connection
             mcp_client = await create_mcp_client(
-                server_url=server_url,
-                transport_type=transport_type,
-                auth_token=None,
-                auth_type=auth_type
+                **amap_server_config(server_url),
+                pooled=True,
+                eager_discovery=("tools",),
+                capability_cache_dir=os.getenv("MCP_CAPABILITY_CACHE_DIR") or None
             )
             
             if not mcp_client.is_connected():
@@ -744,8 +744,11 @@ async def main():
         print("\n=== Navigation request completed successfully! ===")
     
     finally:
+        pool = get_connection_pool()
         if mcp_client:
-            await mcp_client.disconnect()
+            await pool.release(mcp_client)
+        
+        await pool.close()
         
         if mcp_manager:
             await mcp_manager.disconnect_all()
@@ -6,15 +6,20 @@ the official MCP specification. Supports multiple transport methods, capability
 discovery, tool invocation, resource access, and comprehensive error handling.
 """
 
+import hashlib
 import json
 import logging
-from typing import Optional, Dict, List, Any, Callable, Union
+import os
+from pathlib import Path
+from typing import Optional, Dict, List, Any, Callable, Union, Tuple
 from enum import Enum
 from dataclasses import dataclass, field
 import asyncio
 from abc import ABC, abstractmethod
 import httpx
 import uuid
+from ai_navigator.retry_policy import RetryPolicy, is_retryable_error
+from ai_navigator.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
 
 logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
@@ -107,6 +112,20 @@ class MCPConfig:
     timeout: int = 30
     max_retries: int = 3
     retry_delay: float = 1.0
+    retry_policy: Optional[RetryPolicy] = None
+    circuit_failure_threshold: int = 5
+    circuit_recovery_timeout: float = 30.0
+    auto_reconnect: bool = True
+    eager_discovery: Tuple[str, ...] = ("tools", "resources", "prompts")
+    capability_cache_dir: Optional[str] = None
+
+
+# Capability kind -> (list method, response key)
+_CAPABILITY_KINDS = {
+    "tools": ("tools/list", "tools"),
+    "resources": ("resources/list", "resources"),
+    "prompts": ("prompts/list", "prompts"),
+}
 
 
 @dataclass
@@ -115,6 +134,13 @@ class Tool:
     description: str
     parameters: Dict[str, Any]
     metadata: Optional[Dict[str, Any]] = None
+    annotations: Optional[Dict[str, Any]] = None
+    
+    @property
+    def idempotent(self) -> bool:
+        """Whether the server declares that repeating a call is safe."""
+        hints = self.annotations or {}
+        return bool(hints.get("readOnlyHint") or hints.get("idempotentHint"))
 
 
 @dataclass
@@ -133,8 +159,49 @@ class Prompt:
     parameters: Optional[Dict[str, Any]] = None
 
 
+def _parse_sse_messages(text: str) -> List[Any]:
+    """JSON payloads of the ``data:`` fields in a Server-Sent Events body."""
+    messages = []
+    for event in text.replace("\r\n", "\n").split("\n\n"):
+        data = "\n".join(
+            line[len("data:"):].lstrip() for line in event.split("\n") if line.startswith("data:")
+        )
+        if not data:
+            continue
+        try:
+            messages.append(json.loads(data))
+        except json.JSONDecodeError:
+            logger.warning("Ignoring invalid JSON in SSE event")
+    return messages
+
+
 class MCPTransport(ABC):
     
+    # Called with server-initiated JSON-RPC notifications (messages without an id)
+    notification_handler: Optional[Callable[[Dict[str, Any]], None]] = None
+    
+    def _route_messages(self, messages: Any, request_id: str) -> Dict[str, Any]:
+        """
+        Pick the reply to request_id out of the messages a POST returned.
+        
+        HTTP servers may send notifications (e.g. ``list_changed``) ahead of
+        the reply, as SSE events or in a JSON batch; they are passed to
+        ``notification_handler``.
+        """
+        if not isinstance(messages, list):
+            messages = [messages]
+        
+        reply = None
+        for message in messages:
+            if not isinstance(message, dict):
+                continue
+            if "method" in message and "id" not in message:
+                if self.notification_handler:
+                    self.notification_handler(message)
+            elif reply is None or message.get("id") == request_id:
+                reply = message
+        return reply if reply is not None else {}
+    
     @abstractmethod
     async def connect(self) -> bool:
         pass
@@ -210,7 +277,10 @@ class HTTPSSETransport(MCPTransport):
             )
             
             response.raise_for_status()
-            result = response.json()
+            if "text/event-stream" in response.headers.get("content-type", ""):
+                result = self._route_messages(_parse_sse_messages(response.text), request["id"])
+            else:
+                result = self._route_messages(response.json(), request["id"])
             
             # Handle JSON-RPC response
             if "result" in result:
@@ -223,14 +293,14 @@ class HTTPSSETransport(MCPTransport):
                 
         except httpx.HTTPError as e:
             logger.error(f"HTTP request failed: {e}")
-            raise ConnectionError(f"HTTP request failed: {e}")
+            raise ConnectionError(f"HTTP request failed: {e}") from e
         except Exception as e:
             logger.error(f"Request failed: {e}")
             raise
     
     async def receive_event(self) -> Optional[Dict[str, Any]]:
-        # For HTTP+SSE, we don't receive events in this implementation
-        # This would require Server-Sent Events handling
+        # No standalone event stream; notifications sent along with POST
+        # replies are passed to notification_handler by send_request
         return None
     
     def _generate_request_id(self) -> str:
@@ -278,7 +348,7 @@ class StreamableHTTPTransport(MCPTransport):
             # Prepare headers for streamable HTTP
             headers = {
                 "Content-Type": "application/json",
-                "Accept": "application/json",
+                "Accept": "application/json, text/event-stream",
                 "Cache-Control": "no-cache",
                 "Connection": "keep-alive"
             }
@@ -303,7 +373,11 @@ class StreamableHTTPTransport(MCPTransport):
                 async for chunk in response.aiter_bytes():
                     content += chunk
                 
-                result = json.loads(content.decode('utf-8'))
+                if "text/event-stream" in response.headers.get("content-type", ""):
+                    messages = _parse_sse_messages(content.decode('utf-8'))
+                else:
+                    messages = json.loads(content.decode('utf-8'))
+                result = self._route_messages(messages, request["id"])
                 
                 # Handle JSON-RPC response
                 if "result" in result:
@@ -316,7 +390,7 @@ class StreamableHTTPTransport(MCPTransport):
                 
         except httpx.HTTPError as e:
             logger.error(f"Streamable HTTP request failed: {e}")
-            raise ConnectionError(f"Streamable HTTP request failed: {e}")
+            raise ConnectionError(f"Streamable HTTP request failed: {e}") from e
         except Exception as e:
             logger.error(f"Request failed: {e}")
             raise
@@ -389,7 +463,13 @@ class WebSocketTransport(MCPTransport):
     
     async def connect(self) -> bool:
         try:
-            import websockets
+            try:
+                # websockets >= 13: new asyncio client (the legacy one is deprecated)
+                from websockets.asyncio.client import connect as ws_connect
+                headers_argument = "additional_headers"
+            except ImportError:
+                from websockets import connect as ws_connect
+                headers_argument = "extra_headers"
             
             logger.info(f"Connecting to MCP server via WebSocket: {_sanitize_url(self.config.server_url)}")
             
@@ -399,10 +479,10 @@ class WebSocketTransport(MCPTransport):
             elif self.config.auth_type == AuthType.API_KEY and self.config.auth_token:
                 extra_headers["X-API-Key"] = self.config.auth_token
             
-            self.websocket = await websockets.connect(
+            self.websocket = await ws_connect(
                 self.config.server_url,
-                extra_headers=extra_headers,
-                open_timeout=self.config.timeout
+                open_timeout=self.config.timeout,
+                **{headers_argument: extra_headers}
             )
             
             self.connected = True
@@ -479,6 +559,8 @@ class WebSocketTransport(MCPTransport):
                                 future.set_exception(Exception(data["error"]))
                             else:
                                 future.set_result(data.get("result", {}))
+                    elif "method" in data and self.notification_handler:
+                        self.notification_handler(data)
                     
                 except json.JSONDecodeError:
                     logger.warning(f"Received invalid JSON: {message}")
@@ -509,8 +591,24 @@ class MCPClient:
         self.capabilities: Dict[str, Any] = {}
         self.connected = False
         self.retry_count = 0
+        self.retry_policy = config.retry_policy or RetryPolicy(
+            max_retries=config.max_retries,
+            base_delay=config.retry_delay
+        )
+        self.circuit_breaker = CircuitBreaker(
+            name=_sanitize_url(config.server_url) or config.transport_type.value,
+            failure_threshold=config.circuit_failure_threshold,
+            recovery_timeout=config.circuit_recovery_timeout
+        )
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._discovered: set = set()
+        self._raw_capabilities: Dict[str, List[Dict[str, Any]]] = {}
+        self._discovery_locks = {kind: asyncio.Lock() for kind in _CAPABILITY_KINDS}
+        self._refresh_tasks: set = set()
     
     async def connect(self) -> bool:
+        self._closing = False
         try:
             self.transport = self._create_transport()
             
@@ -520,6 +618,8 @@ class MCPClient:
             if not await self._handshake():
                 return False
             
+            # Warm start: cached listings skip the */list round-trips entirely
+            self._load_capability_cache()
             await self._discover_capabilities()
             
             self.connected = True
@@ -533,6 +633,18 @@ class MCPClient:
             return False
     
     async def disconnect(self) -> None:
+        self._closing = True
+        if self._reconnect_task and not self._reconnect_task.done():
+            self._reconnect_task.cancel()
+            try:
+                await self._reconnect_task
+            except asyncio.CancelledError:
+                pass
+        self._reconnect_task = None
+        
+        for task in list(self._refresh_tasks):
+            task.cancel()
+        
         if self.transport:
             await self.transport.disconnect()
         self.connected = False
@@ -550,7 +662,9 @@ class MCPClient:
         if not transport_class:
             raise ValueError(f"Unsupported transport type: {self.config.transport_type}")
         
-        return transport_class(self.config)
+        transport = transport_class(self.config)
+        transport.notification_handler = self.handle_notification
+        return transport
     
     async def _handshake(self) -> bool:
         try:
@@ -575,95 +689,302 @@ class MCPClient:
             logger.error(f"Handshake failed: {e}")
             return False
     
-    async def _discover_capabilities(self) -> None:
-        try:
-            logger.info("Discovering server capabilities")
-            
-            if self.capabilities.get("tools"):
-                await self._discover_tools()
-            
-            if self.capabilities.get("resources"):
-                await self._discover_resources()
-            
-            if self.capabilities.get("prompts"):
-                await self._discover_prompts()
+    async def _discover_capabilities(self, kinds: Optional[Tuple[str, ...]] = None) -> None:
+        """Discover the given capability kinds (default: ``eager_discovery``) in parallel."""
+        kinds = self.config.eager_discovery if kinds is None else kinds
+        if not kinds:
+            return
+        
+        logger.info(f"Discovering server capabilities: {', '.join(kinds)}")
+        results = await asyncio.gather(
+            *(self._discover(kind) for kind in kinds),
+            return_exceptions=True
+        )
+        
+        for kind, result in zip(kinds, results):
+            if isinstance(result, Exception):
+                logger.error(f"Capability discovery error ({kind}): {result}")
+        
+        logger.info(f"Discovered {len(self.tools)} tools, {len(self.resources)} resources, {len(self.prompts)} prompts")
+    
+    async def discover_tools(self, force: bool = False) -> List[Tool]:
+        """List tools, fetching them from the server on first use (or when ``force`` is set)."""
+        await self._discover("tools", force=force)
+        return self.list_tools()
+    
+    async def discover_resources(self, force: bool = False) -> List[Resource]:
+        """List resources, fetching them from the server on first use (or when ``force`` is set)."""
+        await self._discover("resources", force=force)
+        return self.list_resources()
+    
+    async def discover_prompts(self, force: bool = False) -> List[Prompt]:
+        """List prompts, fetching them from the server on first use (or when ``force`` is set)."""
+        await self._discover("prompts", force=force)
+        return self.list_prompts()
+    
+    async def _discover(self, kind: str, force: bool = False) -> None:
+        if kind not in _CAPABILITY_KINDS:
+            raise ValueError(f"Unknown capability kind: {kind}")
+        
+        if kind in self._discovered and not force:
+            return
+        
+        async with self._discovery_locks[kind]:
+            # Another caller may have finished discovery while we waited
+            if kind in self._discovered and not force:
+                return
             
-            logger.info(f"Discovered {len(self.tools)} tools, {len(self.resources)} resources, {len(self.prompts)} prompts")
+            if kind not in self.capabilities:
+                logger.debug(f"Server does not advertise {kind}; skipping discovery")
+                self._apply_capability(kind, [])
+                return
             
-        except Exception as e:
-            logger.error(f"Capability discovery error: {e}")
+            method, key = _CAPABILITY_KINDS[kind]
+            response = await self.transport.send_request(method, {})
+            self._apply_capability(kind, response.get(key, []))
+            self._save_capability_cache()
+            logger.info(f"Discovered {len(self._raw_capabilities[kind])} {kind}")
     
-    async def _discover_tools(self) -> None:
-        try:
-            response = await self.transport.send_request("tools/list", {})
-            tools_data = response.get("tools", [])
-            
-            for tool_data in tools_data:
-                tool = Tool(
-                    name=tool_data["name"],
-                    description=tool_data.get("description", ""),
-                    parameters=tool_data.get("inputSchema", {}),
-                    metadata=tool_data.get("metadata")
+    def _apply_capability(self, kind: str, items: List[Dict[str, Any]]) -> None:
+        if kind == "tools":
+            self.tools = {
+                item["name"]: Tool(
+                    name=item["name"],
+                    description=item.get("description", ""),
+                    parameters=item.get("inputSchema", {}),
+                    metadata=item.get("metadata"),
+                    annotations=item.get("annotations")
                 )
-                self.tools[tool.name] = tool
-            
-            logger.info(f"Discovered {len(self.tools)} tools")
-            
-        except Exception as e:
-            logger.error(f"Tool discovery error: {e}")
+                for item in items
+            }
+        elif kind == "resources":
+            self.resources = {
+                item["uri"]: Resource(
+                    uri=item["uri"],
+                    name=item["name"],
+                    description=item.get("description"),
+                    mime_type=item.get("mimeType"),
+                    metadata=item.get("metadata")
+                )
+                for item in items
+            }
+        else:
+            self.prompts = {
+                item["name"]: Prompt(
+                    name=item["name"],
+                    description=item.get("description", ""),
+                    parameters=item.get("arguments")
+                )
+                for item in items
+            }
+        
+        self._raw_capabilities[kind] = items
+        self._discovered.add(kind)
+    
+    def _capability_cache_path(self) -> Optional[Path]:
+        """Cache file for this server, keyed by URL and serverInfo name/version."""
+        if not self.config.capability_cache_dir or not self.server_info:
+            return None
+        
+        key_material = "\x00".join([
+            self.config.server_url or self.config.transport_type.value,
+            str(self.server_info.get("name", "")),
+            str(self.server_info.get("version", ""))
+        ])
+        digest = hashlib.sha256(key_material.encode("utf-8")).hexdigest()
+        return Path(self.config.capability_cache_dir) / f"{digest}.json"
     
-    async def _discover_resources(self) -> None:
+    def _load_capability_cache(self) -> None:
+        path = self._capability_cache_path()
+        if path is None:
+            return
+        
         try:
-            response = await self.transport.send_request("resources/list", {})
-            resources_data = response.get("resources", [])
-            
-            for resource_data in resources_data:
-                resource = Resource(
-                    uri=resource_data["uri"],
-                    name=resource_data["name"],
-                    description=resource_data.get("description"),
-                    mime_type=resource_data.get("mimeType"),
-                    metadata=resource_data.get("metadata")
-                )
-                self.resources[resource.uri] = resource
-            
-            logger.info(f"Discovered {len(self.resources)} resources")
-            
+            with open(path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            for kind, items in cached.items():
+                if kind in _CAPABILITY_KINDS:
+                    self._apply_capability(kind, items)
+            logger.info(f"Loaded cached capabilities: {', '.join(sorted(cached))}")
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Discarding unreadable capability cache {path.name}: {e}")
+    
+    def _save_capability_cache(self) -> None:
+        path = self._capability_cache_path()
+        if path is None:
+            return
+        
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._raw_capabilities, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError) as e:
+            logger.warning(f"Failed to persist capability cache {path.name}: {e}")
+    
+    def handle_notification(self, message: Dict[str, Any]) -> None:
+        """
+        Handle a server-initiated notification.
+        
+        ``notifications/{tools,resources,prompts}/list_changed`` drop the cached
+        listing (in memory and on disk) and refresh it in the background.
+        """
+        method = message.get("method", "")
+        parts = method.split("/")
+        if len(parts) != 3 or parts[0] != "notifications" or parts[2] != "list_changed":
+            logger.debug(f"Ignoring notification: {method}")
+            return
+        
+        kind = parts[1]
+        if kind not in _CAPABILITY_KINDS:
+            return
+        
+        logger.info(f"Server {kind} changed, invalidating cached listing")
+        self._discovered.discard(kind)
+        self._raw_capabilities.pop(kind, None)
+        self._save_capability_cache()
+        
+        if self.connected:
+            task = asyncio.create_task(self._refresh_capability(kind))
+            self._refresh_tasks.add(task)
+            task.add_done_callback(self._refresh_tasks.discard)
+    
+    async def _refresh_capability(self, kind: str) -> None:
+        try:
+            await self._discover(kind, force=True)
         except Exception as e:
-            logger.error(f"Resource discovery error: {e}")
+            logger.error(f"Failed to refresh {kind} after list_changed: {e}")
     
-    async def _discover_prompts(self) -> None:
+    async def _send_with_retry(self, method: str, params: Dict[str, Any], idempotent: bool) -> Dict[str, Any]:
+        if not self.circuit_breaker.allow_request():
+            raise CircuitOpenError(
+                f"Circuit open for MCP server {self.circuit_breaker.name}; "
+                f"retry in {self.circuit_breaker.retry_after():.1f}s"
+            )
+        
         try:
-            response = await self.transport.send_request("prompts/list", {})
-            prompts_data = response.get("prompts", [])
-            
-            for prompt_data in prompts_data:
-                prompt = Prompt(
-                    name=prompt_data["name"],
-                    description=prompt_data.get("description", ""),
-                    parameters=prompt_data.get("arguments")
-                )
-                self.prompts[prompt.name] = prompt
-            
-            logger.info(f"Discovered {len(self.prompts)} prompts")
+            response = await self.retry_policy.run(
+                lambda: self.transport.send_request(method, params),
+                idempotent=idempotent,
+                description=method
+            )
+        except asyncio.CancelledError:
+            # No verdict on server health; hand a half-open probe slot back
+            self.circuit_breaker.release()
+            raise
+        except Exception as e:
+            # Only transport-level failures count against the server; anything
+            # else (JSON-RPC errors, 4xx) means it answered, so it is up
+            if is_retryable_error(e):
+                self.circuit_breaker.record_failure()
+                if self.circuit_breaker.state == CircuitState.OPEN:
+                    self._schedule_reconnect()
+            else:
+                self.circuit_breaker.record_success()
+            raise
+        
+        self.circuit_breaker.record_success()
+        return response
+    
+    def _schedule_reconnect(self) -> None:
+        """Mark the client disconnected and re-establish the transport in the background."""
+        if not self.config.auto_reconnect or self._closing:
+            return
+        if self._reconnect_task and not self._reconnect_task.done():
+            return
+        
+        self.connected = False
+        logger.warning(f"MCP server {self.circuit_breaker.name} unhealthy, reconnecting in background")
+        self._reconnect_task = asyncio.create_task(self._reconnect_loop())
+    
+    async def _reconnect_loop(self) -> None:
+        attempt = 0
+        while not self._closing:
+            attempt += 1
+            delay = min(self.retry_policy.compute_delay(attempt), self.config.circuit_recovery_timeout)
+            await asyncio.sleep(delay)
             
+            try:
+                if await self._reestablish_transport():
+                    logger.info(f"Reconnected to MCP server after {attempt} attempt(s)")
+                    return
+            except Exception as e:
+                logger.warning(f"Reconnect attempt {attempt} failed: {e}")
+    
+    async def _reestablish_transport(self) -> bool:
+        if self.transport:
+            try:
+                await self.transport.disconnect()
+            except Exception as e:
+                logger.debug(f"Error closing stale transport: {e}")
+        
+        self.transport = self._create_transport()
+        if not await self.transport.connect():
+            return False
+        if not await self._handshake():
+            return False
+        
+        # Previously discovered capabilities stay valid; only rediscover if we never had any
+        if not self.tools and not self.resources and not self.prompts:
+            await self._discover_capabilities()
+        
+        self.connected = True
+        self.circuit_breaker.reset()
+        return True
+    
+    def get_circuit_state(self) -> CircuitState:
+        return self.circuit_breaker.state
+    
+    async def ping(self) -> bool:
+        """Send an MCP ping; returns False instead of raising if the server does not answer."""
+        if not self.connected or not self.transport:
+            return False
+        
+        try:
+            await self._send_with_retry("ping", {}, idempotent=True)
+            return True
         except Exception as e:
-            logger.error(f"Prompt discovery error: {e}")
+            logger.warning(f"Ping failed: {e}")
+            return False
     
-    async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    async def call_tool(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        idempotent: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """
+        Call a tool, retrying transient failures according to the retry policy.
+        
+        Args:
+            tool_name: Name of the tool
+            arguments: Tool arguments
+            idempotent: Whether the call may be repeated safely. Defaults to the
+                tool's readOnlyHint/idempotentHint annotations; non-idempotent
+                calls are only retried if the request never reached the server.
+        """
         if not self.connected:
             raise ConnectionError("Not connected to MCP server")
         
+        if tool_name not in self.tools and "tools" not in self._discovered and self.transport:
+            await self._discover("tools")
+        
         if tool_name not in self.tools:
             raise ValueError(f"Tool '{tool_name}' not found. Available tools: {list(self.tools.keys())}")
         
+        if idempotent is None:
+            idempotent = self.tools[tool_name].idempotent
+        
         try:
             logger.info(f"Calling tool: {tool_name}")
             
-            response = await self.transport.send_request("tools/call", {
+            response = await self._send_with_retry("tools/call", {
                 "name": tool_name,
                 "arguments": arguments
-            })
+            }, idempotent=idempotent)
             
             return response
             
@@ -678,9 +999,9 @@ class MCPClient:
         try:
             logger.info(f"Getting resource: {uri}")
             
-            response = await self.transport.send_request("resources/read", {
+            response = await self._send_with_retry("resources/read", {
                 "uri": uri
-            })
+            }, idempotent=True)
             
             return response
             
@@ -692,6 +1013,9 @@ class MCPClient:
         if not self.connected:
             raise ConnectionError("Not connected to MCP server")
         
+        if name not in self.prompts and "prompts" not in self._discovered and self.transport:
+            await self._discover("prompts")
+        
         if name not in self.prompts:
             raise ValueError(f"Prompt '{name}' not found. Available prompts: {list(self.prompts.keys())}")
         
@@ -702,7 +1026,7 @@ class MCPClient:
             if arguments:
                 params["arguments"] = arguments
             
-            response = await self.transport.send_request("prompts/get", params)
+            response = await self._send_with_retry("prompts/get", params, idempotent=True)
             
             return response
             
@@ -736,7 +1060,7 @@ class MCPClient:
         self.retry_count += 1
         logger.info(f"Attempting reconnection {self.retry_count}/{self.config.max_retries}")
         
-        await asyncio.sleep(self.config.retry_delay * self.retry_count)
+        await asyncio.sleep(self.retry_policy.compute_delay(self.retry_count))
         
         await self.connect()
     
@@ -760,8 +1084,29 @@ async def create_mcp_client(
     transport_type: TransportType = TransportType.HTTP_SSE,
     auth_token: Optional[str] = None,
     auth_type: AuthType = AuthType.NONE,
+    pooled: bool = False,
     **kwargs
 ) -> MCPClient:
+    """
+    Create and connect an MCP client.
+    
+    Extra keyword arguments are passed to MCPConfig; e.g. ``eager_discovery=("tools",)``
+    only lists tools on connect and leaves resources/prompts to lazy discovery.
+    
+    With ``pooled=True`` the client comes from the process-wide connection pool
+    and must be handed back with ``get_connection_pool().release(client)``
+    instead of being disconnected.
+    """
+    if pooled:
+        from ai_navigator.mcp_pool import get_connection_pool
+        return await get_connection_pool().acquire(
+            server_url,
+            transport_type=transport_type,
+            auth_token=auth_token,
+            auth_type=auth_type,
+            **kwargs
+        )
+    
     config = MCPConfig(
         server_url=server_url,
         transport_type=transport_type,
@@ -10,30 +10,127 @@ This MCP server provides tools for file system operations including:
 - Deleting files
 - Moving files
 - Copying files
+- Searching file contents
+- Running batches of file operations, optionally all-or-nothing
+- Hashing files and detecting changed files
+- Creating and extracting zip / tar.gz / tar.zst archives
+- Watching paths for changes (notifications/message, logger "file-watch")
 
 Following the Model Context Protocol (MCP) specification.
 """
 
 import asyncio
+import base64
+import codecs
+import fnmatch
+import functools
+import itertools
 import json
+import mmap
 import os
+import re
 import shutil
+import stat
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 from mcp.server.models import InitializationOptions
 from mcp.server import NotificationOptions, Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
 
+try:
+    from ai_navigator.file_index import HASH_ALGORITHMS, FileIndex, create_file_index_from_env, hash_file
+except ImportError:
+    # Launched as a script without the package installed
+    from file_index import HASH_ALGORITHMS, FileIndex, create_file_index_from_env, hash_file
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
 server = Server("file-operations")
 
+# Optional index of configured roots (MCP_FILE_INDEX_ROOTS); set up in main()
+_file_index: FileIndex | None = None
+
+# Upper bound on the bytes returned by one read_file call; larger reads come back truncated
+DEFAULT_MAX_READ_BYTES = int(os.getenv("MCP_FILE_MAX_READ_BYTES", str(1024 * 1024)))
+# Default page size for list_directory
+DEFAULT_MAX_LIST_ENTRIES = int(os.getenv("MCP_FILE_MAX_LIST_ENTRIES", "1000"))
+# Bounded pool for blocking filesystem calls, so the stdio loop keeps reading requests
+FILE_IO_WORKERS = int(os.getenv("MCP_FILE_IO_WORKERS", "4"))
+_io_executor = ThreadPoolExecutor(max_workers=FILE_IO_WORKERS, thread_name_prefix="mcp-file-io")
+# Minimum seconds between progress notifications for one operation
+PROGRESS_INTERVAL = 0.5
+# write_file writes (and checks for cancellation) in chunks of this many characters
+WRITE_CHUNK_SIZE = 1024 * 1024
+# batch_operations: path arguments each operation reads and writes, used to order conflicting operations
+BATCH_OPERATIONS = {
+    "write_file": ((), ("path",)),
+    "create_directory": ((), ("path",)),
+    "delete_file": ((), ("path",)),
+    "copy_file": (("source",), ("destination",)),
+    "move_file": ((), ("source", "destination")),
+}
+# archive_create/archive_extract: file name suffixes per format, and the
+# leading bytes archive_extract uses to recognise a format
+ARCHIVE_FORMATS = {
+    "zip": (".zip",),
+    "tar.gz": (".tar.gz", ".tgz"),
+    "tar.zst": (".tar.zst", ".tzst"),
+}
+ARCHIVE_MAGIC = (
+    (b"PK\x03\x04", "zip"),
+    (b"PK\x05\x06", "zip"),
+    (b"\x1f\x8b", "tar.gz"),
+    (b"\x28\xb5\x2f\xfd", "tar.zst"),
+)
+# Archive members are streamed through buffers of this many bytes
+ARCHIVE_CHUNK_SIZE = 1024 * 1024
+# Path arguments written by tools outside BATCH_OPERATIONS, so the file index can be told about them
+INDEX_WRITES = {
+    "archive_create": ("destination",),
+    "archive_extract": ("destination",),
+}
+# Cached content hashes, keyed by (path, size, mtime, algorithm)
+HASH_CACHE_SIZE = int(os.getenv("MCP_FILE_HASH_CACHE_SIZE", "10000"))
+# watch_path: notification logger name, polling interval without watchdog, and limits
+WATCH_LOGGER = "file-watch"
+WATCH_POLL_INTERVAL = 1.0
+MAX_WATCHES = 64
+# A busy path is flushed at least this many debounce intervals after its first change
+WATCH_MAX_DELAY_FACTOR = 10
+# search_files: worker threads, files skipped above this size, and per-line text cap
+SEARCH_WORKERS = 8
+DEFAULT_MAX_SEARCH_FILE_SIZE = 10 * 1024 * 1024
+MAX_MATCH_LINE_LENGTH = 500
+# Files with a NUL byte in their first block are treated as binary
+BINARY_SNIFF_BYTES = 8192
+# Files at least this large are memory-mapped so only the requested window is paged in
+MMAP_THRESHOLD = 4 * 1024 * 1024
+
 @server.list_tools()
 async def handle_list_tools() -> list[Tool]:
     """List available file operation tools."""
     return [
         Tool(
             name="read_file",
-            description="Read contents of a file",
+            description="Read contents of a file, optionally only a byte or line range",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -43,8 +140,34 @@ async def handle_list_tools() -> list[Tool]:
                     },
                     "encoding": {
                         "type": "string",
-                        "description": "File encoding (default: utf-8)",
+                        "description": "File encoding (default: utf-8); use \"base64\" to read binary files",
                         "default": "utf-8"
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Byte offset to start reading from (default: 0)",
+                        "minimum": 0,
+                        "default": 0
+                    },
+                    "length": {
+                        "type": "integer",
+                        "description": "Maximum number of bytes to read from offset (default: to end of file)",
+                        "minimum": 0
+                    },
+                    "start_line": {
+                        "type": "integer",
+                        "description": "First line to read, 1-based (cannot be combined with offset/length)",
+                        "minimum": 1
+                    },
+                    "end_line": {
+                        "type": "integer",
+                        "description": "Last line to read, inclusive (default: to end of file)",
+                        "minimum": 1
+                    },
+                    "max_bytes": {
+                        "type": "integer",
+                        "description": f"Cap on bytes returned; longer ranges are truncated (default: {DEFAULT_MAX_READ_BYTES})",
+                        "minimum": 1
                     }
                 },
                 "required": ["path"]
@@ -73,6 +196,26 @@ async def handle_list_tools() -> list[Tool]:
                         "type": "boolean",
                         "description": "Append to file instead of overwriting (default: false)",
                         "default": False
+                    },
+                    "atomic": {
+                        "type": "boolean",
+                        "description": "Write to a temporary file and rename it over the target, so readers "
+                                       "never see partial content (default: true; ignored when appending)",
+                        "default": True
+                    },
+                    "fsync": {
+                        "type": "boolean",
+                        "description": "Flush the data to disk before returning (default: false)",
+                        "default": False
+                    },
+                    "expected_mtime": {
+                        "type": "number",
+                        "description": "Only write if the file's current modification time (as returned by "
+                                       "file_info or a previous write) equals this value"
+                    },
+                    "expected_hash": {
+                        "type": "string",
+                        "description": "Only write if the BLAKE2b-256 hash of the file's current content equals this value"
                     }
                 },
                 "required": ["path", "content"]
@@ -80,7 +223,7 @@ async def handle_list_tools() -> list[Tool]:
         ),
         Tool(
             name="list_directory",
-            description="List contents of a directory",
+            description="List contents of a directory, one page at a time",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -97,6 +240,24 @@ async def handle_list_tools() -> list[Tool]:
                         "type": "boolean",
                         "description": "Include hidden files (default: false)",
                         "default": False
+                    },
+                    "max_depth": {
+                        "type": "integer",
+                        "description": "Levels to descend when recursive, 1 = direct children only (default: unlimited)",
+                        "minimum": 1
+                    },
+                    "pattern": {
+                        "type": "string",
+                        "description": "Only return entries whose name matches this glob, e.g. \"*.py\""
+                    },
+                    "max_entries": {
+                        "type": "integer",
+                        "description": f"Maximum entries per page (default: {DEFAULT_MAX_LIST_ENTRIES})",
+                        "minimum": 1
+                    },
+                    "cursor": {
+                        "type": "string",
+                        "description": "next_cursor from a previous call, to fetch the following page"
                     }
                 },
                 "required": ["path"]
@@ -194,8 +355,1673 @@ async def handle_list_tools() -> list[Tool]:
                 },
                 "required": ["path"]
             }
+        ),
+        Tool(
+            name="search_files",
+            description="Search file contents under a directory and return only the matching lines",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "path": {
+                        "type": "string",
+                        "description": "Directory (searched recursively) or file to search"
+                    },
+                    "query": {
+                        "type": "string",
+                        "description": "Text or regular expression to search for"
+                    },
+                    "regex": {
+                        "type": "boolean",
+                        "description": "Treat query as a regular expression (default: false)",
+                        "default": False
+                    },
+                    "case_sensitive": {
+                        "type": "boolean",
+                        "description": "Match case (default: true)",
+                        "default": True
+                    },
+                    "pattern": {
+                        "type": "string",
+                        "description": "Only search files whose name matches this glob, e.g. \"*.py\""
+                    },
+                    "include_hidden": {
+                        "type": "boolean",
+                        "description": "Search hidden files and directories (default: false)",
+                        "default": False
+                    },
+                    "context_lines": {
+                        "type": "integer",
+                        "description": "Lines of context to include before and after each match (default: 0)",
+                        "minimum": 0,
+                        "default": 0
+                    },
+                    "max_results": {
+                        "type": "integer",
+                        "description": "Maximum number of matches to return (default: 100)",
+                        "minimum": 1,
+                        "default": 100
+                    },
+                    "max_file_size": {
+                        "type": "integer",
+                        "description": f"Skip files larger than this many bytes (default: {DEFAULT_MAX_SEARCH_FILE_SIZE})",
+                        "minimum": 1
+                    }
+                },
+                "required": ["path", "query"]
+            }
+        ),
+        Tool(
+            name="file_hash",
+            description="Compute content hashes of one or more files (cached while a file's size and mtime are unchanged)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "paths": {
+                        "type": "array",
+                        "description": "Files to hash",
+                        "items": {"type": "string"},
+                        "minItems": 1
+                    },
+                    "algorithm": {
+                        "type": "string",
+                        "description": "Hash algorithm (default: blake2b, 256-bit)",
+                        "enum": list(HASH_ALGORITHMS),
+                        "default": "blake2b"
+                    }
+                },
+                "required": ["paths"]
+            }
+        ),
+        Tool(
+            name="files_changed_since",
+            description=(
+                "Find changed files without reading them: either compare files against previously "
+                "returned hashes (known), or list files under a directory modified after a time (since)"
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "known": {
+                        "type": "object",
+                        "description": "Map of file path to the hash the client already has",
+                        "additionalProperties": {"type": "string"}
+                    },
+                    "algorithm": {
+                        "type": "string",
+                        "description": "Algorithm the known hashes were computed with (default: blake2b)",
+                        "enum": list(HASH_ALGORITHMS),
+                        "default": "blake2b"
+                    },
+                    "path": {
+                        "type": "string",
+                        "description": "Directory to scan recursively (with since)"
+                    },
+                    "since": {
+                        "type": "number",
+                        "description": "Epoch seconds; files modified later than this are returned (with path)"
+                    },
+                    "include_hidden": {
+                        "type": "boolean",
+                        "description": "Include hidden files when scanning path (default: false)",
+                        "default": False
+                    },
+                    "max_entries": {
+                        "type": "integer",
+                        "description": f"Maximum files to return when scanning path (default: {DEFAULT_MAX_LIST_ENTRIES})",
+                        "minimum": 1
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="archive_create",
+            description="Pack a file or directory into a zip, tar.gz or tar.zst archive",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "source": {
+                        "type": "string",
+                        "description": "File or directory to archive; it becomes the top-level entry"
+                    },
+                    "destination": {
+                        "type": "string",
+                        "description": "Archive file to create"
+                    },
+                    "format": {
+                        "type": "string",
+                        "enum": list(ARCHIVE_FORMATS),
+                        "description": "Archive format (default: taken from the destination suffix)"
+                    },
+                    "compression_level": {
+                        "type": "integer",
+                        "description": "Compression level (zip/tar.gz: 0-9, tar.zst: 1-22)"
+                    },
+                    "include_hidden": {
+                        "type": "boolean",
+                        "description": "Include hidden files (default: true)",
+                        "default": True
+                    }
+                },
+                "required": ["source", "destination"]
+            }
+        ),
+        Tool(
+            name="archive_extract",
+            description="Extract a zip, tar.gz or tar.zst archive into a directory",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "path": {
+                        "type": "string",
+                        "description": "Archive file to extract"
+                    },
+                    "destination": {
+                        "type": "string",
+                        "description": "Directory to extract into (created if missing)"
+                    },
+                    "overwrite": {
+                        "type": "boolean",
+                        "description": "Replace files that already exist (default: false)",
+                        "default": False
+                    }
+                },
+                "required": ["path", "destination"]
+            }
+        ),
+        Tool(
+            name="watch_path",
+            description=(
+                "Watch a file or directory and receive debounced change notifications "
+                "(notifications/message with logger \"file-watch\") until unwatch_path is called"
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "path": {
+                        "type": "string",
+                        "description": "File or directory to watch"
+                    },
+                    "recursive": {
+                        "type": "boolean",
+                        "description": "Include changes in subdirectories (default: true)",
+                        "default": True
+                    },
+                    "include_hidden": {
+                        "type": "boolean",
+                        "description": "Report changes to hidden files (default: false)",
+                        "default": False
+                    },
+                    "pattern": {
+                        "type": "string",
+                        "description": "Only report files whose name matches this glob"
+                    },
+                    "debounce": {
+                        "type": "number",
+                        "description": "Seconds of quiet before a batch of changes is sent (default: 0.5)",
+                        "minimum": 0,
+                        "default": 0.5
+                    }
+                },
+                "required": ["path"]
+            }
+        ),
+        Tool(
+            name="unwatch_path",
+            description="Stop a watch created by watch_path",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "watch_id": {
+                        "type": "string",
+                        "description": "Identifier returned by watch_path"
+                    }
+                },
+                "required": ["watch_id"]
+            }
+        ),
+        Tool(
+            name="batch_operations",
+            description=(
+                "Run a list of write_file, create_directory, delete_file, copy_file and move_file "
+                "operations in one call. Operations on unrelated paths run concurrently; operations "
+                "touching the same paths run in list order."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "operations": {
+                        "type": "array",
+                        "description": "Operations to run; each has an \"op\" tool name plus that tool's arguments",
+                        "minItems": 1,
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "op": {
+                                    "type": "string",
+                                    "enum": list(BATCH_OPERATIONS)
+                                }
+                            },
+                            "required": ["op"]
+                        }
+                    },
+                    "atomic": {
+                        "type": "boolean",
+                        "description": "All or nothing: on any failure, restore every affected path (default: false)",
+                        "default": False
+                    }
+                },
+                "required": ["operations"]
+            }
+        )
+    ]
+
+def _locate_lines(buffer, file_size: int, start_line: int, end_line: int | None) -> tuple[int, int]:
+    """Byte span covering lines start_line..end_line (1-based, inclusive)."""
+    start = 0
+    for _ in range(start_line - 1):
+        newline = buffer.find(b"\n", start)
+        if newline == -1:
+            return file_size, file_size
+        start = newline + 1
+    
+    if end_line is None:
+        return start, file_size
+    
+    end = start
+    for _ in range(end_line - start_line + 1):
+        newline = buffer.find(b"\n", end)
+        if newline == -1:
+            return start, file_size
+        end = newline + 1
+    return start, end
+
+
+def _read_file_window(
+    path: str,
+    encoding: str = "utf-8",
+    offset: int | None = None,
+    length: int | None = None,
+    start_line: int | None = None,
+    end_line: int | None = None,
+    max_bytes: int = DEFAULT_MAX_READ_BYTES
+) -> dict[str, Any]:
+    """
+    Read a byte or line range of a file, returning at most max_bytes.
+    
+    Large files are memory-mapped, so only the pages backing the requested
+    window are read. Text reads never split a multi-byte character; the
+    returned ``next_offset`` continues exactly where this read stopped.
+    """
+    if start_line is not None or end_line is not None:
+        if offset is not None or length is not None:
+            raise ValueError("offset/length cannot be combined with start_line/end_line")
+        start_line = start_line or 1
+        if end_line is not None and end_line < start_line:
+            raise ValueError("end_line must not be before start_line")
+    if (offset is not None and offset < 0) or (length is not None and length < 0):
+        raise ValueError("offset and length must not be negative")
+    if max_bytes < 1:
+        raise ValueError("max_bytes must be positive")
+    
+    file_size = os.path.getsize(path)
+    
+    with open(path, "rb") as f:
+        use_mmap = file_size >= MMAP_THRESHOLD
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if use_mmap else None
+        try:
+            if start_line is not None:
+                if buffer is None:
+                    buffer = f.read()
+                start, end = _locate_lines(buffer, file_size, start_line, end_line)
+            else:
+                start = min(offset or 0, file_size)
+                end = file_size if length is None else min(file_size, start + length)
+            
+            count = min(end - start, max_bytes)
+            if use_mmap or isinstance(buffer, bytes):
+                data = bytes(buffer[start:start + count])
+            else:
+                f.seek(start)
+                data = f.read(count)
+        finally:
+            if use_mmap:
+                buffer.close()
+    
+    if encoding == "base64":
+        content = base64.b64encode(data).decode("ascii")
+        consumed = len(data)
+    else:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        # A character split by the window edge is left for the next read, except at end of file
+        content = decoder.decode(data, final=start + len(data) >= file_size)
+        consumed = len(data) - len(decoder.getstate()[0])
+    
+    truncated = start + consumed < end
+    result = {
+        "content": content,
+        "size": len(content),
+        "encoding": encoding,
+        "file_size": file_size,
+        "offset": start,
+        "bytes_read": consumed,
+        "truncated": truncated
+    }
+    if truncated:
+        result["next_offset"] = start + consumed
+    return result
+
+
+class OperationCancelled(Exception):
+    """Raised in a worker thread once the request that started the operation was cancelled."""
+
+
+class _FileProgress:
+    """
+    Cancellation flag and throttled MCP progress notifications for one
+    blocking operation.
+    
+    Worker threads call ``advance`` between steps; it raises
+    OperationCancelled once the request is cancelled. Notifications are only
+    sent when the client supplied a progress token.
+    """
+    
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop | None = None,
+        session: Any = None,
+        progress_token: str | int | None = None,
+        total: float | None = None,
+        interval: float = PROGRESS_INTERVAL
+    ):
+        self.loop = loop
+        self.session = session
+        self.progress_token = progress_token
+        self.total = total
+        self.interval = interval
+        self.completed = 0.0
+        self.cancelled = threading.Event()
+        self._last_sent = 0.0
+    
+    @classmethod
+    def for_current_request(cls, total: float | None = None) -> "_FileProgress":
+        """Progress tracker bound to the MCP request being handled, if any."""
+        try:
+            context = server.request_context
+        except LookupError:
+            return cls(total=total)
+        
+        token = context.meta.progressToken if context.meta else None
+        return cls(asyncio.get_running_loop(), context.session, token, total)
+    
+    @property
+    def reporting(self) -> bool:
+        return self.session is not None and self.progress_token is not None
+    
+    def check(self) -> None:
+        if self.cancelled.is_set():
+            raise OperationCancelled()
+    
+    def advance(self, amount: float = 1) -> None:
+        self.check()
+        self.completed += amount
+        if not self.reporting:
+            return
+        
+        now = time.monotonic()
+        finished = self.total is not None and self.completed >= self.total
+        if finished or now - self._last_sent >= self.interval:
+            self._last_sent = now
+            asyncio.run_coroutine_threadsafe(
+                self.session.send_progress_notification(self.progress_token, self.completed, self.total),
+                self.loop
+            )
+
+
+async def _run_blocking(func, *args: Any, progress: _FileProgress | None = None, **kwargs: Any) -> Any:
+    """
+    Run a blocking filesystem call on the bounded I/O pool.
+    
+    If the awaiting request is cancelled, the operation is told to stop at
+    its next checkpoint and the cancellation propagates once it has stopped,
+    so a cancelled copy or delete never keeps running in the background.
+    """
+    if progress is not None:
+        kwargs["progress"] = progress
+    future = asyncio.get_running_loop().run_in_executor(_io_executor, functools.partial(func, *args, **kwargs))
+    
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        if progress is not None:
+            progress.cancelled.set()
+        try:
+            await future
+        except Exception:
+            pass
+        raise
+
+
+def _count_files(path: str) -> int:
+    if not os.path.isdir(path):
+        return 1
+    return sum(len(files) for _, _, files in os.walk(path))
+
+
+class _HashCache:
+    """Thread-safe LRU of content hashes; a changed size or mtime misses naturally."""
+    
+    def __init__(self, max_entries: int = HASH_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, str] = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: tuple) -> str | None:
+        with self._lock:
+            digest = self._entries.get(key)
+            if digest is not None:
+                self._entries.move_to_end(key)
+            return digest
+    
+    def put(self, key: tuple, digest: str) -> None:
+        with self._lock:
+            self._entries[key] = digest
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_hash_cache = _HashCache()
+
+
+def _cached_hash(path: str, algorithm: str = "blake2b") -> tuple[str, os.stat_result, bool]:
+    """
+    Hash a file, reusing earlier results while its size and mtime are unchanged.
+    
+    Returns:
+        (hex digest, stat result, whether the digest came from a cache)
+    """
+    if algorithm not in HASH_ALGORITHMS:
+        raise ValueError(f"Unsupported hash algorithm: {algorithm}")
+    
+    file_stat = os.stat(path)
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise ValueError(f"Not a file: {path}")
+    
+    key = (os.path.abspath(path), file_stat.st_size, file_stat.st_mtime_ns, algorithm)
+    digest = _hash_cache.get(key)
+    if digest is not None:
+        return digest, file_stat, True
+    
+    index = _file_index
+    if index is not None and algorithm == "blake2b":
+        entry = index.get(path)
+        if (entry is not None and entry.content_hash
+                and (entry.size, entry.mtime_ns) == (file_stat.st_size, file_stat.st_mtime_ns)):
+            _hash_cache.put(key, entry.content_hash)
+            return entry.content_hash, file_stat, True
+    
+    digest = hash_file(path, algorithm)
+    # Only cache if the file did not change while it was being read
+    after = os.stat(path)
+    if (after.st_size, after.st_mtime_ns) == (file_stat.st_size, file_stat.st_mtime_ns):
+        _hash_cache.put(key, digest)
+    return digest, file_stat, False
+
+
+def _files_modified_since(
+    path: str,
+    since: float,
+    include_hidden: bool = False,
+    max_entries: int = DEFAULT_MAX_LIST_ENTRIES,
+    index: FileIndex | None = None
+) -> dict[str, Any]:
+    """Files under path whose modification time is later than since (epoch seconds)."""
+    changed = []
+    truncated = False
+    
+    if index is not None:
+        source = (
+            (os.path.join(path, relative), entry.size, entry.mtime)
+            for entry, relative in index.iter_tree(path, recursive=True, include_hidden=include_hidden)
+            if not entry.is_dir
+        )
+    else:
+        def scan() -> Iterator[tuple[str, int, float]]:
+            for entry, _ in _scan_directory(path, recursive=True, include_hidden=include_hidden, max_depth=None):
+                try:
+                    if entry.is_file():
+                        entry_stat = entry.stat()
+                        yield entry.path, entry_stat.st_size, entry_stat.st_mtime
+                except OSError:
+                    continue
+        source = scan()
+    
+    for file_path, size, mtime in source:
+        if mtime <= since:
+            continue
+        if len(changed) == max_entries:
+            truncated = True
+            break
+        changed.append({"path": file_path, "size": size, "modified": mtime})
+    
+    return {"changed": changed, "count": len(changed), "truncated": truncated}
+
+
+class WriteConflict(Exception):
+    """The file changed since the caller read it (expected_mtime/expected_hash mismatch)."""
+
+
+# Serializes compare-and-swap writers to the same path within this server. A
+# fixed set of locks striped by path hash, so memory does not grow with the
+# number of paths written; unrelated paths only rarely share a lock.
+WRITE_LOCK_STRIPES = 64
+_write_locks = [threading.Lock() for _ in range(WRITE_LOCK_STRIPES)]
+
+
+def _write_lock(path: str) -> threading.Lock:
+    return _write_locks[hash(os.path.abspath(path)) % WRITE_LOCK_STRIPES]
+
+
+def _check_expected(path: str, expected_mtime: float | None, expected_hash: str | None) -> None:
+    if expected_mtime is None and expected_hash is None:
+        return
+    
+    try:
+        current_mtime = os.stat(path).st_mtime
+    except FileNotFoundError:
+        raise WriteConflict(f"File no longer exists: {path}")
+    
+    if expected_mtime is not None and current_mtime != expected_mtime:
+        raise WriteConflict(f"File was modified (mtime {current_mtime}, expected {expected_mtime}): {path}")
+    if expected_hash is not None and _cached_hash(path)[0] != expected_hash:
+        raise WriteConflict(f"File content changed (hash mismatch): {path}")
+
+
+def _fsync_directory(directory: str) -> None:
+    """Persist a rename; directories cannot be opened for fsync on every platform."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _write_file(
+    path: str,
+    content: str,
+    encoding: str,
+    append: bool,
+    progress: _FileProgress,
+    atomic: bool = True,
+    fsync: bool = False,
+    expected_mtime: float | None = None,
+    expected_hash: str | None = None
+) -> float:
+    """
+    Write or append text to a file, returning its new modification time.
+    
+    Overwrites go to a temporary file in the same directory that is renamed
+    over the target, so readers see either the old or the new content and a
+    crash never leaves a truncated file. Appends use O_APPEND, so concurrent
+    appenders never overwrite each other. The expected_* checks run right
+    before the rename/append while holding the path's write lock.
+    """
+    if os.path.islink(path):
+        path = os.path.realpath(path)
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    lock = _write_lock(path)
+    
+    if append:
+        encoder = codecs.getincrementalencoder(encoding)()
+        with lock:
+            _check_expected(path, expected_mtime, expected_hash)
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)
+            try:
+                # Progress counts characters, like the other write paths
+                for start in range(0, len(content), WRITE_CHUNK_SIZE):
+                    text = content[start:start + WRITE_CHUNK_SIZE]
+                    final = start + WRITE_CHUNK_SIZE >= len(content)
+                    chunk = memoryview(encoder.encode(text, final=final))
+                    while chunk:
+                        chunk = chunk[os.write(fd, chunk):]
+                    progress.advance(len(text))
+                if fsync:
+                    os.fsync(fd)
+            finally:
+                os.close(fd)
+            return os.stat(path).st_mtime
+    
+    if not atomic:
+        with lock:
+            _check_expected(path, expected_mtime, expected_hash)
+            with open(path, 'w', encoding=encoding) as f:
+                for start in range(0, len(content), WRITE_CHUNK_SIZE):
+                    chunk = content[start:start + WRITE_CHUNK_SIZE]
+                    f.write(chunk)
+                    progress.advance(len(chunk))
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            return os.stat(path).st_mtime
+    
+    temp_path = os.path.join(directory, f".{os.path.basename(path)}.{os.urandom(4).hex()}.tmp")
+    # O_EXCL with mode 0o666 gives the new file the same umask-based permissions as open(path, 'w')
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with open(fd, 'w', encoding=encoding) as f:
+            for start in range(0, len(content), WRITE_CHUNK_SIZE):
+                chunk = content[start:start + WRITE_CHUNK_SIZE]
+                f.write(chunk)
+                progress.advance(len(chunk))
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        
+        with lock:
+            _check_expected(path, expected_mtime, expected_hash)
+            try:
+                os.chmod(temp_path, stat.S_IMODE(os.stat(path).st_mode))
+            except FileNotFoundError:
+                pass
+            os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    
+    if fsync:
+        _fsync_directory(directory)
+    return os.stat(path).st_mtime
+
+
+def _delete_path(path: str, recursive: bool, progress: _FileProgress) -> None:
+    """Delete a file or directory, reporting one step per removed file."""
+    if not os.path.isdir(path) or os.path.islink(path):
+        os.remove(path)
+        return
+    
+    if not recursive:
+        os.rmdir(path)
+        return
+    
+    if progress.reporting:
+        progress.total = _count_files(path)
+    
+    for root, dirs, files in os.walk(path, topdown=False):
+        for name in files:
+            progress.check()
+            os.remove(os.path.join(root, name))
+            progress.advance()
+        for name in dirs:
+            full_path = os.path.join(root, name)
+            # Symlinked directories are listed but not walked; remove the link itself
+            if os.path.islink(full_path):
+                os.remove(full_path)
+            else:
+                os.rmdir(full_path)
+    os.rmdir(path)
+
+
+def _progress_copy_function(progress: _FileProgress):
+    def copy(src: str, dst: str, *, follow_symlinks: bool = True) -> str:
+        progress.check()
+        result = shutil.copy2(src, dst, follow_symlinks=follow_symlinks)
+        progress.advance()
+        return result
+    return copy
+
+
+def _copy_path(source: str, destination: str, progress: _FileProgress) -> None:
+    """Copy a file or directory tree, reporting one step per copied file."""
+    if progress.reporting:
+        progress.total = _count_files(source)
+    
+    copy = _progress_copy_function(progress)
+    if os.path.isdir(source):
+        shutil.copytree(source, destination, copy_function=copy)
+    else:
+        os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+        copy(source, destination)
+
+
+def _move_path(source: str, destination: str, progress: _FileProgress) -> None:
+    """Move a path; only a cross-device move copies, and reports progress."""
+    shutil.move(source, destination, copy_function=_progress_copy_function(progress))
+
+
+def _archive_format(path: str, format: str | None = None) -> str:
+    """Archive format from an explicit name or the file name suffix."""
+    if format is None:
+        lower = path.lower()
+        format = next(
+            (name for name, suffixes in ARCHIVE_FORMATS.items() if lower.endswith(suffixes)),
+            None
+        )
+        if format is None:
+            raise ValueError(f"Cannot tell the archive format of {path}; pass format explicitly")
+    if format not in ARCHIVE_FORMATS:
+        raise ValueError(f"Unsupported archive format: {format}")
+    if format == "tar.zst" and zstandard is None:
+        raise RuntimeError("tar.zst archives need the zstandard package")
+    return format
+
+
+def _sniff_archive_format(path: str) -> str:
+    """Archive format from the leading bytes, falling back to the file name."""
+    with open(path, "rb") as f:
+        head = f.read(4)
+    for magic, format in ARCHIVE_MAGIC:
+        if head.startswith(magic):
+            if format == "tar.zst" and zstandard is None:
+                raise RuntimeError("tar.zst archives need the zstandard package")
+            return format
+    return _archive_format(path)
+
+
+class _ProgressReader:
+    """File wrapper that reports bytes read and stops on cancellation."""
+    
+    def __init__(self, fileobj: Any, progress: _FileProgress):
+        self.fileobj = fileobj
+        self.progress = progress
+    
+    def read(self, size: int = -1) -> bytes:
+        data = self.fileobj.read(size)
+        self.progress.advance(len(data))
+        return data
+
+
+def _copy_stream(source: Any, target: Any, progress: _FileProgress) -> None:
+    while True:
+        chunk = source.read(ARCHIVE_CHUNK_SIZE)
+        if not chunk:
+            return
+        target.write(chunk)
+        progress.advance(len(chunk))
+
+
+def _archive_entries(source: str, include_hidden: bool, exclude: set[str]) -> Iterator[tuple[str, str]]:
+    """(filesystem path, archive name) of the source and everything under it."""
+    root = os.path.basename(os.path.normpath(source))
+    yield source, root
+    if os.path.isdir(source) and not os.path.islink(source):
+        for entry, relative in _scan_directory(source, True, include_hidden, max_depth=None):
+            if entry.path not in exclude:
+                yield entry.path, f"{root}/{relative}"
+
+
+def _write_zip(
+    target: Any,
+    entries: Iterator[tuple[str, str]],
+    compression_level: int | None,
+    progress: _FileProgress
+) -> None:
+    with zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED, compresslevel=compression_level) as archive:
+        for path, name in entries:
+            progress.check()
+            if os.path.isdir(path):
+                archive.write(path, name)
+                continue
+            if not os.path.exists(path):
+                # Dangling symlink; zip entries store link targets' content
+                continue
+            info = zipfile.ZipInfo.from_file(path, name)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with open(path, "rb") as source, archive.open(info, "w") as member:
+                _copy_stream(source, member, progress)
+
+
+def _write_tar(
+    target: Any,
+    format: str,
+    entries: Iterator[tuple[str, str]],
+    compression_level: int | None,
+    progress: _FileProgress
+) -> None:
+    if format == "tar.zst":
+        compressor = zstandard.ZstdCompressor(level=compression_level or 3)
+        stream = compressor.stream_writer(target, closefd=False)
+        archive = tarfile.open(fileobj=stream, mode="w|")
+    else:
+        stream = None
+        archive = tarfile.open(
+            fileobj=target, mode="w:gz",
+            compresslevel=9 if compression_level is None else compression_level
+        )
+    
+    with archive:
+        for path, name in entries:
+            progress.check()
+            info = archive.gettarinfo(path, name)
+            if info.isreg():
+                with open(path, "rb") as source:
+                    archive.addfile(info, _ProgressReader(source, progress))
+            else:
+                archive.addfile(info)
+    if stream is not None:
+        stream.close()
+
+
+def _create_archive(
+    source: str,
+    destination: str,
+    format: str | None,
+    compression_level: int | None,
+    include_hidden: bool,
+    progress: _FileProgress
+) -> dict[str, Any]:
+    """
+    Stream a file or tree into an archive, one chunk at a time.
+    
+    The archive is written to a temporary file next to the destination and
+    renamed into place, so a failed or cancelled run leaves nothing behind.
+    Progress counts bytes of file content added.
+    """
+    format = _archive_format(destination, format)
+    # Absolute paths, so walked entries compare equal to the excluded archive paths
+    source = os.path.abspath(source)
+    destination = os.path.abspath(destination)
+    directory = os.path.dirname(destination)
+    os.makedirs(directory, exist_ok=True)
+    
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(destination)}.", suffix=".tmp")
+    exclude = {destination, temp_path}
+    
+    if progress.reporting:
+        progress.total = sum(
+            os.path.getsize(path) for path, _ in _archive_entries(source, include_hidden, exclude)
+            if os.path.isfile(path) and (format == "zip" or not os.path.islink(path))
+        )
+    
+    count = 0
+    
+    def counted() -> Iterator[tuple[str, str]]:
+        nonlocal count
+        for item in _archive_entries(source, include_hidden, exclude):
+            count += 1
+            yield item
+    
+    try:
+        with os.fdopen(fd, "wb") as target:
+            if format == "zip":
+                _write_zip(target, counted(), compression_level, progress)
+            else:
+                _write_tar(target, format, counted(), compression_level, progress)
+        os.replace(temp_path, destination)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    
+    return {"format": format, "entries": count, "size": os.path.getsize(destination)}
+
+
+def _extract_target(destination: str, name: str) -> str:
+    """Filesystem path of an archive member, refusing names that escape the destination."""
+    joined = os.path.normpath(os.path.join(destination, name))
+    # Resolve the parent only: a member may itself be a symlink to replace
+    target = os.path.join(os.path.realpath(os.path.dirname(joined)), os.path.basename(joined))
+    if os.path.isabs(name) or os.path.commonpath([destination, target]) != destination:
+        raise ValueError(f"Archive entry outside the destination: {name}")
+    return target
+
+
+def _open_extract_target(target: str, overwrite: bool) -> Any:
+    """
+    Open a new file for an archive member.
+    
+    Whatever already sits at target is unlinked first rather than written
+    through, so an existing symlink cannot redirect the write outside the
+    destination.
+    """
+    if os.path.lexists(target):
+        if not overwrite:
+            raise FileExistsError(f"File already exists: {target}")
+        if os.path.islink(target) or not os.path.isdir(target):
+            os.unlink(target)
+    
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    # O_EXCL fails instead of following a symlink created in the meantime
+    fd = os.open(target, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    return os.fdopen(fd, "wb")
+
+
+def _extract_zip(path: str, destination: str, overwrite: bool, progress: _FileProgress) -> int:
+    count = 0
+    with zipfile.ZipFile(path) as archive:
+        members = archive.infolist()
+        if progress.reporting:
+            progress.total = sum(info.file_size for info in members)
+        
+        for info in members:
+            progress.check()
+            target = _extract_target(destination, info.filename)
+            if info.is_dir():
+                os.makedirs(target, exist_ok=True)
+                count += 1
+                continue
+            with archive.open(info) as member, _open_extract_target(target, overwrite) as output:
+                _copy_stream(member, output, progress)
+            mode = (info.external_attr >> 16) & 0o777
+            if mode:
+                os.chmod(target, mode)
+            count += 1
+    return count
+
+
+def _extract_tar(path: str, format: str, destination: str, overwrite: bool, progress: _FileProgress) -> int:
+    count = 0
+    with open(path, "rb") as raw:
+        # Tar members are only known while streaming, so progress counts archive bytes read
+        if progress.reporting:
+            progress.total = os.fstat(raw.fileno()).st_size
+        source = _ProgressReader(raw, progress)
+        
+        if format == "tar.zst":
+            stream = zstandard.ZstdDecompressor().stream_reader(source)
+            archive = tarfile.open(fileobj=stream, mode="r|")
+        else:
+            archive = tarfile.open(fileobj=source, mode="r|gz")
+        
+        with archive:
+            for member in archive:
+                target = _extract_target(destination, member.name)
+                if overwrite and os.path.islink(target):
+                    # Replaced, never followed (data_filter would resolve it)
+                    os.unlink(target)
+                member = tarfile.data_filter(member, destination)
+                if member.isdir():
+                    os.makedirs(target, exist_ok=True)
+                    count += 1
+                    continue
+                if member.isreg():
+                    with archive.extractfile(member) as data, _open_extract_target(target, overwrite) as output:
+                        while chunk := data.read(ARCHIVE_CHUNK_SIZE):
+                            progress.check()
+                            output.write(chunk)
+                    if member.mode is not None:
+                        os.chmod(target, member.mode)
+                    os.utime(target, (member.mtime, member.mtime))
+                else:
+                    if os.path.lexists(target):
+                        if not overwrite:
+                            raise FileExistsError(f"File already exists: {target}")
+                        os.unlink(target)
+                    # Links; data_filter has already checked they stay inside the destination
+                    archive.extract(member, destination, filter="data")
+                count += 1
+    return count
+
+
+def _extract_archive(path: str, destination: str, overwrite: bool, progress: _FileProgress) -> dict[str, Any]:
+    """
+    Extract an archive member by member without holding any member in memory.
+    
+    Members with absolute names, ``..`` components or links pointing outside
+    the destination are refused before anything is written for them.
+    """
+    format = _sniff_archive_format(path)
+    destination = os.path.realpath(destination)
+    os.makedirs(destination, exist_ok=True)
+    
+    if format == "zip":
+        count = _extract_zip(path, destination, overwrite, progress)
+    else:
+        count = _extract_tar(path, format, destination, overwrite, progress)
+    return {"format": format, "entries": count}
+
+
+def _scan_directory(
+    path: str,
+    recursive: bool,
+    include_hidden: bool,
+    max_depth: int | None,
+    resume_after: list[str] | None = None,
+    depth: int = 0
+) -> Iterator[tuple[os.DirEntry, str]]:
+    """
+    Yield (entry, relative path) in name order, each directory before its contents.
+    
+    Only one directory listing per level is held in memory. ``resume_after``
+    holds the components of a previously yielded relative path; everything
+    up to and including it is skipped. Symlinked directories are listed but
+    not descended into.
+    """
+    try:
+        with os.scandir(path) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+    except OSError:
+        return
+    
+    descend = recursive and (max_depth is None or depth + 1 < max_depth)
+    
+    for entry in entries:
+        if not include_hidden and entry.name.startswith('.'):
+            continue
+        
+        if resume_after:
+            if entry.name < resume_after[0]:
+                continue
+            if entry.name == resume_after[0]:
+                if descend and entry.is_dir(follow_symlinks=False):
+                    for child, relative in _scan_directory(
+                        entry.path, recursive, include_hidden, max_depth, resume_after[1:], depth + 1
+                    ):
+                        yield child, f"{entry.name}/{relative}"
+                resume_after = None
+                continue
+            resume_after = None
+        
+        yield entry, entry.name
+        
+        if descend and entry.is_dir(follow_symlinks=False):
+            for child, relative in _scan_directory(
+                entry.path, recursive, include_hidden, max_depth, None, depth + 1
+            ):
+                yield child, f"{entry.name}/{relative}"
+
+
+def _list_directory_page(
+    path: str,
+    recursive: bool = False,
+    include_hidden: bool = False,
+    max_depth: int | None = None,
+    pattern: str | None = None,
+    max_entries: int = DEFAULT_MAX_LIST_ENTRIES,
+    cursor: str | None = None,
+    index: FileIndex | None = None
+) -> dict[str, Any]:
+    """
+    One page of directory entries, from the file index when it covers the
+    path and otherwise from os.scandir's cached entry types.
+    
+    The cursor is the relative path of the last entry returned, so paging
+    stays consistent while the tree is not modified.
+    """
+    entries = []
+    next_cursor = None
+    resume_after = cursor.split("/") if cursor else None
+    
+    if index is not None:
+        source = index.iter_tree(path, recursive, include_hidden, max_depth, resume_after)
+    else:
+        source = _scan_directory(path, recursive, include_hidden, max_depth, resume_after)
+    
+    for entry, relative in source:
+        if pattern and not fnmatch.fnmatch(entry.name, pattern):
+            continue
+        
+        if len(entries) == max_entries:
+            next_cursor = last_relative
+            break
+        
+        if index is not None:
+            is_dir, size = entry.is_dir, entry.size
+            entry_path = os.path.join(path, relative)
+        else:
+            try:
+                is_dir = entry.is_dir()
+                size = 0 if is_dir else entry.stat().st_size
+            except OSError:
+                is_dir, size = False, 0
+            entry_path = entry.path
+        
+        entries.append({
+            "name": entry.name,
+            "path": entry_path,
+            "type": "directory" if is_dir else "file",
+            "size": size
+        })
+        last_relative = relative
+    
+    return {
+        "entries": entries,
+        "count": len(entries),
+        "has_more": next_cursor is not None,
+        "next_cursor": next_cursor
+    }
+
+
+def _match_window(line: str, start: int) -> tuple[str, int]:
+    """At most MAX_MATCH_LINE_LENGTH characters of a long line around a match, and their offset."""
+    if len(line) <= MAX_MATCH_LINE_LENGTH:
+        return line, 0
+    offset = max(0, min(start - MAX_MATCH_LINE_LENGTH // 4, len(line) - MAX_MATCH_LINE_LENGTH))
+    return line[offset:offset + MAX_MATCH_LINE_LENGTH], offset
+
+
+def _search_file(path: str, matcher: re.Pattern, context_lines: int, limit: int) -> list[dict[str, Any]] | None:
+    """
+    Matching lines of one file, or None if the file looks binary.
+    
+    Whole lines are searched; only the returned text is cut to
+    MAX_MATCH_LINE_LENGTH, around the match (``text_offset`` is where the
+    window starts in the line).
+    """
+    matches = []
+    before = deque(maxlen=context_lines)
+    collecting_after = []
+    
+    with open(path, "rb") as f:
+        if b"\0" in f.read(BINARY_SNIFF_BYTES):
+            return None
+        f.seek(0)
+        
+        for number, raw in enumerate(f, 1):
+            line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+            context = line[:MAX_MATCH_LINE_LENGTH]
+            
+            if collecting_after:
+                for match in collecting_after:
+                    match["after"].append(context)
+                collecting_after = [match for match in collecting_after if len(match["after"]) < context_lines]
+            
+            if len(matches) >= limit:
+                if not collecting_after:
+                    break
+                continue
+            
+            found = matcher.search(line)
+            if found:
+                text, offset = _match_window(line, found.start())
+                match = {"path": path, "line": number, "column": found.start() + 1, "text": text}
+                if offset:
+                    match["text_offset"] = offset
+                if context_lines:
+                    match["before"] = list(before)
+                    match["after"] = []
+                    collecting_after.append(match)
+                matches.append(match)
+            
+            before.append(context)
+    
+    return matches
+
+
+def _search_files(
+    path: str,
+    matcher: re.Pattern,
+    pattern: str | None = None,
+    include_hidden: bool = False,
+    context_lines: int = 0,
+    max_results: int = 100,
+    max_file_size: int = DEFAULT_MAX_SEARCH_FILE_SIZE,
+    index: FileIndex | None = None,
+    progress: _FileProgress | None = None
+) -> dict[str, Any]:
+    """
+    Search every file under path, reading files on a thread pool.
+    
+    Files are submitted in batches so the scan stops early once max_results
+    matches are found. Results keep directory order regardless of which
+    worker finishes first.
+    """
+    if os.path.isfile(path):
+        candidates = iter([path])
+    elif index is not None:
+        candidates = (
+            os.path.join(path, relative)
+            for entry, relative in index.iter_tree(path, recursive=True, include_hidden=include_hidden)
+            if not entry.is_dir
+            and entry.size <= max_file_size
+            and (not pattern or fnmatch.fnmatch(entry.name, pattern))
+        )
+    else:
+        candidates = (
+            entry.path
+            for entry, _ in _scan_directory(path, recursive=True, include_hidden=include_hidden, max_depth=None)
+            if entry.is_file() and (not pattern or fnmatch.fnmatch(entry.name, pattern))
+        )
+    
+    matches = []
+    files_searched = 0
+    files_skipped = 0
+    
+    def search(file_path: str) -> list[dict[str, Any]] | None:
+        try:
+            if os.path.getsize(file_path) > max_file_size:
+                return None
+            return _search_file(file_path, matcher, context_lines, max_results)
+        except OSError:
+            return None
+    
+    with ThreadPoolExecutor(max_workers=SEARCH_WORKERS) as executor:
+        while len(matches) < max_results:
+            batch = list(itertools.islice(candidates, SEARCH_WORKERS * 4))
+            if not batch:
+                break
+            if progress is not None:
+                progress.advance(len(batch))
+            
+            for file_matches in executor.map(search, batch):
+                if file_matches is None:
+                    files_skipped += 1
+                    continue
+                files_searched += 1
+                matches.extend(file_matches)
+    
+    # Reaching the cap means there may be more matches that were not searched for
+    truncated = len(matches) >= max_results
+    del matches[max_results:]
+    
+    return {
+        "matches": matches,
+        "count": len(matches),
+        "files_searched": files_searched,
+        "files_skipped": files_skipped,
+        "truncated": truncated
+    }
+
+
+def _paths_overlap(first: str, second: str) -> bool:
+    return first == second or first.startswith(second + os.sep) or second.startswith(first + os.sep)
+
+
+def _batch_paths(operation: dict[str, Any]) -> tuple[list[str], list[str]]:
+    """Absolute paths an operation reads and writes."""
+    op = operation.get("op")
+    if op not in BATCH_OPERATIONS:
+        raise ValueError(f"Unsupported batch operation: {op}")
+    
+    reads, writes = BATCH_OPERATIONS[op]
+    for key in reads + writes:
+        if not isinstance(operation.get(key), str):
+            raise ValueError(f"{op} operation is missing \"{key}\"")
+    return (
+        [os.path.abspath(operation[key]) for key in reads],
+        [os.path.abspath(operation[key]) for key in writes]
+    )
+
+
+def _operations_conflict(first: tuple[list[str], list[str]], second: tuple[list[str], list[str]]) -> bool:
+    """True unless the only paths the operations share are ones both just read."""
+    first_reads, first_writes = first
+    second_reads, second_writes = second
+    return (
+        any(_paths_overlap(a, b) for a in first_writes for b in second_reads + second_writes)
+        or any(_paths_overlap(a, b) for a in second_writes for b in first_reads)
+    )
+
+
+def _rollback_root(path: str) -> str:
+    """The highest ancestor of path that does not exist yet (or path itself)."""
+    while True:
+        parent = os.path.dirname(path)
+        if parent == path or os.path.lexists(parent):
+            return path
+        path = parent
+
+
+def _remove_path(path: str) -> None:
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    elif os.path.lexists(path):
+        os.remove(path)
+
+
+class _BatchStaging:
+    """
+    Backups of every path an atomic batch may change, kept in a staging
+    directory until the batch either commits or rolls back.
+    
+    Paths that did not exist are recorded too, so rollback removes them
+    (along with any parent directories the batch created).
+    """
+    
+    def __init__(self, paths: list[str]):
+        self.directory = tempfile.mkdtemp(prefix="mcp-batch-")
+        self.backups: list[tuple[str, str | None]] = []
+        
+        roots: list[str] = []
+        for path in sorted({_rollback_root(path) for path in paths}):
+            if not any(_paths_overlap(path, root) for root in roots):
+                roots.append(path)
+        
+        try:
+            for number, path in enumerate(roots):
+                if not os.path.lexists(path):
+                    self.backups.append((path, None))
+                    continue
+                
+                backup = os.path.join(self.directory, str(number))
+                if os.path.isdir(path) and not os.path.islink(path):
+                    shutil.copytree(path, backup, symlinks=True)
+                else:
+                    shutil.copy2(path, backup, follow_symlinks=False)
+                self.backups.append((path, backup))
+        except BaseException:
+            self.discard()
+            raise
+    
+    def rollback(self) -> None:
+        """Put every affected path back the way it was, then drop the staging directory."""
+        try:
+            for path, backup in reversed(self.backups):
+                _remove_path(path)
+                if backup is not None:
+                    shutil.move(backup, path)
+        finally:
+            self.discard()
+    
+    def discard(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+async def _run_batch(operations: list[dict[str, Any]], atomic: bool = False) -> dict[str, Any]:
+    """
+    Run file operations, each after every earlier operation it conflicts with.
+    
+    An operation whose predecessor failed is skipped. In atomic mode a
+    failure also skips everything not yet started and rolls the batch back.
+    """
+    paths = [_batch_paths(operation) for operation in operations]
+    staging = None
+    if atomic:
+        staging = await _run_blocking(_BatchStaging, [path for _, writes in paths for path in writes])
+    
+    results: list[dict[str, Any] | None] = [None] * len(operations)
+    tasks: list[asyncio.Task] = []
+    aborted = False
+    
+    async def run(index: int) -> bool:
+        nonlocal aborted
+        operation = operations[index]
+        dependencies = [tasks[earlier] for earlier in range(index) if _operations_conflict(paths[earlier], paths[index])]
+        dependencies_ok = all(await asyncio.gather(*dependencies))
+        
+        if not dependencies_ok or aborted:
+            results[index] = {
+                "index": index,
+                "op": operation["op"],
+                "success": False,
+                "skipped": True,
+                "error": "Skipped because an earlier operation failed"
+            }
+            return False
+        
+        arguments = {key: value for key, value in operation.items() if key != "op"}
+        response = await handle_call_tool(operation["op"], arguments)
+        result = json.loads(response[0].text)
+        results[index] = {"index": index, "op": operation["op"], **result}
+        
+        if not result.get("success") and atomic:
+            aborted = True
+        return bool(result.get("success"))
+    
+    for index in range(len(operations)):
+        tasks.append(asyncio.create_task(run(index)))
+    
+    try:
+        outcomes = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        if staging is not None:
+            await asyncio.shield(_run_blocking(staging.rollback))
+        raise
+    
+    succeeded = all(outcomes)
+    rolled_back = False
+    if staging is not None:
+        if succeeded:
+            await _run_blocking(staging.discard)
+        else:
+            await _run_blocking(staging.rollback)
+            rolled_back = True
+    
+    return {
+        "success": succeeded,
+        "atomic": atomic,
+        "rolled_back": rolled_back,
+        "results": results,
+        "count": len(results)
+    }
+
+
+def _snapshot(path: str, recursive: bool, include_hidden: bool) -> dict[str, tuple[bool, int, int]]:
+    """(is_dir, size, mtime_ns) of the watched path and everything under it."""
+    snapshot = {}
+    if not os.path.isdir(path):
+        try:
+            path_stat = os.stat(path)
+            snapshot[path] = (False, path_stat.st_size, path_stat.st_mtime_ns)
+        except OSError:
+            pass
+        return snapshot
+    
+    for entry, _ in _scan_directory(path, recursive, include_hidden, max_depth=None):
+        try:
+            is_dir = entry.is_dir()
+            entry_stat = entry.stat()
+        except OSError:
+            continue
+        snapshot[entry.path] = (is_dir, 0 if is_dir else entry_stat.st_size, entry_stat.st_mtime_ns)
+    return snapshot
+
+
+def _diff_snapshots(
+    previous: dict[str, tuple[bool, int, int]],
+    current: dict[str, tuple[bool, int, int]]
+) -> Iterator[tuple[str, str]]:
+    """(change type, path) pairs; directories only report creation and deletion."""
+    for path in current.keys() - previous.keys():
+        yield "created", path
+    for path in previous.keys() - current.keys():
+        yield "deleted", path
+    for path in current.keys() & previous.keys():
+        if current[path] != previous[path] and not current[path][0]:
+            yield "modified", path
+
+
+class _WatchdogHandler(FileSystemEventHandler):
+    """Forwards watchdog events to a watch on its event loop"""
+    
+    def __init__(self, watch: "_Watch"):
+        super().__init__()
+        self.watch = watch
+    
+    def on_any_event(self, event: Any) -> None:
+        if event.event_type not in ("created", "modified", "deleted", "moved"):
+            return
+        if event.is_directory and event.event_type == "modified":
+            return
+        self.watch.loop.call_soon_threadsafe(
+            self.watch.add_change, event.event_type, event.src_path, getattr(event, "dest_path", None) or None
         )
-    ]
+
+
+class _Watch:
+    """
+    One watch_path subscription: collects changes from a watchdog observer
+    (or a polling loop when watchdog is not installed), coalesces them per
+    path and sends a notification once no new change arrived for
+    ``debounce`` seconds.
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        session: Any,
+        recursive: bool = True,
+        include_hidden: bool = False,
+        pattern: str | None = None,
+        debounce: float = 0.5
+    ):
+        self.watch_id = os.urandom(8).hex()
+        self.path = os.path.abspath(path)
+        self.session = session
+        self.recursive = recursive
+        self.include_hidden = include_hidden
+        self.pattern = pattern
+        self.debounce = debounce
+        self.loop = asyncio.get_running_loop()
+        self.pending: dict[str, dict[str, Any]] = {}
+        self.backend_name = "watchdog" if Observer is not None else "polling"
+        self._first_pending: float | None = None
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._observer = None
+        self._poll_task: asyncio.Task | None = None
+    
+    async def start(self) -> None:
+        if Observer is not None:
+            self._observer = Observer()
+            watch_dir = self.path if os.path.isdir(self.path) else os.path.dirname(self.path)
+            self._observer.schedule(_WatchdogHandler(self), watch_dir, recursive=self.recursive)
+            self._observer.daemon = True
+            self._observer.start()
+        else:
+            snapshot = await _run_blocking(_snapshot, self.path, self.recursive, self.include_hidden)
+            self._poll_task = asyncio.create_task(self._poll(snapshot))
+    
+    async def stop(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+        if self._observer is not None:
+            observer, self._observer = self._observer, None
+            observer.stop()
+            await _run_blocking(observer.join, 5)
+    
+    def add_change(self, change_type: str, path: str, dest_path: str | None = None) -> None:
+        """Record a change; must be called on the watch's event loop."""
+        if not self._wanted(path) and not (dest_path and self._wanted(dest_path)):
+            return
+        
+        previous = self.pending.get(path)
+        if previous is not None and previous["type"] == "created":
+            if change_type == "deleted":
+                del self.pending[path]
+                return
+            if change_type == "modified":
+                return
+        
+        change = {"type": change_type, "path": path}
+        if dest_path:
+            change["dest_path"] = dest_path
+        self.pending.pop(path, None)
+        self.pending[path] = change
+        self._schedule_flush()
+    
+    def _wanted(self, path: str) -> bool:
+        path = os.path.abspath(path)
+        if path != self.path and not path.startswith(self.path + os.sep):
+            return False
+        if self.pattern and not fnmatch.fnmatch(os.path.basename(path), self.pattern):
+            return False
+        if not self.include_hidden:
+            relative = os.path.relpath(path, self.path)
+            if any(part.startswith('.') and part not in ('.', '..') for part in relative.split(os.sep)):
+                return False
+        return True
+    
+    def _schedule_flush(self) -> None:
+        now = self.loop.time()
+        if self._first_pending is None:
+            self._first_pending = now
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        
+        deadline = self._first_pending + self.debounce * WATCH_MAX_DELAY_FACTOR
+        delay = max(0.0, min(self.debounce, deadline - now))
+        self._flush_handle = self.loop.call_later(delay, self._flush)
+    
+    def _flush(self) -> None:
+        self._flush_handle = None
+        self._first_pending = None
+        if not self.pending:
+            return
+        changes = list(self.pending.values())
+        self.pending.clear()
+        self.loop.create_task(self._send(changes))
+    
+    async def _send(self, changes: list[dict[str, Any]]) -> None:
+        try:
+            await self.session.send_log_message(
+                level="info",
+                data={"watch_id": self.watch_id, "path": self.path, "changes": changes},
+                logger=WATCH_LOGGER
+            )
+        except Exception:
+            # The client went away; nobody is left to notify
+            await _stop_watch(self.watch_id)
+    
+    async def _poll(self, snapshot: dict[str, tuple[bool, int, int]]) -> None:
+        while True:
+            await asyncio.sleep(WATCH_POLL_INTERVAL)
+            current = await _run_blocking(_snapshot, self.path, self.recursive, self.include_hidden)
+            for change_type, path in _diff_snapshots(snapshot, current):
+                self.add_change(change_type, path)
+            snapshot = current
+
+
+_watches: dict[str, _Watch] = {}
+
+
+async def _start_watch(path: str, **options: Any) -> _Watch:
+    if len(_watches) >= MAX_WATCHES:
+        raise RuntimeError(f"Too many active watches (limit {MAX_WATCHES})")
+    
+    try:
+        session = server.request_context.session
+    except LookupError:
+        raise RuntimeError("watch_path needs an MCP session to send notifications to")
+    
+    watch = _Watch(path, session, **options)
+    await watch.start()
+    _watches[watch.watch_id] = watch
+    return watch
+
+
+async def _stop_watch(watch_id: str) -> bool:
+    watch = _watches.pop(watch_id, None)
+    if watch is None:
+        return False
+    await watch.stop()
+    return True
+
+
+def _mark_changed(name: str, arguments: dict[str, Any]) -> None:
+    """Mark the paths a mutating tool call may have touched, so the index never serves them stale."""
+    index = _file_index
+    if index is None:
+        return
+    
+    if name == "batch_operations":
+        for operation in arguments.get("operations") or []:
+            if isinstance(operation, dict):
+                _mark_changed(operation.get("op"), operation)
+        return
+    
+    keys = BATCH_OPERATIONS[name][1] if name in BATCH_OPERATIONS else INDEX_WRITES.get(name, ())
+    for key in keys:
+        path = arguments.get(key)
+        if isinstance(path, str) and index.covers(path):
+            # Copies, moves and extraction can write a whole subtree below the path
+            index.mark_dirty(path, recursive=True)
+
+
+async def _fresh_index(path: str) -> FileIndex | None:
+    """The file index, refreshed off the event loop, if it covers path."""
+    index = _file_index
+    if index is None or not index.covers(path):
+        return None
+    await _run_blocking(index.ensure_fresh)
+    return index if index.get(path) is not None else None
+
 
 @server.call_tool()
 async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
@@ -224,16 +2050,23 @@ async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[TextCon
                     })
                 )]
             
-            with open(path, 'r', encoding=encoding) as f:
-                content = f.read()
+            result = await _run_blocking(
+                _read_file_window,
+                path,
+                encoding=encoding,
+                offset=arguments.get("offset"),
+                length=arguments.get("length"),
+                start_line=arguments.get("start_line"),
+                end_line=arguments.get("end_line"),
+                max_bytes=arguments.get("max_bytes") or DEFAULT_MAX_READ_BYTES
+            )
             
             return [TextContent(
                 type="text",
                 text=json.dumps({
                     "success": True,
-                    "content": content,
                     "path": path,
-                    "size": len(content)
+                    **result
                 })
             )]
         
@@ -243,11 +2076,14 @@ async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[TextCon
             encoding = arguments.get("encoding", "utf-8")
             append = arguments.get("append", False)
             
-            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-            
-            mode = 'a' if append else 'w'
-            with open(path, mode, encoding=encoding) as f:
-                f.write(content)
+            modified = await _run_blocking(
+                _write_file, path, content, encoding, append,
+                atomic=arguments.get("atomic", True),
+                fsync=arguments.get("fsync", False),
+                expected_mtime=arguments.get("expected_mtime"),
+                expected_hash=arguments.get("expected_hash"),
+                progress=_FileProgress.for_current_request(total=len(content))
+            )
             
             return [TextContent(
                 type="text",
@@ -255,7 +2091,8 @@ async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[TextCon
                     "success": True,
                     "message": f"{'Appended to' if append else 'Wrote'} file: {path}",
                     "path": path,
-                    "size": len(content)
+                    "size": len(content),
+                    "modified": modified
                 })
             )]
         
@@ -282,61 +2119,24 @@ async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[TextCon
                     })
                 )]
             
-            entries = []
-            
-            if recursive:
-                for root, dirs, files in os.walk(path):
-                    if not include_hidden:
-                        dirs[:] = [d for d in dirs if not d.startswith('.')]
-                        files = [f for f in files if not f.startswith('.')]
-                    
-                    for name in dirs:
-                        full_path = os.path.join(root, name)
-                        entries.append({
-                            "name": name,
-                            "path": full_path,
-                            "type": "directory",
-                            "size": 0
-                        })
-                    
-                    for name in files:
-                        full_path = os.path.join(root, name)
-                        try:
-                            size = os.path.getsize(full_path)
-                        except:
-                            size = 0
-                        entries.append({
-                            "name": name,
-                            "path": full_path,
-                            "type": "file",
-                            "size": size
-                        })
-            else:
-                for entry in os.listdir(path):
-                    if not include_hidden and entry.startswith('.'):
-                        continue
-                    
-                    full_path = os.path.join(path, entry)
-                    is_dir = os.path.isdir(full_path)
-                    try:
-                        size = 0 if is_dir else os.path.getsize(full_path)
-                    except:
-                        size = 0
-                    
-                    entries.append({
-                        "name": entry,
-                        "path": full_path,
-                        "type": "directory" if is_dir else "file",
-                        "size": size
-                    })
+            result = await _run_blocking(
+                _list_directory_page,
+                path,
+                recursive=recursive,
+                include_hidden=include_hidden,
+                max_depth=arguments.get("max_depth"),
+                pattern=arguments.get("pattern"),
+                max_entries=arguments.get("max_entries") or DEFAULT_MAX_LIST_ENTRIES,
+                cursor=arguments.get("cursor"),
+                index=await _fresh_index(path)
+            )
             
             return [TextContent(
                 type="text",
                 text=json.dumps({
                     "success": True,
-                    "entries": entries,
-                    "count": len(entries),
-                    "path": path
+                    "path": path,
+                    **result
                 })
             )]
         
@@ -371,13 +2171,7 @@ async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[TextCon
                     })
                 )]
             
-            if os.path.isdir(path):
-                if recursive:
-                    shutil.rmtree(path)
-                else:
-                    os.rmdir(path)
-            else:
-                os.remove(path)
+            await _run_blocking(_delete_path, path, recursive, progress=_FileProgress.for_current_request())
             
             return [TextContent(
                 type="text",
@@ -401,7 +2195,7 @@ async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[TextCon
                     })
                 )]
             
-            shutil.move(source, destination)
+            await _run_blocking(_move_path, source, destination, progress=_FileProgress.for_current_request())
             
             return [TextContent(
                 type="text",
@@ -427,20 +2221,16 @@ async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[TextCon
                     })
                 )]
             
-            if os.path.isdir(source):
-                if recursive:
-                    shutil.copytree(source, destination)
-                else:
-                    return [TextContent(
-                        type="text",
-                        text=json.dumps({
-                            "success": False,
-                            "error": "Source is a directory. Set recursive=true to copy directories."
-                        })
-                    )]
-            else:
-                os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
-                shutil.copy2(source, destination)
+            if os.path.isdir(source) and not recursive:
+                return [TextContent(
+                    type="text",
+                    text=json.dumps({
+                        "success": False,
+                        "error": "Source is a directory. Set recursive=true to copy directories."
+                    })
+                )]
+            
+            await _run_blocking(_copy_path, source, destination, progress=_FileProgress.for_current_request())
             
             return [TextContent(
                 type="text",
@@ -482,11 +2272,285 @@ async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[TextCon
                 "is_executable": os.access(path, os.X_OK)
             }
             
+            index = await _fresh_index(path)
+            indexed = index.get(path) if index is not None else None
+            if indexed is not None and indexed.mtime_ns == stat_info.st_mtime_ns and indexed.content_hash:
+                info["content_hash"] = indexed.content_hash
+            
             return [TextContent(
                 type="text",
                 text=json.dumps(info)
             )]
         
+        elif name == "file_hash":
+            paths = arguments.get("paths", [])
+            algorithm = arguments.get("algorithm", "blake2b")
+            
+            outcomes = await asyncio.gather(
+                *(_run_blocking(_cached_hash, path, algorithm) for path in paths),
+                return_exceptions=True
+            )
+            
+            hashes = {}
+            errors = {}
+            for path, outcome in zip(paths, outcomes):
+                if isinstance(outcome, Exception):
+                    errors[path] = str(outcome)
+                    continue
+                digest, file_stat, cached = outcome
+                hashes[path] = {
+                    "hash": digest,
+                    "size": file_stat.st_size,
+                    "modified": file_stat.st_mtime,
+                    "cached": cached
+                }
+            
+            return [TextContent(
+                type="text",
+                text=json.dumps({
+                    "success": not errors,
+                    "algorithm": algorithm,
+                    "hashes": hashes,
+                    "errors": errors
+                })
+            )]
+        
+        elif name == "files_changed_since":
+            known = arguments.get("known")
+            path = arguments.get("path")
+            since = arguments.get("since")
+            
+            if known is None and (path is None or since is None):
+                return [TextContent(
+                    type="text",
+                    text=json.dumps({
+                        "success": False,
+                        "error": "Provide either known hashes or both path and since"
+                    })
+                )]
+            
+            if known is not None:
+                algorithm = arguments.get("algorithm", "blake2b")
+                outcomes = await asyncio.gather(
+                    *(_run_blocking(_cached_hash, file_path, algorithm) for file_path in known),
+                    return_exceptions=True
+                )
+                
+                changed, unchanged, missing = [], [], []
+                hashes = {}
+                for (file_path, known_hash), outcome in zip(known.items(), outcomes):
+                    if isinstance(outcome, Exception):
+                        missing.append(file_path)
+                    elif outcome[0] == known_hash:
+                        unchanged.append(file_path)
+                    else:
+                        changed.append(file_path)
+                        hashes[file_path] = outcome[0]
+                
+                return [TextContent(
+                    type="text",
+                    text=json.dumps({
+                        "success": True,
+                        "algorithm": algorithm,
+                        "changed": changed,
+                        "unchanged": unchanged,
+                        "missing": missing,
+                        "hashes": hashes
+                    })
+                )]
+            
+            if not os.path.isdir(path):
+                return [TextContent(
+                    type="text",
+                    text=json.dumps({
+                        "success": False,
+                        "error": f"Not a directory: {path}"
+                    })
+                )]
+            
+            result = await _run_blocking(
+                _files_modified_since,
+                path,
+                since,
+                include_hidden=arguments.get("include_hidden", False),
+                max_entries=arguments.get("max_entries") or DEFAULT_MAX_LIST_ENTRIES,
+                index=await _fresh_index(path)
+            )
+            
+            return [TextContent(
+                type="text",
+                text=json.dumps({
+                    "success": True,
+                    "path": path,
+                    "since": since,
+                    **result
+                })
+            )]
+        
+        elif name == "archive_create":
+            source = arguments.get("source")
+            destination = arguments.get("destination")
+            
+            if not os.path.exists(source):
+                return [TextContent(
+                    type="text",
+                    text=json.dumps({
+                        "success": False,
+                        "error": f"Source not found: {source}"
+                    })
+                )]
+            
+            result = await _run_blocking(
+                _create_archive,
+                source,
+                destination,
+                arguments.get("format"),
+                arguments.get("compression_level"),
+                arguments.get("include_hidden", True),
+                progress=_FileProgress.for_current_request()
+            )
+            
+            return [TextContent(
+                type="text",
+                text=json.dumps({
+                    "success": True,
+                    "message": f"Archived {source} to {destination}",
+                    "source": source,
+                    "destination": destination,
+                    **result
+                })
+            )]
+        
+        elif name == "archive_extract":
+            path = arguments.get("path")
+            destination = arguments.get("destination")
+            
+            if not os.path.isfile(path):
+                return [TextContent(
+                    type="text",
+                    text=json.dumps({
+                        "success": False,
+                        "error": f"Archive not found: {path}"
+                    })
+                )]
+            
+            result = await _run_blocking(
+                _extract_archive,
+                path,
+                destination,
+                arguments.get("overwrite", False),
+                progress=_FileProgress.for_current_request()
+            )
+            
+            return [TextContent(
+                type="text",
+                text=json.dumps({
+                    "success": True,
+                    "message": f"Extracted {path} to {destination}",
+                    "path": path,
+                    "destination": destination,
+                    **result
+                })
+            )]
+        
+        elif name == "watch_path":
+            path = arguments.get("path")
+            
+            if not os.path.exists(path):
+                return [TextContent(
+                    type="text",
+                    text=json.dumps({
+                        "success": False,
+                        "error": f"Path not found: {path}"
+                    })
+                )]
+            
+            watch = await _start_watch(
+                path,
+                recursive=arguments.get("recursive", True),
+                include_hidden=arguments.get("include_hidden", False),
+                pattern=arguments.get("pattern"),
+                debounce=arguments.get("debounce", 0.5)
+            )
+            
+            return [TextContent(
+                type="text",
+                text=json.dumps({
+                    "success": True,
+                    "watch_id": watch.watch_id,
+                    "path": path,
+                    "backend": watch.backend_name
+                })
+            )]
+        
+        elif name == "unwatch_path":
+            watch_id = arguments.get("watch_id")
+            
+            if not await _stop_watch(watch_id):
+                return [TextContent(
+                    type="text",
+                    text=json.dumps({
+                        "success": False,
+                        "error": f"Unknown watch: {watch_id}"
+                    })
+                )]
+            
+            return [TextContent(
+                type="text",
+                text=json.dumps({
+                    "success": True,
+                    "message": f"Stopped watch: {watch_id}",
+                    "watch_id": watch_id
+                })
+            )]
+        
+        elif name == "batch_operations":
+            result = await _run_batch(arguments.get("operations", []), arguments.get("atomic", False))
+            
+            return [TextContent(
+                type="text",
+                text=json.dumps(result)
+            )]
+        
+        elif name == "search_files":
+            path = arguments.get("path")
+            query = arguments.get("query")
+            
+            if not os.path.exists(path):
+                return [TextContent(
+                    type="text",
+                    text=json.dumps({
+                        "success": False,
+                        "error": f"Path not found: {path}"
+                    })
+                )]
+            
+            flags = 0 if arguments.get("case_sensitive", True) else re.IGNORECASE
+            matcher = re.compile(query if arguments.get("regex", False) else re.escape(query), flags)
+            
+            result = await _run_blocking(
+                _search_files,
+                path,
+                matcher,
+                pattern=arguments.get("pattern"),
+                include_hidden=arguments.get("include_hidden", False),
+                context_lines=arguments.get("context_lines", 0),
+                max_results=arguments.get("max_results", 100),
+                max_file_size=arguments.get("max_file_size") or DEFAULT_MAX_SEARCH_FILE_SIZE,
+                index=await _fresh_index(path),
+                progress=_FileProgress.for_current_request()
+            )
+            
+            return [TextContent(
+                type="text",
+                text=json.dumps({
+                    "success": True,
+                    "path": path,
+                    "query": query,
+                    **result
+                })
+            )]
+        
         else:
             return [TextContent(
                 type="text",
@@ -505,22 +2569,34 @@ async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[TextCon
                 "type": type(e).__name__
             })
         )]
+    finally:
+        # Also after failures: a partial copy or extraction still changed the tree
+        _mark_changed(name, arguments)
 
 async def main():
     """Main entry point for the MCP server."""
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="file-operations",
-                server_version="0.1.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
+    global _file_index
+    _file_index = create_file_index_from_env()
+    
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name="file-operations",
+                    server_version="0.1.0",
+                    capabilities=server.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={},
+                    ),
                 ),
-            ),
-        )
+            )
+    finally:
+        for watch_id in list(_watches):
+            await _stop_watch(watch_id)
+        if _file_index is not None:
+            _file_index.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
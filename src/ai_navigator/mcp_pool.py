@@ -0,0 +1,230 @@
+"""
+MCP Connection Pool
+
+Process-wide pool of connected, initialized MCPClient instances keyed by
+(server URL, transport, auth). Callers that talk to the same server (the
+primary MCP path, the Amap fallback client, ...) share one transport and one
+handshake instead of each opening their own.
+
+Pooled clients are reference counted: ``acquire`` hands out a client and
+``release`` returns it. Idle clients are health-checked before reuse and
+disconnected once they have been unused for ``idle_timeout`` seconds.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from ai_navigator.circuit_breaker import CircuitState
+from ai_navigator.mcp_client import AuthType, MCPClient, MCPConfig, TransportType, _sanitize_url
+
+logger = logging.getLogger(__name__)
+
+PoolKey = Tuple[str, str, str, str]
+
+
+def make_pool_key(
+    server_url: str,
+    transport_type: TransportType,
+    auth_type: AuthType = AuthType.NONE,
+    auth_token: Optional[str] = None
+) -> PoolKey:
+    """Build the pool key; the auth token is hashed so it never sits in memory in the clear."""
+    token_hash = hashlib.sha256(auth_token.encode("utf-8")).hexdigest() if auth_token else ""
+    return (server_url, transport_type.value, auth_type.value, token_hash)
+
+
+@dataclass
+class _PooledConnection:
+    client: MCPClient
+    refcount: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+    last_checked: float = field(default_factory=time.monotonic)
+    retired: bool = False
+
+
+class MCPConnectionPool:
+    """Reference-counted pool of shared MCPClient instances."""
+
+    def __init__(self, idle_timeout: float = 300.0, health_check_interval: float = 30.0):
+        """
+        Args:
+            idle_timeout: Seconds an unused client is kept before it is disconnected
+            health_check_interval: Minimum seconds between pings of a reused client
+        """
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self._connections: Dict[PoolKey, _PooledConnection] = {}
+        self._by_client: Dict[int, _PooledConnection] = {}
+        self._locks: Dict[PoolKey, asyncio.Lock] = {}
+
+    async def acquire(
+        self,
+        server_url: str,
+        transport_type: TransportType = TransportType.HTTP_SSE,
+        auth_token: Optional[str] = None,
+        auth_type: AuthType = AuthType.NONE,
+        **kwargs: Any
+    ) -> MCPClient:
+        """
+        Get a connected client for the server, connecting on first use.
+
+        Extra keyword arguments are passed to MCPConfig when a new client is
+        created; they do not take part in the pool key.
+
+        Raises:
+            ConnectionError: If a new connection cannot be established
+        """
+        await self.evict_idle()
+
+        key = make_pool_key(server_url, transport_type, auth_type, auth_token)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+
+        async with lock:
+            entry = self._connections.get(key)
+            if entry is not None and not await self._is_healthy(entry):
+                logger.warning(f"Pooled MCP connection to {_sanitize_url(server_url)} is unhealthy, replacing it")
+                await self._retire(key, entry)
+                entry = None
+
+            if entry is None:
+                client = MCPClient(MCPConfig(
+                    server_url=server_url,
+                    transport_type=transport_type,
+                    auth_token=auth_token,
+                    auth_type=auth_type,
+                    **kwargs
+                ))
+                if not await client.connect():
+                    await client.disconnect()
+                    raise ConnectionError(f"Failed to connect to MCP server {_sanitize_url(server_url)}")
+
+                entry = _PooledConnection(client=client)
+                self._connections[key] = entry
+                self._by_client[id(client)] = entry
+                logger.info(f"Opened pooled MCP connection to {_sanitize_url(server_url)}")
+
+            entry.refcount += 1
+            entry.last_used = time.monotonic()
+            return entry.client
+
+    async def release(self, client: MCPClient) -> None:
+        """
+        Return a client obtained from ``acquire``.
+
+        Clients the pool does not know about are simply disconnected.
+        """
+        entry = self._by_client.get(id(client))
+        if entry is None or entry.client is not client:
+            await client.disconnect()
+            return
+
+        entry.refcount = max(0, entry.refcount - 1)
+        entry.last_used = time.monotonic()
+
+        if entry.retired and entry.refcount == 0:
+            self._by_client.pop(id(client), None)
+            await client.disconnect()
+
+    @asynccontextmanager
+    async def connection(self, server_url: str, **kwargs: Any) -> AsyncIterator[MCPClient]:
+        """Context manager form of ``acquire``/``release``."""
+        client = await self.acquire(server_url, **kwargs)
+        try:
+            yield client
+        finally:
+            await self.release(client)
+
+    async def evict_idle(self) -> int:
+        """Disconnect unused clients idle for longer than ``idle_timeout``; returns how many."""
+        now = time.monotonic()
+        expired = [
+            (key, entry) for key, entry in self._connections.items()
+            if entry.refcount == 0 and now - entry.last_used >= self.idle_timeout
+        ]
+
+        for key, entry in expired:
+            logger.info(f"Evicting idle MCP connection to {_sanitize_url(key[0])}")
+            await self._retire(key, entry)
+
+        return len(expired)
+
+    async def close(self) -> None:
+        """Disconnect every pooled client, including ones still checked out."""
+        entries = list(self._connections.values())
+        self._connections.clear()
+        self._by_client.clear()
+        self._locks.clear()
+
+        for entry in entries:
+            try:
+                await entry.client.disconnect()
+            except Exception as e:
+                logger.debug(f"Error closing pooled MCP connection: {e}")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-server refcount and idle time, keyed by sanitized URL, transport and auth type."""
+        now = time.monotonic()
+        return {
+            f"{_sanitize_url(key[0])} ({key[1]}, {key[2]})": {
+                "refcount": entry.refcount,
+                "idle_seconds": round(now - entry.last_used, 1) if entry.refcount == 0 else 0.0,
+                "connected": entry.client.is_connected()
+            }
+            for key, entry in self._connections.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._connections)
+
+    async def _is_healthy(self, entry: _PooledConnection) -> bool:
+        client = entry.client
+        if client.get_circuit_state() == CircuitState.OPEN:
+            return False
+        if not client.is_connected():
+            return False
+
+        if time.monotonic() - entry.last_checked < self.health_check_interval:
+            return True
+
+        healthy = await client.ping()
+        entry.last_checked = time.monotonic()
+        return healthy
+
+    async def _retire(self, key: PoolKey, entry: _PooledConnection) -> None:
+        """Drop an entry from the pool; it is disconnected once its last holder releases it."""
+        if self._connections.get(key) is entry:
+            del self._connections[key]
+        entry.retired = True
+
+        if entry.refcount == 0:
+            self._by_client.pop(id(entry.client), None)
+            try:
+                await entry.client.disconnect()
+            except Exception as e:
+                logger.debug(f"Error closing pooled MCP connection: {e}")
+
+
+_default_pool: Optional[MCPConnectionPool] = None
+
+
+def get_connection_pool() -> MCPConnectionPool:
+    """
+    Return the process-wide connection pool, creating it from environment variables.
+
+    Environment variables:
+    - MCP_POOL_IDLE_TIMEOUT: Seconds before an unused connection is closed (default: 300)
+    - MCP_POOL_HEALTH_CHECK_INTERVAL: Minimum seconds between health pings (default: 30)
+    """
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = MCPConnectionPool(
+            idle_timeout=float(os.getenv("MCP_POOL_IDLE_TIMEOUT", "300")),
+            health_check_interval=float(os.getenv("MCP_POOL_HEALTH_CHECK_INTERVAL", "30"))
+        )
+    return _default_pool
@@ -0,0 +1,186 @@
+"""
+LLM Response Cache
+
+Content-addressed cache for AI provider responses. Entries are keyed by
+(provider, model, method, normalized prompt hash) and kept in an in-memory
+LRU with an optional on-disk store, so identical prompts (retried utterances,
+popular routes, repeated MCP responses) are answered without an API call.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize_prompt(messages: List[Dict[str, str]]) -> str:
+    """Collapse whitespace in message contents so formatting noise does not change the key."""
+    normalized = [
+        {
+            "role": message.get("role", ""),
+            "content": " ".join(str(message.get("content", "")).split())
+        }
+        for message in messages
+    ]
+    return json.dumps(normalized, ensure_ascii=False, sort_keys=True)
+
+
+def make_cache_key(provider: str, model: str, method: str, messages: List[Dict[str, str]]) -> str:
+    """
+    Build a content-addressed cache key.
+
+    Args:
+        provider: Provider identifier (e.g. 'anthropic', 'openai')
+        model: Model name
+        method: Provider method name (e.g. 'parse_navigation_request')
+        messages: Messages sent to the model
+
+    Returns:
+        Hex digest identifying the request
+    """
+    prompt_hash = hashlib.sha256(_normalize_prompt(messages).encode("utf-8")).hexdigest()
+    key_material = f"{provider}\x00{model}\x00{method}\x00{prompt_hash}"
+    return hashlib.sha256(key_material.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    In-memory LRU cache with TTL and optional on-disk persistence.
+
+    Values must be JSON-serializable. Copies are returned on reads so callers
+    can mutate results freely.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl: Optional[float] = 3600.0,
+        cache_dir: Optional[str] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._entries: "OrderedDict[str, tuple[Optional[float], Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a cached value, or None if missing or expired."""
+        entry = self._entries.get(key)
+
+        if entry is None and self.cache_dir:
+            entry = self._load_from_disk(key)
+            if entry is not None:
+                self._store_in_memory(key, entry)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at is not None and expires_at < time.time():
+            self.invalidate(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value under the given key."""
+        expires_at = time.time() + self.ttl if self.ttl else None
+        entry = (expires_at, copy.deepcopy(value))
+        self._store_in_memory(key, entry)
+
+        if self.cache_dir:
+            self._save_to_disk(key, entry)
+
+    def invalidate(self, key: str) -> None:
+        """Remove a single entry from memory and disk."""
+        self._entries.pop(key, None)
+        if self.cache_dir:
+            try:
+                self._disk_path(key).unlink()
+            except FileNotFoundError:
+                pass
+
+    def clear(self) -> None:
+        """Remove all entries from memory and disk."""
+        self._entries.clear()
+        if self.cache_dir:
+            for path in self.cache_dir.glob("*.json"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _store_in_memory(self, key: str, entry: tuple) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _load_from_disk(self, key: str) -> Optional[tuple]:
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data.get("expires_at"), data["value"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Discarding unreadable cache entry {path.name}: {e}")
+            return None
+
+    def _save_to_disk(self, key: str, entry: tuple) -> None:
+        expires_at, value = entry
+        path = self._disk_path(key)
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"expires_at": expires_at, "value": value}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError) as e:
+            logger.warning(f"Failed to persist cache entry {path.name}: {e}")
+
+
+def create_response_cache() -> Optional[ResponseCache]:
+    """
+    Create a response cache from environment variables.
+
+    The cache is off unless enabled explicitly: completions are sampled at a
+    non-zero temperature, so a cached answer would replay the same (possibly
+    wrong) completion when the user retries an utterance.
+
+    Environment variables:
+    - AI_CACHE_ENABLED: 'true' or 'false' (default: 'false')
+    - AI_CACHE_MAX_ENTRIES: Maximum in-memory entries (default: 256)
+    - AI_CACHE_TTL: Entry lifetime in seconds, 0 disables expiry (default: 3600)
+    - AI_CACHE_DIR: Directory for the optional on-disk store (default: unset)
+    """
+    if os.getenv("AI_CACHE_ENABLED", "false").lower() != "true":
+        return None
+
+    ttl = float(os.getenv("AI_CACHE_TTL", "3600"))
+    return ResponseCache(
+        max_entries=int(os.getenv("AI_CACHE_MAX_ENTRIES", "256")),
+        ttl=ttl if ttl > 0 else None,
+        cache_dir=os.getenv("AI_CACHE_DIR") or None
+    )
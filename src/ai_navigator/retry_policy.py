@@ -0,0 +1,163 @@
+"""
+Retry Policy Engine
+
+Exponential backoff with jitter, retryable-error classification, idempotency
+awareness and a total deadline for MCP requests. The policy wraps whole
+request coroutines, so it applies the same way to every transport.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+def _root_cause(error: BaseException) -> BaseException:
+    """Follow explicit/implicit exception chaining to the original error."""
+    seen = set()
+    while id(error) not in seen:
+        seen.add(id(error))
+        cause = error.__cause__ or error.__context__
+        if cause is None:
+            break
+        error = cause
+    return error
+
+
+_RETRYABLE_ERRORS = (
+    TimeoutError,
+    asyncio.TimeoutError,
+    ConnectionError,
+    httpx.TimeoutException,
+    httpx.NetworkError,
+)
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """
+    Classify an error as transient.
+
+    Retryable: timeouts, connection failures/resets, HTTP 5xx and 429.
+    Not retryable: other HTTP status errors, protocol/decoding errors,
+    JSON-RPC errors, validation errors.
+
+    The transports wrap every httpx failure in a ConnectionError, so a
+    wrapped error is classified by the exception it was raised from.
+    """
+    cause = _root_cause(error)
+
+    if isinstance(cause, httpx.HTTPStatusError):
+        status = cause.response.status_code
+        return status >= 500 or status == 429
+
+    if error.__cause__ is not None:
+        error = cause
+
+    return isinstance(error, _RETRYABLE_ERRORS)
+
+
+def is_request_unsent(error: BaseException) -> bool:
+    """
+    True if the error happened before the request reached the server.
+
+    Such failures are safe to retry even for non-idempotent operations.
+    """
+    cause = _root_cause(error)
+    return isinstance(cause, (httpx.ConnectError, httpx.ConnectTimeout, ConnectionRefusedError))
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Retry configuration for MCP requests.
+
+    Attributes:
+        max_retries: Retries after the first attempt
+        base_delay: Delay before the first retry, in seconds
+        max_delay: Upper bound for a single backoff delay
+        multiplier: Exponential growth factor between retries
+        jitter: Apply full jitter (uniform between 0 and the computed delay)
+        deadline: Total time budget across all attempts, in seconds (None = unlimited)
+        retry_non_idempotent: Also retry non-idempotent operations after the
+            request may have reached the server
+    """
+    max_retries: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 10.0
+    multiplier: float = 2.0
+    jitter: bool = True
+    deadline: Optional[float] = None
+    retry_non_idempotent: bool = False
+
+    def compute_delay(self, retry_number: int) -> float:
+        """Backoff delay before the given retry (1-based)."""
+        delay = min(self.max_delay, self.base_delay * (self.multiplier ** (retry_number - 1)))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def should_retry(self, error: BaseException, idempotent: bool) -> bool:
+        if not is_retryable_error(error):
+            return False
+        if idempotent or self.retry_non_idempotent:
+            return True
+        return is_request_unsent(error)
+
+    async def run(
+        self,
+        operation: Callable[[], Awaitable[Any]],
+        idempotent: bool = True,
+        description: str = "request"
+    ) -> Any:
+        """
+        Run an operation with retries.
+
+        Args:
+            operation: Zero-argument coroutine factory, called once per attempt
+            idempotent: Whether repeating the operation is safe
+            description: Label used in log messages
+
+        Returns:
+            The operation's result
+
+        Raises:
+            The last error once retries or the deadline are exhausted
+        """
+        started = time.monotonic()
+        attempt = 0
+
+        while True:
+            attempt += 1
+            remaining = None
+            if self.deadline is not None:
+                remaining = self.deadline - (time.monotonic() - started)
+                if remaining <= 0:
+                    raise TimeoutError(f"Deadline of {self.deadline}s exceeded for {description}")
+
+            try:
+                if remaining is None:
+                    return await operation()
+                return await asyncio.wait_for(operation(), timeout=remaining)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if attempt > self.max_retries or not self.should_retry(e, idempotent):
+                    raise
+
+                delay = self.compute_delay(attempt)
+                if self.deadline is not None:
+                    elapsed = time.monotonic() - started
+                    if elapsed + delay >= self.deadline:
+                        raise
+
+                logger.warning(
+                    f"{description} failed (attempt {attempt}/{self.max_retries + 1}): {e}. "
+                    f"Retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
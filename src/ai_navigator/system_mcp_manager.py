@@ -8,20 +8,59 @@ This module provides:
 """
 
 import asyncio
+import atexit
+import functools
+import gzip
 import json
 import logging
 import os
+import queue
+import re
+import shutil
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import closing
 from datetime import datetime
 from enum import Enum
-from typing import Optional, Dict, List, Any, Callable
-from dataclasses import dataclass, field
+from typing import Optional, Dict, List, Any, Callable, Iterator, Tuple, Union
+from dataclasses import dataclass, field, replace
 from mcp import StdioServerParameters
 import sys
+from urllib.parse import urlparse
+from ai_navigator.mcp_client import MCPClient, MCPConfig, TransportType, AuthType, _sanitize_url
 
 logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
 
 
+_DEFAULT_SENSITIVE_KEYS = (
+    'api_key', 'apikey', 'key', 'token', 'password', 'secret',
+    'authorization', 'auth', 'credential', 'access_token',
+    'refresh_token', 'bearer', 'ak', 'sk'
+)
+
+
+@functools.lru_cache(maxsize=32)
+def _sensitive_key_matcher(keys_to_mask: Tuple[str, ...]) -> Callable[[str], bool]:
+    """
+    Build a memoized "is this key sensitive?" check for a set of keywords.
+    
+    The keywords are compiled into one case-insensitive alternation, and
+    results are cached per key since payloads reuse the same few key names.
+    """
+    if not keys_to_mask:
+        return lambda key: False
+    pattern = re.compile("|".join(re.escape(key) for key in keys_to_mask), re.IGNORECASE)
+    
+    @functools.lru_cache(maxsize=1024)
+    def is_sensitive(key: str) -> bool:
+        return pattern.search(key) is not None
+    
+    return is_sensitive
+
+
 def _sanitize_sensitive_data(data: Any, keys_to_mask: List[str] = None) -> Any:
     """
     Recursively sanitize sensitive data from dictionaries for logging.
@@ -33,40 +72,47 @@ def _sanitize_sensitive_data(data: Any, keys_to_mask: List[str] = None) -> Any:
     Returns:
         Sanitized copy of the data
     """
-    if keys_to_mask is None:
-        keys_to_mask = [
-            'api_key', 'apikey', 'key', 'token', 'password', 'secret',
-            'authorization', 'auth', 'credential', 'access_token',
-            'refresh_token', 'bearer', 'ak', 'sk'
-        ]
-    
-    def should_mask(key: str) -> bool:
-        key_lower = key.lower()
-        return any(sensitive in key_lower for sensitive in keys_to_mask)
-    
-    def mask_value(value: Any) -> str:
-        if isinstance(value, str):
-            if len(value) <= 8:
-                return '***'
-            return f"{value[:4]}...{value[-4:]}"
-        return '***'
-    
+    should_mask = _sensitive_key_matcher(_DEFAULT_SENSITIVE_KEYS if keys_to_mask is None else tuple(keys_to_mask))
+    return _sanitize_value(data, should_mask)
+
+
+def _sanitize_value(data: Any, should_mask: Callable[[str], bool]) -> Any:
     if isinstance(data, dict):
         sanitized = {}
         for key, value in data.items():
-            if should_mask(key):
-                sanitized[key] = mask_value(value)
+            if isinstance(key, str) and should_mask(key):
+                sanitized[key] = _mask_value(value)
             elif isinstance(value, (dict, list)):
-                sanitized[key] = _sanitize_sensitive_data(value, keys_to_mask)
+                sanitized[key] = _sanitize_value(value, should_mask)
             else:
                 sanitized[key] = value
         return sanitized
     elif isinstance(data, list):
-        return [_sanitize_sensitive_data(item, keys_to_mask) for item in data]
+        return [_sanitize_value(item, should_mask) for item in data]
     else:
         return data
 
 
+def _mask_value(value: Any) -> str:
+    if isinstance(value, str):
+        if len(value) <= 8:
+            return '***'
+        return f"{value[:4]}...{value[-4:]}"
+    return '***'
+
+
+class _Sanitized:
+    """Log argument that sanitizes its payload only if the record is actually emitted"""
+    
+    __slots__ = ("data",)
+    
+    def __init__(self, data: Any):
+        self.data = data
+    
+    def __str__(self) -> str:
+        return str(_sanitize_sensitive_data(self.data))
+
+
 class PermissionLevel(Enum):
     """Permission levels for MCP tools"""
     SAFE = "safe"
@@ -83,6 +129,37 @@ class TransportMethod(Enum):
     REMOTE = "remote"
 
 
+# Checked in order: the first matching level wins
+_PERMISSION_PATTERNS = (
+    (PermissionLevel.CRITICAL, re.compile("format|wipe|destroy|shutdown|reboot", re.IGNORECASE)),
+    (PermissionLevel.DANGEROUS, re.compile("delete|remove|close|kill|terminate", re.IGNORECASE)),
+    (PermissionLevel.SAFE, re.compile("get|read|list|search|find|open_url|open_map", re.IGNORECASE)),
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def _infer_permission_level(tool_name: str) -> PermissionLevel:
+    """Infer a tool's permission level from keywords in its name (memoized per name)"""
+    for level, pattern in _PERMISSION_PATTERNS:
+        if pattern.search(tool_name):
+            return level
+    return PermissionLevel.NORMAL
+
+
+# Ordered from least to most dangerous
+_PERMISSION_ORDER = (
+    PermissionLevel.SAFE,
+    PermissionLevel.NORMAL,
+    PermissionLevel.DANGEROUS,
+    PermissionLevel.CRITICAL,
+)
+
+# Tools that run other tools of the same server, mapped to the argument listing
+# those operations ({"op": tool_name, ...}); they are checked at the level of
+# their most dangerous operation
+BATCH_TOOLS = {"batch_operations": "operations"}
+
+
 @dataclass
 class ToolMetadata:
     """Metadata for an MCP tool including security information"""
@@ -107,6 +184,17 @@ class AuditLogEntry:
     user_confirmed: bool = False
 
 
+@dataclass
+class ServerRegistrationResult:
+    """Outcome of registering one server via register_servers"""
+    name: str
+    success: bool
+    lazy: bool = False
+    tool_count: int = 0
+    duration: float = 0.0
+    error: Optional[str] = None
+
+
 class SecurityValidator:
     """Security validation and confirmation for tool calls"""
     
@@ -169,12 +257,92 @@ class SecurityValidator:
         return response in ["yes", "y"]
 
 
+# Writer-queue markers: end the current batch now / end the current batch and stop
+_FLUSH = object()
+_STOP = object()
+
+_AUDIT_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS audit_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    server_name TEXT NOT NULL,
+    tool_name TEXT NOT NULL,
+    result_status TEXT NOT NULL,
+    entry TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_audit_timestamp ON audit_log (timestamp);
+CREATE INDEX IF NOT EXISTS idx_audit_server ON audit_log (server_name, timestamp);
+CREATE INDEX IF NOT EXISTS idx_audit_tool ON audit_log (tool_name, timestamp);
+CREATE INDEX IF NOT EXISTS idx_audit_status ON audit_log (result_status, timestamp);
+"""
+
+# Audit loggers with a possibly running writer, flushed at interpreter exit
+_open_audit_loggers: "weakref.WeakSet[AuditLogger]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_audit_loggers() -> None:
+    for audit_logger in list(_open_audit_loggers):
+        audit_logger.close()
+
+
 class AuditLogger:
-    """Audit logger for tracking all MCP tool calls"""
+    """
+    Audit logger for tracking all MCP tool calls
     
-    def __init__(self, log_file: str = "mcp_audit.log"):
+    Entries are queued by ``log_call`` and written in batches by a background
+    thread, so tool calls never block on file I/O. The log can be rotated by
+    size and/or age, keeping ``backup_count`` segments (optionally gzipped).
+    Call ``flush``/``close`` (or their async variants) to make sure queued
+    entries reach the disk; pending entries are also flushed at interpreter exit.
+    
+    Recent entries are read backwards from the end of the active log, then
+    from the rotated segments, newest first. With
+    ``index_path`` set, entries are also indexed in SQLite for filtered,
+    paginated queries across rotations.
+    """
+    
+    TAIL_BLOCK_SIZE = 64 * 1024
+    
+    def __init__(
+        self,
+        log_file: str = "mcp_audit.log",
+        max_bytes: Optional[int] = None,
+        rotate_interval: Optional[float] = None,
+        backup_count: int = 5,
+        compress: bool = False,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        index_path: Optional[str] = None
+    ):
+        """
+        Args:
+            log_file: Path of the active audit log
+            max_bytes: Rotate once the active log reaches this size (None = never)
+            rotate_interval: Rotate once the active log is this many seconds old (None = never)
+            backup_count: Number of rotated segments to keep
+            compress: Gzip rotated segments
+            batch_size: Maximum entries written per batch
+            flush_interval: Seconds the writer waits for more entries before writing a batch
+            index_path: SQLite database indexing every entry for filtered queries (None = no index)
+        """
         self.log_file = log_file
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = backup_count
+        self.compress = compress
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        self.index_path = index_path
+        self._index_conn: Optional[sqlite3.Connection] = None
+        self._segment_started = time.time()
         self._ensure_log_file()
+        if self.index_path:
+            self._init_index()
+        _open_audit_loggers.add(self)
     
     def _ensure_log_file(self):
         """Ensure audit log file exists"""
@@ -182,45 +350,548 @@ class AuditLogger:
             with open(self.log_file, 'w') as f:
                 f.write("# MCP Audit Log\n")
                 f.write(f"# Created: {datetime.now().isoformat()}\n\n")
+            self._segment_started = time.time()
     
     def log_call(self, entry: AuditLogEntry):
-        """Log a tool call to the audit log"""
+        """Queue a tool call for the audit log"""
         entry_dict = entry.__dict__.copy()
         entry_dict['arguments'] = _sanitize_sensitive_data(entry_dict.get('arguments', {}))
         
-        with open(self.log_file, 'a') as f:
-            f.write(f"{json.dumps(entry_dict, ensure_ascii=False)}\n")
+        self._start_writer()
+        self._queue.put(entry_dict)
         
         logger.info(f"Audit: {entry.server_name}.{entry.tool_name} - {entry.result_status}")
     
+    def flush(self) -> None:
+        """Block until every queued entry has been written"""
+        if self._writer is not None and self._writer.is_alive():
+            # The marker ends the current batch immediately instead of waiting out flush_interval
+            self._queue.put(_FLUSH)
+            self._queue.join()
+    
+    def close(self) -> None:
+        """Flush queued entries and stop the writer thread"""
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+        
+        if writer is not None and writer.is_alive():
+            self._queue.put(_STOP)
+            writer.join()
+    
+    async def aflush(self) -> None:
+        """Async variant of ``flush`` that does not block the event loop"""
+        await asyncio.to_thread(self.flush)
+    
+    async def aclose(self) -> None:
+        """Async variant of ``close`` that does not block the event loop"""
+        await asyncio.to_thread(self.close)
+    
+    def _start_writer(self) -> None:
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(
+                    target=self._write_loop,
+                    name=f"audit-writer:{os.path.basename(self.log_file)}",
+                    daemon=True
+                )
+                self._writer.start()
+    
+    def _write_loop(self) -> None:
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            
+            # Gather more entries until the batch is full, the queue stays quiet or a marker arrives
+            deadline = time.monotonic() + self.flush_interval
+            while isinstance(batch[-1], dict) and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            stopping = batch[-1] is _STOP
+            entries = [item for item in batch if isinstance(item, dict)]
+            
+            try:
+                if entries:
+                    self._write_batch(entries)
+                    if self.index_path:
+                        self._index_batch(entries)
+            except Exception as e:
+                logger.error(f"Failed to write audit log batch: {e}")
+            finally:
+                if stopping and self._index_conn is not None:
+                    self._index_conn.close()
+                    self._index_conn = None
+                for _ in batch:
+                    self._queue.task_done()
+    
+    def _write_batch(self, entries: List[Dict[str, Any]]) -> None:
+        if self._should_rotate():
+            self._rotate()
+        self._ensure_log_file()
+        
+        lines = "".join(f"{json.dumps(entry, ensure_ascii=False)}\n" for entry in entries)
+        with open(self.log_file, 'a') as f:
+            f.write(lines)
+    
+    def _should_rotate(self) -> bool:
+        if self.rotate_interval is not None and time.time() - self._segment_started >= self.rotate_interval:
+            return os.path.exists(self.log_file)
+        
+        if self.max_bytes is not None:
+            try:
+                return os.path.getsize(self.log_file) >= self.max_bytes
+            except OSError:
+                return False
+        
+        return False
+    
+    def _segment_path(self, index: int) -> str:
+        suffix = ".gz" if self.compress else ""
+        return f"{self.log_file}.{index}{suffix}"
+    
+    def _rotate(self) -> None:
+        """Shift rotated segments up by one and move the active log to segment 1"""
+        if self.backup_count <= 0:
+            os.remove(self.log_file)
+        else:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = self._segment_path(index)
+                if os.path.exists(source):
+                    os.replace(source, self._segment_path(index + 1))
+            
+            if self.compress:
+                with open(self.log_file, 'rb') as src, gzip.open(self._segment_path(1), 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(self.log_file)
+            else:
+                os.replace(self.log_file, self._segment_path(1))
+        
+        self._segment_started = time.time()
+        logger.info(f"Rotated audit log {self.log_file}")
+    
     def get_recent_logs(self, count: int = 10) -> List[AuditLogEntry]:
         """Get recent audit log entries"""
-        entries = []
+        return self.query_logs(limit=count)
+    
+    def query_logs(
+        self,
+        server_name: Optional[str] = None,
+        tool_name: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[Union[str, datetime]] = None,
+        until: Optional[Union[str, datetime]] = None,
+        limit: int = 10,
+        offset: int = 0
+    ) -> List[AuditLogEntry]:
+        """
+        Query audit entries, newest first
         
-        if not os.path.exists(self.log_file):
-            return entries
+        Uses the SQLite index when configured; otherwise scans the active log
+        backwards from its end and continues into the rotated segments.
+        
+        Args:
+            server_name: Only entries for this server
+            tool_name: Only entries for this tool
+            status: Only entries with this result status
+            since: Only entries at or after this time (datetime or ISO string)
+            until: Only entries at or before this time (datetime or ISO string)
+            limit: Maximum entries to return
+            offset: Matching entries to skip, for pagination
+        """
+        self.flush()
+        
+        since = since.isoformat() if isinstance(since, datetime) else since
+        until = until.isoformat() if isinstance(until, datetime) else until
         
-        with open(self.log_file, 'r') as f:
-            lines = f.readlines()
+        if self.index_path:
+            return self._query_index(server_name, tool_name, status, since, until, limit, offset)
         
-        for line in reversed(lines):
-            if line.startswith('#') or not line.strip():
+        entries = []
+        skipped = 0
+        for data in self._iter_entries_reversed():
+            if server_name is not None and data.get("server_name") != server_name:
+                continue
+            if tool_name is not None and data.get("tool_name") != tool_name:
+                continue
+            if status is not None and data.get("result_status") != status:
+                continue
+            timestamp = data.get("timestamp", "")
+            if until is not None and timestamp > until:
+                continue
+            if since is not None and timestamp < since:
+                continue
+            
+            if skipped < offset:
+                skipped += 1
                 continue
             
+            entries.append(AuditLogEntry(**data))
+            if len(entries) >= limit:
+                break
+        
+        return entries
+    
+    def _iter_entries_reversed(self) -> Iterator[Dict[str, Any]]:
+        """Yield entries from newest to oldest: the active log, then rotated segments 1, 2, ..."""
+        yield from self._iter_file_reversed(self.log_file)
+        
+        for index in range(1, self.backup_count + 1):
+            # Either form, in case compression was switched since the segment was written
+            for path in (self._segment_path(index), f"{self.log_file}.{index}.gz", f"{self.log_file}.{index}"):
+                if os.path.exists(path):
+                    yield from self._iter_file_reversed(path)
+                    break
+    
+    def _iter_file_reversed(self, path: str) -> Iterator[Dict[str, Any]]:
+        """Yield the entries of one log file from newest to oldest, reading blocks from the end"""
+        if path.endswith(".gz"):
+            # gzip cannot seek backwards cheaply; rotated segments are bounded, so read them whole
             try:
-                data = json.loads(line)
-                entries.append(AuditLogEntry(**data))
+                with gzip.open(path, 'rb') as f:
+                    lines = f.read().split(b"\n")
+            except (OSError, EOFError):
+                return
+            for line in reversed(lines):
+                data = self._parse_line(line)
+                if data is not None:
+                    yield data
+            return
+        
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return
+        
+        with f:
+            position = f.seek(0, os.SEEK_END)
+            remainder = b""
+            
+            while position > 0:
+                read_size = min(self.TAIL_BLOCK_SIZE, position)
+                position -= read_size
+                f.seek(position)
+                block = f.read(read_size) + remainder
+                
+                lines = block.split(b"\n")
+                # The first piece may be a partial line; keep it for the next block
+                remainder = lines.pop(0) if position > 0 else b""
                 
-                if len(entries) >= count:
+                for line in reversed(lines):
+                    data = self._parse_line(line)
+                    if data is not None:
+                        yield data
+            
+            data = self._parse_line(remainder)
+            if data is not None:
+                yield data
+    
+    @staticmethod
+    def _parse_line(line: bytes) -> Optional[Dict[str, Any]]:
+        line = line.strip()
+        if not line or line.startswith(b"#"):
+            return None
+        try:
+            return json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return None
+    
+    def _init_index(self) -> None:
+        """Create the index schema, importing the existing logs when the index is new"""
+        is_new = not os.path.exists(self.index_path)
+        
+        with closing(sqlite3.connect(self.index_path)) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_AUDIT_INDEX_SCHEMA)
+            
+            if is_new:
+                entries = list(self._iter_entries_reversed())
+                entries.reverse()
+                self._insert_index_rows(conn, entries)
+    
+    def _index_batch(self, entries: List[Dict[str, Any]]) -> None:
+        if self._index_conn is None:
+            self._index_conn = sqlite3.connect(self.index_path)
+        self._insert_index_rows(self._index_conn, entries)
+    
+    @staticmethod
+    def _insert_index_rows(conn: sqlite3.Connection, entries: List[Dict[str, Any]]) -> None:
+        with conn:
+            conn.executemany(
+                "INSERT INTO audit_log (timestamp, server_name, tool_name, result_status, entry) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        entry.get("timestamp", ""),
+                        entry.get("server_name", ""),
+                        entry.get("tool_name", ""),
+                        entry.get("result_status", ""),
+                        json.dumps(entry, ensure_ascii=False)
+                    )
+                    for entry in entries
+                ]
+            )
+    
+    def _query_index(
+        self,
+        server_name: Optional[str],
+        tool_name: Optional[str],
+        status: Optional[str],
+        since: Optional[str],
+        until: Optional[str],
+        limit: int,
+        offset: int
+    ) -> List[AuditLogEntry]:
+        clauses = []
+        params: List[Any] = []
+        for column, value, operator in (
+            ("server_name", server_name, "="),
+            ("tool_name", tool_name, "="),
+            ("result_status", status, "="),
+            ("timestamp", since, ">="),
+            ("timestamp", until, "<="),
+        ):
+            if value is not None:
+                clauses.append(f"{column} {operator} ?")
+                params.append(value)
+        
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT entry FROM audit_log {where} ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?"
+        
+        with closing(sqlite3.connect(self.index_path)) as conn:
+            rows = conn.execute(sql, params + [limit, offset]).fetchall()
+        
+        return [AuditLogEntry(**json.loads(row[0])) for row in rows]
+
+
+
+class StdioReplica:
+    """
+    One stdio MCP server subprocess.
+    
+    Requests are matched to responses by JSON-RPC id through a background
+    reader task, so several requests can be outstanding on the same process.
+    """
+    
+    # Generous line limit: tool results (e.g. read_file) arrive as a single JSON line
+    STREAM_LIMIT = 16 * 1024 * 1024
+    START_TIMEOUT = 30.0
+    
+    def __init__(
+        self,
+        server_name: str,
+        index: int,
+        command: str,
+        server_path: str,
+        on_exit: Optional[Callable[["StdioReplica"], None]] = None
+    ):
+        self.server_name = server_name
+        self.index = index
+        self.command = command
+        self.server_path = server_path
+        self.on_exit = on_exit
+        self.process = None
+        self.outstanding = 0
+        self.restarts = 0
+        self.last_started = 0.0
+        self._request_id = 0
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._reader_task: Optional[asyncio.Task] = None
+        self._stderr_task: Optional[asyncio.Task] = None
+        self._write_lock = asyncio.Lock()
+        self.restart_lock = asyncio.Lock()
+    
+    @property
+    def label(self) -> str:
+        return f"{self.server_name}[{self.index}]"
+    
+    @property
+    def alive(self) -> bool:
+        return (
+            self.process is not None
+            and self.process.returncode is None
+            and self._reader_task is not None
+            and not self._reader_task.done()
+        )
+    
+    async def start(self) -> bool:
+        """Spawn the process and perform the MCP initialize handshake"""
+        self.last_started = time.monotonic()
+        try:
+            self.process = await asyncio.create_subprocess_exec(
+                self.command,
+                self.server_path,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=os.environ.copy(),
+                limit=self.STREAM_LIMIT
+            )
+            self._reader_task = asyncio.create_task(self._read_loop())
+            self._stderr_task = asyncio.create_task(self._drain_stderr())
+            
+            response = await self.request("initialize", {
+                "protocolVersion": "2024-11-05",
+                "capabilities": {},
+                "clientInfo": {
+                    "name": "SystemMCPManager",
+                    "version": "1.0.0"
+                }
+            }, timeout=self.START_TIMEOUT)
+            
+            if "result" not in response:
+                raise RuntimeError(f"Invalid initialize response: {response}")
+            
+            await self._write({"jsonrpc": "2.0", "method": "notifications/initialized"})
+            logger.info(f"Started {self.label} (pid {self.process.pid})")
+            return True
+        
+        except Exception as e:
+            logger.error(f"Failed to start {self.label}: {e}")
+            await self.stop()
+            return False
+    
+    async def request(
+        self,
+        method: str,
+        params: Dict[str, Any],
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Send a JSON-RPC request and wait for the matching response"""
+        if self.process is None:
+            raise RuntimeError("Process not available")
+        
+        self._request_id += 1
+        request_id = self._request_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self.outstanding += 1
+        
+        try:
+            await self._write({
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "method": method,
+                "params": params
+            })
+            return await asyncio.wait_for(future, timeout=timeout)
+        finally:
+            self._pending.pop(request_id, None)
+            self.outstanding -= 1
+    
+    async def ping(self, timeout: float) -> bool:
+        try:
+            await self.request("ping", {}, timeout=timeout)
+            return True
+        except Exception as e:
+            logger.warning(f"Health check failed for {self.label}: {e}")
+            return False
+    
+    async def stop(self) -> None:
+        """Terminate the process and fail any requests still waiting on it"""
+        process, self.process = self.process, None
+        
+        # Stop reading first so a deliberate shutdown is not reported as a crash
+        for task in (self._reader_task, self._stderr_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        
+        if process is not None and process.returncode is None:
+            try:
+                process.terminate()
+                try:
+                    await asyncio.wait_for(process.wait(), timeout=5)
+                except asyncio.TimeoutError:
+                    process.kill()
+                    await process.wait()
+            except ProcessLookupError:
+                pass
+            except Exception as e:
+                logger.error(f"Error terminating {self.label}: {e}")
+        
+        self._fail_pending(ConnectionError(f"{self.label} stopped"))
+    
+    async def _write(self, message: Dict[str, Any]) -> None:
+        if not self.process or not self.process.stdin:
+            raise RuntimeError("Process not available")
+        
+        async with self._write_lock:
+            self.process.stdin.write((json.dumps(message) + "\n").encode())
+            await self.process.stdin.drain()
+        
+        logger.debug("Sent to %s: %s", self.label, _Sanitized(message))
+    
+    async def _read_loop(self) -> None:
+        stdout = self.process.stdout
+        try:
+            while True:
+                line = await stdout.readline()
+                if not line:
                     break
-            except json.JSONDecodeError:
-                continue
+                
+                try:
+                    message = json.loads(line.decode().strip())
+                except json.JSONDecodeError as e:
+                    logger.error(f"Failed to decode JSON from {self.label}: {e}")
+                    continue
+                
+                logger.debug("Received from %s: %s", self.label, _Sanitized(message))
+                
+                future = self._pending.get(message.get("id"))
+                if future is not None and not future.done():
+                    future.set_result(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error reading from {self.label}: {e}")
         
-        return entries
+        logger.warning(f"{self.label} closed its output")
+        self._fail_pending(ConnectionError(f"{self.label} exited"))
+        if self.on_exit:
+            self.on_exit(self)
+    
+    async def _drain_stderr(self) -> None:
+        # An unread stderr pipe eventually fills up and blocks the server
+        stderr = self.process.stderr
+        while True:
+            line = await stderr.readline()
+            if not line:
+                return
+            logger.debug(f"{self.label} stderr: {line.decode(errors='replace').rstrip()}")
+    
+    def _fail_pending(self, error: Exception) -> None:
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "pid": self.process.pid if self.process else None,
+            "alive": self.alive,
+            "outstanding": self.outstanding,
+            "restarts": self.restarts
+        }
 
 
 class MCPServerConnection:
-    """Abstraction for MCP server connection with transport method decoupling"""
+    """
+    Abstraction for MCP server connection with transport method decoupling
+    
+    Stdio servers can run as several replica processes (``replicas`` kwarg);
+    requests go to the live replica with the fewest outstanding requests, and
+    a supervisor task pings idle replicas and respawns crashed ones.
+    """
+    
+    MIN_RESPAWN_INTERVAL = 1.0
     
     def __init__(
         self,
@@ -234,11 +905,17 @@ class MCPServerConnection:
         self.server_path = server_path
         self.transport = transport
         self.server_url = server_url
-        self.process = None
-        self.request_id = 0
+        self.client: Optional[MCPClient] = None
         self.connected = False
         self.tools_metadata: Dict[str, ToolMetadata] = {}
         self.kwargs = kwargs
+        self.replicas: List[StdioReplica] = []
+        self.replica_count = max(1, int(kwargs.get("replicas", 1)))
+        self.health_check_interval = kwargs.get("health_check_interval", 30.0)
+        self.health_check_timeout = kwargs.get("health_check_timeout", 5.0)
+        self.request_timeout = kwargs.get("request_timeout")
+        self._supervisor_task: Optional[asyncio.Task] = None
+        self._supervisor_wake: Optional[asyncio.Event] = None
     
     async def connect(self) -> bool:
         """Connect to MCP server using configured transport method"""
@@ -259,45 +936,25 @@ class MCPServerConnection:
             return False
     
     async def _connect_stdio(self) -> bool:
-        """Connect via stdio transport (local process)"""
+        """Connect via stdio transport (one or more local replica processes)"""
         try:
             # Support custom command from kwargs
             command = self.kwargs.get("command", sys.executable)
             logger.info(f"Using Python executable: {command}")
             
-            # Create subprocess for MCP server
-            self.process = await asyncio.create_subprocess_exec(
-                command,
-                self.server_path,
-                stdin=asyncio.subprocess.PIPE,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                env=os.environ.copy()
-            )
-            
-            # Send JSON-RPC initialize request
-            init_request = {
-                "jsonrpc": "2.0",
-                "id": self._get_next_id(),
-                "method": "initialize",
-                "params": {
-                    "protocolVersion": "2024-11-05",
-                    "capabilities": {},
-                    "clientInfo": {
-                        "name": "SystemMCPManager",
-                        "version": "1.0.0"
-                    }
-                }
-            }
-            
-            await self._send_request(init_request)
-            response = await self._receive_response()
+            self.replicas = [
+                StdioReplica(self.name, index, command, self.server_path, on_exit=self._on_replica_exit)
+                for index in range(self.replica_count)
+            ]
+            started = await asyncio.gather(*(replica.start() for replica in self.replicas))
             
-            if not response or "result" not in response:
-                raise RuntimeError(f"Invalid initialize response: {response}")
+            if not any(started):
+                raise RuntimeError("No replica could be started")
             
             self.connected = True
-            logger.info(f"Connected to {self.name} via stdio")
+            self._supervisor_wake = asyncio.Event()
+            self._supervisor_task = asyncio.create_task(self._supervise())
+            logger.info(f"Connected to {self.name} via stdio ({sum(started)}/{len(started)} replicas)")
             return True
             
         except Exception as e:
@@ -306,73 +963,163 @@ class MCPServerConnection:
             return False
     
     async def _connect_http(self) -> bool:
-        """Connect via HTTP transport (remote server)"""
-        logger.warning(f"HTTP transport not yet implemented for {self.name}")
-        return False
+        """Connect via HTTP transport (remote server, streamable HTTP by default)"""
+        transport_type = self.kwargs.get("transport_type", TransportType.HTTP_STREAM)
+        return await self._connect_client(transport_type)
     
     async def _connect_websocket(self) -> bool:
         """Connect via WebSocket transport (remote server)"""
-        logger.warning(f"WebSocket transport not yet implemented for {self.name}")
-        return False
+        return await self._connect_client(TransportType.WEBSOCKET)
     
     async def _connect_remote(self) -> bool:
-        """Connect to remote/containerized server"""
-        logger.warning(f"Remote transport not yet implemented for {self.name}")
-        return False
+        """Connect to remote/containerized server, choosing the transport from the URL"""
+        transport_type = self.kwargs.get("transport_type") or self._infer_transport_type(self.server_url)
+        if transport_type is None:
+            logger.error(f"Cannot infer transport for {self.name} from URL {_sanitize_url(self.server_url)}")
+            return False
+        return await self._connect_client(transport_type)
     
-    def _get_next_id(self) -> int:
-        """Get next request ID for JSON-RPC"""
-        self.request_id += 1
-        return self.request_id
+    @staticmethod
+    def _infer_transport_type(server_url: Optional[str]) -> Optional[TransportType]:
+        """Map a server URL to a client transport: ws(s) -> WebSocket, .../sse -> SSE, http(s) -> streamable HTTP"""
+        if not server_url:
+            return None
+        
+        parsed = urlparse(server_url)
+        if parsed.scheme in ("ws", "wss"):
+            return TransportType.WEBSOCKET
+        if parsed.scheme in ("http", "https"):
+            if parsed.path.rstrip("/").endswith("/sse"):
+                return TransportType.HTTP_SSE
+            return TransportType.HTTP_STREAM
+        return None
     
-    async def _send_request(self, request: Dict[str, Any]):
-        """Send JSON-RPC request to MCP server"""
-        if not self.process or not self.process.stdin:
-            raise RuntimeError("Process not available")
+    async def _connect_client(self, transport_type: TransportType) -> bool:
+        """Connect through an MCPClient using one of the mcp_client transports"""
+        if not self.server_url:
+            logger.error(f"server_url is required for {self.transport.value} transport ({self.name})")
+            return False
+        
+        config = MCPConfig(
+            server_url=self.server_url,
+            transport_type=transport_type,
+            auth_type=self.kwargs.get("auth_type", AuthType.NONE),
+            auth_token=self.kwargs.get("auth_token"),
+            timeout=self.kwargs.get("timeout", 30),
+            max_retries=self.kwargs.get("max_retries", 3),
+            client_info={
+                "name": "SystemMCPManager",
+                "version": "1.0.0"
+            },
+            eager_discovery=()
+        )
         
-        message = json.dumps(request) + "\n"
-        self.process.stdin.write(message.encode())
-        await self.process.stdin.drain()
-        sanitized_request = _sanitize_sensitive_data(request)
-        logger.debug(f"Sent request: {sanitized_request}")
+        client = MCPClient(config)
+        if not await client.connect():
+            await client.disconnect()
+            logger.error(f"Failed to connect to {self.name} via {transport_type.value}")
+            return False
+        
+        self.client = client
+        self.connected = True
+        logger.info(f"Connected to {self.name} via {transport_type.value}: {_sanitize_url(self.server_url)}")
+        return True
     
-    async def _receive_response(self) -> Optional[Dict[str, Any]]:
-        """Receive JSON-RPC response from MCP server"""
-        if not self.process or not self.process.stdout:
-            raise RuntimeError("Process not available")
+    @property
+    def process(self):
+        """Process of the first live replica (stdio transport only)"""
+        for replica in self.replicas:
+            if replica.alive:
+                return replica.process
+        return None
+    
+    async def _request(self, method: str, params: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Dispatch a request to the live replica with the fewest outstanding requests"""
+        alive = [replica for replica in self.replicas if replica.alive]
         
-        try:
-            line = await self.process.stdout.readline()
-            if line:
-                response = json.loads(line.decode().strip())
-                sanitized_response = _sanitize_sensitive_data(response)
-                logger.debug(f"Received response: {sanitized_response}")
-                return response
-            else:
-                logger.warning("Received empty response")
-                return None
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to decode JSON response: {e}")
-            return None
-        except Exception as e:
-            logger.error(f"Error receiving response: {e}")
-            return None
+        if not alive:
+            await asyncio.gather(*(self._respawn(replica) for replica in self.replicas))
+            alive = [replica for replica in self.replicas if replica.alive]
+            if not alive:
+                raise RuntimeError(f"No live replicas for {self.name}")
+        
+        replica = min(alive, key=lambda candidate: candidate.outstanding)
+        return await replica.request(method, params, timeout=timeout)
+    
+    def _on_replica_exit(self, replica: StdioReplica) -> None:
+        if self.connected and self._supervisor_wake is not None:
+            self._supervisor_wake.set()
+    
+    async def _supervise(self) -> None:
+        """Health-check idle replicas periodically and respawn dead ones"""
+        while self.connected:
+            try:
+                await asyncio.wait_for(self._supervisor_wake.wait(), timeout=self.health_check_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._supervisor_wake.clear()
+            
+            try:
+                await asyncio.gather(*(self._check_replica(replica) for replica in self.replicas))
+            except Exception as e:
+                logger.error(f"Replica supervision error for {self.name}: {e}")
+    
+    async def _check_replica(self, replica: StdioReplica) -> None:
+        # Busy replicas are evidently responsive; only ping idle ones
+        if replica.alive and replica.outstanding == 0:
+            if not await replica.ping(timeout=self.health_check_timeout):
+                await replica.stop()
+        
+        if not replica.alive:
+            await self._respawn(replica)
+    
+    async def _respawn(self, replica: StdioReplica) -> None:
+        async with replica.restart_lock:
+            if replica.alive or not self.connected:
+                return
+            
+            # Avoid a hot loop when a server crashes right after starting
+            wait = self.MIN_RESPAWN_INTERVAL - (time.monotonic() - replica.last_started)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            
+            await replica.stop()
+            replica.restarts += 1
+            logger.warning(f"Respawning {replica.label} (restart #{replica.restarts})")
+            await replica.start()
+    
+    def get_replica_stats(self) -> List[Dict[str, Any]]:
+        """Per-replica pid, liveness, outstanding requests and restart count"""
+        return [replica.stats() for replica in self.replicas]
     
     async def _cleanup_stdio(self):
         """Clean up stdio connection resources"""
-        try:
-            if self.process:
-                self.process.terminate()
-                await self.process.wait()
-        except Exception as e:
-            logger.error(f"Error terminating process: {e}")
-        finally:
-            self.process = None
-            self.connected = False
+        self.connected = False
+        
+        if self._supervisor_task and not self._supervisor_task.done():
+            self._supervisor_task.cancel()
+            try:
+                await self._supervisor_task
+            except asyncio.CancelledError:
+                pass
+        self._supervisor_task = None
+        self._supervisor_wake = None
+        
+        await asyncio.gather(*(replica.stop() for replica in self.replicas))
+        self.replicas = []
     
     async def disconnect(self):
         """Disconnect from MCP server"""
-        await self._cleanup_stdio()
+        if self.client:
+            try:
+                await self.client.disconnect()
+            except Exception as e:
+                logger.error(f"Error disconnecting client: {e}")
+            finally:
+                self.client = None
+                self.connected = False
+        else:
+            await self._cleanup_stdio()
         logger.info(f"Disconnected from {self.name}")
     
     async def discover_tools(self) -> List[ToolMetadata]:
@@ -381,22 +1128,23 @@ class MCPServerConnection:
             raise RuntimeError(f"Not connected to {self.name}")
         
         try:
-            # Send tools/list request
-            request = {
-                "jsonrpc": "2.0",
-                "id": self._get_next_id(),
-                "method": "tools/list",
-                "params": {}
-            }
-            
-            await self._send_request(request)
-            response = await self._receive_response()
-            
-            if not response or "result" not in response:
-                logger.error(f"Invalid tools/list response: {response}")
-                return []
-            
-            tools = response["result"].get("tools", [])
+            if self.client:
+                tools = [
+                    {
+                        "name": tool.name,
+                        "description": tool.description,
+                        "inputSchema": tool.parameters
+                    }
+                    for tool in await self.client.discover_tools()
+                ]
+            else:
+                response = await self._request("tools/list", {}, timeout=self.request_timeout)
+                
+                if not response or "result" not in response:
+                    logger.error(f"Invalid tools/list response: {response}")
+                    return []
+                
+                tools = response["result"].get("tools", [])
             
             for tool in tools:
                 tool_name = tool.get("name", "")
@@ -426,25 +1174,7 @@ class MCPServerConnection:
     
     def _infer_permission_level(self, tool_name: str) -> PermissionLevel:
         """Infer permission level based on tool name"""
-        dangerous_keywords = ["delete", "remove", "close", "kill", "terminate"]
-        critical_keywords = ["format", "wipe", "destroy", "shutdown", "reboot"]
-        safe_keywords = ["get", "read", "list", "search", "find", "open_url", "open_map"]
-        
-        tool_lower = tool_name.lower()
-        
-        for keyword in critical_keywords:
-            if keyword in tool_lower:
-                return PermissionLevel.CRITICAL
-        
-        for keyword in dangerous_keywords:
-            if keyword in tool_lower:
-                return PermissionLevel.DANGEROUS
-        
-        for keyword in safe_keywords:
-            if keyword in tool_lower:
-                return PermissionLevel.SAFE
-        
-        return PermissionLevel.NORMAL
+        return _infer_permission_level(tool_name)
     
     async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
         """Call a tool on this server"""
@@ -455,19 +1185,14 @@ class MCPServerConnection:
             raise ValueError(f"Tool '{tool_name}' not found in {self.name}")
         
         try:
-            # Send tools/call request
-            request = {
-                "jsonrpc": "2.0",
-                "id": self._get_next_id(),
-                "method": "tools/call",
-                "params": {
-                    "name": tool_name,
-                    "arguments": arguments
-                }
-            }
+            if self.client:
+                # Remote transports: retries and circuit breaking are handled by MCPClient
+                return await self.client.call_tool(tool_name, arguments)
             
-            await self._send_request(request)
-            response = await self._receive_response()
+            response = await self._request("tools/call", {
+                "name": tool_name,
+                "arguments": arguments
+            }, timeout=self.request_timeout)
             
             if not response:
                 raise RuntimeError(f"No response received for tool call: {tool_name}")
@@ -501,12 +1226,21 @@ class SystemMCPManager:
         self,
         enable_security: bool = True,
         enable_confirmation: bool = True,
-        audit_log_file: str = "mcp_audit.log"
+        audit_log_file: str = "mcp_audit.log",
+        audit_logger: Optional[AuditLogger] = None
     ):
+        """
+        Args:
+            enable_security: Apply permission checks to tool calls
+            enable_confirmation: Ask the user before dangerous/critical operations
+            audit_log_file: Audit log path (ignored when ``audit_logger`` is given)
+            audit_logger: Preconfigured audit logger, e.g. with rotation enabled
+        """
         self.servers: Dict[str, MCPServerConnection] = {}
+        self._connect_locks: Dict[str, asyncio.Lock] = {}
         self.enable_security = enable_security
         self.security_validator = SecurityValidator(enable_confirmation=enable_confirmation)
-        self.audit_logger = AuditLogger(log_file=audit_log_file)
+        self.audit_logger = audit_logger or AuditLogger(log_file=audit_log_file)
     
     async def register_server(
         self,
@@ -524,9 +1258,11 @@ class SystemMCPManager:
             name: Unique name for this server
             server_path: Path to server executable/script
             transport: Transport method (stdio, http, websocket, remote)
-            server_url: URL for remote servers
+            server_url: URL for remote servers (http/websocket/remote transports)
             auto_connect: Whether to connect immediately
-            **kwargs: Additional server-specific configuration
+            **kwargs: Additional server-specific configuration, e.g. ``command``
+                for stdio servers, or ``auth_token``, ``auth_type``, ``timeout``
+                and ``transport_type`` (an mcp_client TransportType) for remote ones
             
         Returns:
             True if registration and connection successful
@@ -544,16 +1280,90 @@ class SystemMCPManager:
         )
         
         if auto_connect:
-            if not await connection.connect():
-                logger.error(f"Failed to connect to server '{name}'")
+            if not await self._start_server(connection):
                 return False
-            
-            await connection.discover_tools()
         
         self.servers[name] = connection
         logger.info(f"Registered server '{name}' with transport {transport.value}")
         return True
     
+    async def register_servers(
+        self,
+        servers: List[Dict[str, Any]],
+        lazy: bool = False
+    ) -> Dict[str, ServerRegistrationResult]:
+        """
+        Register several MCP servers, spawning and initializing them concurrently
+        
+        Args:
+            servers: One dict of register_server arguments per server (``name`` and
+                ``server_path`` required); a per-server ``lazy`` key overrides ``lazy``
+            lazy: Register without connecting; each server is started on its first tool call
+            
+        Returns:
+            Per-server outcome keyed by server name
+        """
+        results: Dict[str, ServerRegistrationResult] = {}
+        pending = []
+        
+        for spec in servers:
+            spec = dict(spec)
+            name = spec.get("name", "")
+            server_lazy = spec.pop("lazy", lazy)
+            
+            if not name or name in self.servers or name in results:
+                reason = "missing name" if not name else "already registered"
+                logger.warning(f"Skipping server '{name}': {reason}")
+                results[name] = ServerRegistrationResult(name=name, success=False, error=reason)
+                continue
+            
+            results[name] = ServerRegistrationResult(name=name, success=False, lazy=server_lazy)
+            pending.append((spec, server_lazy))
+        
+        async def register(spec: Dict[str, Any], server_lazy: bool) -> None:
+            result = results[spec["name"]]
+            started = time.monotonic()
+            try:
+                result.success = await self.register_server(auto_connect=not server_lazy, **spec)
+                if not result.success:
+                    result.error = "connection failed"
+                elif not server_lazy:
+                    result.tool_count = len(self.servers[spec["name"]].tools_metadata)
+            except Exception as e:
+                logger.error(f"Failed to register server '{spec['name']}': {e}")
+                result.error = str(e)
+            finally:
+                result.duration = time.monotonic() - started
+        
+        await asyncio.gather(*(register(spec, server_lazy) for spec, server_lazy in pending))
+        
+        succeeded = sum(1 for result in results.values() if result.success)
+        logger.info(f"Registered {succeeded}/{len(results)} servers")
+        return results
+    
+    async def _start_server(self, connection: MCPServerConnection) -> bool:
+        """Connect to a server and discover its tools"""
+        if not await connection.connect():
+            logger.error(f"Failed to connect to server '{connection.name}'")
+            return False
+        
+        await connection.discover_tools()
+        return True
+    
+    async def _ensure_started(self, server: MCPServerConnection) -> None:
+        """Start a lazily registered server on first use"""
+        if server.connected:
+            return
+        
+        lock = self._connect_locks.setdefault(server.name, asyncio.Lock())
+        async with lock:
+            if server.connected:
+                return
+            
+            logger.info(f"Starting server '{server.name}' on first use")
+            if not await self._start_server(server):
+                raise ConnectionError(f"Failed to start server '{server.name}'")
+    
     async def unregister_server(self, name: str):
         """Unregister and disconnect from a server"""
         if name not in self.servers:
@@ -562,6 +1372,7 @@ class SystemMCPManager:
         
         await self.servers[name].disconnect()
         del self.servers[name]
+        self._connect_locks.pop(name, None)
         logger.info(f"Unregistered server '{name}'")
     
     async def call_tool(
@@ -591,11 +1402,12 @@ class SystemMCPManager:
             raise ValueError(f"Server '{server_name}' not registered")
         
         server = self.servers[server_name]
+        await self._ensure_started(server)
         
         if tool_name not in server.tools_metadata:
             raise ValueError(f"Tool '{tool_name}' not found in server '{server_name}'")
         
-        tool_meta = server.tools_metadata[tool_name]
+        tool_meta = self._effective_tool_meta(server, server.tools_metadata[tool_name], arguments)
         
         audit_entry = AuditLogEntry(
             timestamp=datetime.now().isoformat(),
@@ -642,8 +1454,35 @@ class SystemMCPManager:
             self.audit_logger.log_call(audit_entry)
             raise
     
+    def _effective_tool_meta(
+        self,
+        server: MCPServerConnection,
+        tool_meta: ToolMetadata,
+        arguments: Dict[str, Any]
+    ) -> ToolMetadata:
+        """Raise a batch tool's permission level to that of its most dangerous operation"""
+        operations = arguments.get(BATCH_TOOLS[tool_meta.name]) if tool_meta.name in BATCH_TOOLS else None
+        if not isinstance(operations, list):
+            return tool_meta
+        
+        level = tool_meta.permission_level
+        for operation in operations:
+            op_name = str(operation.get("op", "")) if isinstance(operation, dict) else ""
+            inner = server.tools_metadata.get(op_name)
+            op_level = inner.permission_level if inner else _infer_permission_level(op_name)
+            if _PERMISSION_ORDER.index(op_level) > _PERMISSION_ORDER.index(level):
+                level = op_level
+        
+        if level == tool_meta.permission_level:
+            return tool_meta
+        return replace(
+            tool_meta,
+            permission_level=level,
+            requires_confirmation=level in (PermissionLevel.DANGEROUS, PermissionLevel.CRITICAL)
+        )
+    
     def list_all_tools(self) -> Dict[str, List[ToolMetadata]]:
-        """List all available tools from all registered servers"""
+        """List all available tools from all registered servers (lazy servers report none until started)"""
         all_tools = {}
         
         for server_name, server in self.servers.items():
@@ -658,15 +1497,51 @@ class SystemMCPManager:
         
         return list(self.servers[server_name].tools_metadata.values())
     
-    def get_audit_logs(self, count: int = 10) -> List[AuditLogEntry]:
-        """Get recent audit log entries"""
-        return self.audit_logger.get_recent_logs(count)
+    def get_replica_stats(self, server_name: str) -> List[Dict[str, Any]]:
+        """Get per-replica status of a stdio server"""
+        if server_name not in self.servers:
+            raise ValueError(f"Server '{server_name}' not registered")
+        
+        return self.servers[server_name].get_replica_stats()
+    
+    def get_audit_logs(
+        self,
+        count: int = 10,
+        server_name: Optional[str] = None,
+        tool_name: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[Union[str, datetime]] = None,
+        until: Optional[Union[str, datetime]] = None,
+        offset: int = 0
+    ) -> List[AuditLogEntry]:
+        """
+        Get audit log entries, newest first
+        
+        Args:
+            count: Maximum entries to return (page size)
+            server_name: Only entries for this server
+            tool_name: Only entries for this tool
+            status: Only entries with this result status (success/error/denied)
+            since: Only entries at or after this time
+            until: Only entries at or before this time
+            offset: Matching entries to skip (page * count)
+        """
+        return self.audit_logger.query_logs(
+            server_name=server_name,
+            tool_name=tool_name,
+            status=status,
+            since=since,
+            until=until,
+            limit=count,
+            offset=offset
+        )
     
     async def disconnect_all(self):
         """Disconnect from all registered servers"""
         for server_name in list(self.servers.keys()):
             await self.unregister_server(server_name)
         
+        await self.audit_logger.aflush()
         logger.info("Disconnected from all servers")
     
     async def __aenter__(self):
@@ -676,3 +1551,4 @@ class SystemMCPManager:
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
         await self.disconnect_all()
+        await self.audit_logger.aclose()
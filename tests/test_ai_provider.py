@@ -1,13 +1,18 @@
 #!/usr/bin/env python3
 import pytest
+import asyncio
 import json
 import os
 from unittest.mock import Mock, patch, AsyncMock
 from ai_navigator.ai_provider import (
     ClaudeProvider,
     OpenAICompatibleProvider,
+    FailoverProvider,
+    AIProvider,
+    compact_mcp_response,
     create_ai_provider
 )
+from ai_navigator.response_cache import ResponseCache
 
 
 class TestClaudeProvider:
@@ -19,7 +24,7 @@ class TestClaudeProvider:
         mock_message = Mock()
         mock_message.content = [Mock(text='{"start": "北京", "end": "上海"}')]
         
-        with patch.object(provider.client.messages, 'create', return_value=mock_message):
+        with patch.object(provider.client.messages, 'create', new_callable=AsyncMock, return_value=mock_message):
             result = await provider.parse_navigation_request("从北京到上海")
             
             assert result == {"start": "北京", "end": "上海"}
@@ -31,11 +36,89 @@ class TestClaudeProvider:
         mock_message = Mock()
         mock_message.content = [Mock(text='Here is the result: {"start": "广州", "end": "深圳"} done')]
         
-        with patch.object(provider.client.messages, 'create', return_value=mock_message):
+        with patch.object(provider.client.messages, 'create', new_callable=AsyncMock, return_value=mock_message):
             result = await provider.parse_navigation_request("从广州到深圳")
             
             assert result == {"start": "广州", "end": "深圳"}
     
+    @pytest.mark.asyncio
+    async def test_response_cache_skips_repeated_request(self):
+        provider = ClaudeProvider(api_key="test-key", response_cache=ResponseCache())
+        
+        mock_message = Mock()
+        mock_message.content = [Mock(text='{"start": "北京", "end": "上海"}')]
+        
+        with patch.object(provider.client.messages, 'create', new_callable=AsyncMock, return_value=mock_message) as mock_create:
+            first = await provider.parse_navigation_request("从北京到上海")
+            second = await provider.parse_navigation_request("从北京到上海")
+            
+            assert first == second == {"start": "北京", "end": "上海"}
+            assert mock_create.call_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_response_cache_bypass(self):
+        provider = ClaudeProvider(api_key="test-key", response_cache=ResponseCache())
+        provider.bypass_cache = True
+        
+        mock_message = Mock()
+        mock_message.content = [Mock(text='{"start": "北京", "end": "上海"}')]
+        
+        with patch.object(provider.client.messages, 'create', new_callable=AsyncMock, return_value=mock_message) as mock_create:
+            await provider.parse_navigation_request("从北京到上海")
+            await provider.parse_navigation_request("从北京到上海")
+            
+            assert mock_create.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_streaming_stops_at_first_complete_object(self):
+        provider = ClaudeProvider(api_key="test-key", streaming=True)
+        
+        chunks = ['{"start": "北京", ', '"end": "上海"}', ' Let me know', ' if you need more.']
+        consumed = []
+        
+        async def text_stream():
+            for chunk in chunks:
+                consumed.append(chunk)
+                yield chunk
+        
+        mock_stream = Mock()
+        mock_stream.text_stream = text_stream()
+        mock_manager = Mock()
+        mock_manager.__aenter__ = AsyncMock(return_value=mock_stream)
+        mock_manager.__aexit__ = AsyncMock(return_value=False)
+        
+        with patch.object(provider.client.messages, 'stream', return_value=mock_manager):
+            result = await provider.parse_navigation_request("从北京到上海")
+        
+        assert result == {"start": "北京", "end": "上海"}
+        assert consumed == chunks[:2]
+        mock_manager.__aexit__.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_streaming_request_closes_stream(self):
+        provider = ClaudeProvider(api_key="test-key", streaming=True)
+        started = asyncio.Event()
+        
+        async def text_stream():
+            started.set()
+            await asyncio.sleep(10)
+            yield '{"start": "A", "end": "B"}'
+        
+        mock_stream = Mock()
+        mock_stream.text_stream = text_stream()
+        mock_manager = Mock()
+        mock_manager.__aenter__ = AsyncMock(return_value=mock_stream)
+        mock_manager.__aexit__ = AsyncMock(return_value=False)
+        
+        with patch.object(provider.client.messages, 'stream', return_value=mock_manager):
+            task = asyncio.create_task(provider._complete([{"role": "user", "content": "A to B"}], 100))
+            await started.wait()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        
+        mock_manager.__aexit__.assert_called_once()
+    
     def test_parse_json_response_valid_json(self):
         provider = ClaudeProvider(api_key="test-key")
         result = provider._parse_json_response('{"start": "A", "end": "B"}')
@@ -50,6 +133,13 @@ class TestClaudeProvider:
         provider = ClaudeProvider(api_key="test-key")
         result = provider._parse_json_response('Some text {"key": "value"} more text')
         assert result == {"key": "value"}
+    
+    def test_parse_json_response_nested_object(self):
+        provider = ClaudeProvider(api_key="test-key")
+        result = provider._parse_json_response(
+            'Selected: {"tool_name": "maps_geo", "arguments": {"address": "北京"}, "reasoning": "geo"}'
+        )
+        assert result["arguments"] == {"address": "北京"}
 
 
 class TestOpenAICompatibleProvider:
@@ -74,6 +164,69 @@ class TestOpenAICompatibleProvider:
             
             assert result == {"start": "杭州", "end": "南京"}
     
+    @pytest.mark.asyncio
+    async def test_response_cache_skips_repeated_request(self):
+        provider = OpenAICompatibleProvider(
+            api_key="test-key",
+            base_url="https://api.test.com/v1",
+            model="gpt-3.5-turbo",
+            response_cache=ResponseCache()
+        )
+        
+        mock_response = Mock()
+        mock_response.raise_for_status = Mock()
+        mock_response.aread = AsyncMock(return_value=json.dumps({
+            "choices": [{"message": {"content": '{"tool_name": "maps_geo", "arguments": {}, "reasoning": "r"}'}}]
+        }).encode('utf-8'))
+        
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_post = AsyncMock(return_value=mock_response)
+            mock_client.return_value.__aenter__.return_value.post = mock_post
+            
+            await provider.select_mcp_tool("geocode 北京", [{"name": "maps_geo"}])
+            result = await provider.select_mcp_tool("geocode 北京", [{"name": "maps_geo"}])
+            
+            assert result["tool_name"] == "maps_geo"
+            assert mock_post.call_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_streaming_sse_stops_at_first_complete_object(self):
+        provider = OpenAICompatibleProvider(
+            api_key="test-key",
+            base_url="https://api.test.com/v1",
+            model="gpt-3.5-turbo",
+            streaming=True
+        )
+        
+        def sse(content):
+            return "data: " + json.dumps({"choices": [{"delta": {"content": content}}]})
+        
+        lines = [sse('{"start": "杭州",'), "", sse(' "end": "南京"}'), sse(" trailing"), "data: [DONE]"]
+        consumed = []
+        
+        async def aiter_lines():
+            for line in lines:
+                consumed.append(line)
+                yield line
+        
+        mock_response = Mock()
+        mock_response.raise_for_status = Mock()
+        mock_response.headers = {"content-type": "text/event-stream"}
+        mock_response.aiter_lines = aiter_lines
+        
+        mock_stream = AsyncMock()
+        mock_stream.__aenter__.return_value = mock_response
+        mock_stream.__aexit__.return_value = None
+        
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_stream_call = Mock(return_value=mock_stream)
+            mock_client.return_value.__aenter__.return_value.stream = mock_stream_call
+            result = await provider.parse_navigation_request("从杭州到南京")
+        
+        assert result == {"start": "杭州", "end": "南京"}
+        assert consumed == lines[:3]
+        assert mock_stream_call.call_args[1]["json"]["stream"] is True
+    
     @pytest.mark.asyncio
     async def test_parse_navigation_request_http_error(self):
         provider = OpenAICompatibleProvider(
@@ -117,6 +270,171 @@ class TestOpenAICompatibleProvider:
         assert provider.base_url == "https://api.test.com/v1"
 
 
+class TestCompactMCPResponse:
+    
+    def _amap_response(self, count):
+        pois = [
+            {
+                "id": f"B{i:04d}",
+                "name": f"地点{i}",
+                "location": f"116.{i:03d},39.916",
+                "address": f"地址{i}",
+                "adcode": "110101",
+                "typecode": "050000",
+                "photos": [{"url": "https://example.com/photo.jpg"}] * 3,
+                "biz_ext": {"rating": "4.5", "cost": "100"}
+            }
+            for i in range(count)
+        ]
+        return {
+            "content": [{"type": "text", "text": json.dumps({"pois": pois}, ensure_ascii=False)}],
+            "isError": False
+        }
+    
+    def test_keeps_candidate_fields_only(self):
+        result = json.loads(compact_mcp_response(self._amap_response(1)))
+        
+        poi = result["content"][0]["text"]["pois"][0]
+        assert poi == {
+            "name": "地点0",
+            "location": "116.000,39.916",
+            "address": "地址0",
+            "adcode": "110101"
+        }
+        assert result["isError"] is False
+    
+    def test_limits_number_of_results(self):
+        result = json.loads(compact_mcp_response(self._amap_response(20), max_results=3))
+        
+        assert len(result["content"][0]["text"]["pois"]) == 3
+    
+    def test_respects_size_cap(self):
+        raw = self._amap_response(50)
+        result = compact_mcp_response(raw, max_results=50, max_chars=300)
+        
+        assert len(result) <= 300 + len("...(truncated)")
+        assert len(result) < len(json.dumps(raw, indent=2, ensure_ascii=False))
+    
+    def test_unknown_payload_is_preserved(self):
+        result = compact_mcp_response({"content": [{"type": "text", "text": "plain text"}]})
+        
+        assert json.loads(result) == {"content": [{"text": "plain text"}]}
+
+
+class _FakeBackend(AIProvider):
+    provider_name = "fake"
+    
+    def __init__(self, model, responses, delay=0.0):
+        super().__init__()
+        self.model = model
+        self.responses = list(responses)
+        self.delay = delay
+        self.calls = 0
+    
+    async def _complete(self, messages, max_tokens):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class TestFailoverProvider:
+    
+    @pytest.mark.asyncio
+    async def test_primary_answers_without_hedging(self):
+        primary = _FakeBackend("a", ['{"start": "A", "end": "B"}'])
+        secondary = _FakeBackend("b", ['{"start": "X", "end": "Y"}'])
+        provider = FailoverProvider([primary, secondary], hedge_delay=1.0)
+        
+        result = await provider.parse_navigation_request("A to B")
+        
+        assert result == {"start": "A", "end": "B"}
+        assert secondary.calls == 0
+    
+    @pytest.mark.asyncio
+    async def test_slow_primary_is_hedged(self):
+        primary = _FakeBackend("a", ['{"start": "A", "end": "B"}'], delay=5.0)
+        secondary = _FakeBackend("b", ['{"start": "X", "end": "Y"}'])
+        provider = FailoverProvider([primary, secondary], hedge_delay=0.01)
+        
+        result = await provider.parse_navigation_request("A to B")
+        
+        assert result == {"start": "X", "end": "Y"}
+        assert secondary.calls == 1
+    
+    @pytest.mark.asyncio
+    async def test_failing_primary_fails_over_immediately(self):
+        primary = _FakeBackend("a", [RuntimeError("boom")])
+        secondary = _FakeBackend("b", ['{"start": "X", "end": "Y"}'])
+        provider = FailoverProvider([primary, secondary], hedge_delay=10.0)
+        
+        result = await asyncio.wait_for(provider.parse_navigation_request("A to B"), timeout=1.0)
+        
+        assert result == {"start": "X", "end": "Y"}
+    
+    @pytest.mark.asyncio
+    async def test_invalid_json_counts_as_failure(self):
+        primary = _FakeBackend("a", ["no json at all"])
+        secondary = _FakeBackend("b", ['{"start": "X", "end": "Y"}'])
+        provider = FailoverProvider([primary, secondary], hedge_delay=10.0)
+        
+        result = await provider.parse_navigation_request("A to B")
+        
+        assert result == {"start": "X", "end": "Y"}
+        assert provider.get_backend_health()[0]["failures"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_open_circuit_skips_backend(self):
+        primary = _FakeBackend("a", [RuntimeError("boom")])
+        secondary = _FakeBackend("b", ['{"start": "X", "end": "Y"}', '{"start": "X", "end": "Y"}'])
+        provider = FailoverProvider([primary, secondary], hedge_delay=10.0, failure_threshold=1)
+        
+        await provider.parse_navigation_request("A to B")
+        await provider.parse_navigation_request("C to D")
+        
+        assert primary.calls == 1
+        assert secondary.calls == 2
+        assert provider.get_backend_health()[0]["state"] == "open"
+    
+    @pytest.mark.asyncio
+    async def test_half_open_backend_not_launched_keeps_probe(self):
+        primary = _FakeBackend("a", ['{"start": "A", "end": "B"}'])
+        secondary = _FakeBackend("b", [])
+        provider = FailoverProvider([primary, secondary], hedge_delay=1.0, failure_threshold=1, recovery_timeout=0)
+        provider.breakers[1].record_failure()
+        
+        await provider.parse_navigation_request("A to B")
+        
+        assert secondary.calls == 0
+        assert provider.get_backend_health()[1]["state"] == "half_open"
+        assert provider.breakers[1].allow_request() is True
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_half_open_hedge_releases_probe(self):
+        primary = _FakeBackend("a", ['{"start": "A", "end": "B"}'], delay=0.05)
+        secondary = _FakeBackend("b", ['{"start": "X", "end": "Y"}'], delay=5.0)
+        provider = FailoverProvider([primary, secondary], hedge_delay=0.01, failure_threshold=1, recovery_timeout=0)
+        provider.breakers[1].record_failure()
+        
+        result = await provider.parse_navigation_request("A to B")
+        
+        assert result == {"start": "A", "end": "B"}
+        assert secondary.calls == 1
+        assert provider.get_backend_health()[1]["state"] == "half_open"
+        assert provider.breakers[1].allow_request() is True
+    
+    @pytest.mark.asyncio
+    async def test_all_backends_fail(self):
+        primary = _FakeBackend("a", [RuntimeError("first")])
+        secondary = _FakeBackend("b", [RuntimeError("second")])
+        provider = FailoverProvider([primary, secondary], hedge_delay=10.0)
+        
+        with pytest.raises(RuntimeError):
+            await provider.parse_navigation_request("A to B")
+
+
 class TestCreateAIProvider:
     
     def test_create_anthropic_provider_success(self):
@@ -161,6 +479,19 @@ class TestCreateAIProvider:
             provider = create_ai_provider()
             assert isinstance(provider, ClaudeProvider)
     
+    def test_create_failover_provider(self):
+        with patch.dict(os.environ, {
+            "AI_PROVIDER": "failover",
+            "AI_PRIMARY_PROVIDER": "openai",
+            "ANTHROPIC_API_KEY": "test-key",
+            "OPENAI_API_KEY": "test-key",
+            "OPENAI_BASE_URL": "https://api.test.com"
+        }, clear=True):
+            provider = create_ai_provider()
+            assert isinstance(provider, FailoverProvider)
+            assert isinstance(provider.backends[0], OpenAICompatibleProvider)
+            assert isinstance(provider.backends[1], ClaudeProvider)
+    
     def test_create_provider_unsupported_type(self):
         with patch.dict(os.environ, {"AI_PROVIDER": "unsupported"}, clear=True):
             with pytest.raises(ValueError, match="Unsupported AI provider: unsupported"):
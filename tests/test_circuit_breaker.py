@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+import pytest
+from unittest.mock import patch
+from ai_navigator.circuit_breaker import CircuitBreaker, CircuitState
+
+
+class TestCircuitBreaker:
+    
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker("test", failure_threshold=2)
+        
+        breaker.record_failure()
+        assert breaker.state == CircuitState.CLOSED
+        breaker.record_failure()
+        
+        assert breaker.state == CircuitState.OPEN
+        assert breaker.allow_request() is False
+    
+    def test_success_resets_failure_count(self):
+        breaker = CircuitBreaker("test", failure_threshold=2)
+        
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        
+        assert breaker.state == CircuitState.CLOSED
+    
+    def test_half_open_after_recovery_timeout(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=10)
+        
+        with patch("ai_navigator.circuit_breaker.time.monotonic", return_value=100.0):
+            breaker.record_failure()
+        
+        with patch("ai_navigator.circuit_breaker.time.monotonic", return_value=111.0):
+            assert breaker.state == CircuitState.HALF_OPEN
+            assert breaker.allow_request() is True
+            assert breaker.allow_request() is False
+    
+    def test_half_open_failure_reopens(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=10)
+        
+        with patch("ai_navigator.circuit_breaker.time.monotonic", return_value=100.0):
+            breaker.record_failure()
+        
+        with patch("ai_navigator.circuit_breaker.time.monotonic", return_value=111.0):
+            breaker.allow_request()
+            breaker.record_failure()
+            assert breaker.state == CircuitState.OPEN
+    
+    def test_half_open_success_closes(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0)
+        breaker.record_failure()
+        
+        assert breaker.allow_request() is True
+        breaker.record_success()
+        
+        assert breaker.state == CircuitState.CLOSED
+    
+    def test_release_returns_half_open_slot(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0)
+        breaker.record_failure()
+        
+        assert breaker.allow_request() is True
+        assert breaker.allow_request() is False
+        breaker.release()
+        
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.allow_request() is True
@@ -0,0 +1,132 @@
+"""Tests for the incremental file index"""
+import os
+import pytest
+from unittest.mock import patch
+from ai_navigator.file_index import FileIndex, create_file_index_from_env, hash_file
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "a.txt").write_text("alpha")
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "mod.py").write_text("print(1)")
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "HEAD").write_text("ref")
+    return tmp_path
+
+
+def _bump_mtime(path, seconds=10):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 1_000_000_000))
+
+
+class TestFileIndex:
+    
+    def test_initial_refresh_indexes_tree(self, tree):
+        index = FileIndex([str(tree)], watch=False)
+        
+        stats = index.refresh()
+        
+        assert stats["directories_listed"] == 3
+        assert stats["files_hashed"] == 3
+        entry = index.get(str(tree / "pkg" / "mod.py"))
+        assert entry.size == 8
+        assert entry.content_hash == hash_file(str(tree / "pkg" / "mod.py"))
+        assert index.get(str(tree / "pkg")).is_dir
+    
+    def test_unchanged_tree_is_not_relisted_or_rehashed(self, tree):
+        index = FileIndex([str(tree)], watch=False)
+        index.refresh()
+        
+        stats = index.refresh()
+        
+        assert stats["directories_listed"] == 0
+        assert stats["files_hashed"] == 0
+    
+    def test_incremental_refresh_picks_up_changes(self, tree):
+        index = FileIndex([str(tree)], watch=False)
+        index.refresh()
+        
+        (tree / "pkg" / "mod.py").write_text("print(2)!")
+        _bump_mtime(tree / "pkg" / "mod.py")
+        (tree / "a.txt").unlink()
+        (tree / "new").mkdir()
+        (tree / "new" / "b.txt").write_text("b")
+        _bump_mtime(tree)
+        
+        stats = index.refresh()
+        
+        assert index.get(str(tree / "a.txt")) is None
+        assert index.get(str(tree / "new" / "b.txt")) is not None
+        assert index.get(str(tree / "pkg" / "mod.py")).size == 9
+        assert stats["removed"] == 1
+        assert stats["files_hashed"] == 2
+    
+    def test_iter_tree_matches_scan_order_and_cursor(self, tree):
+        index = FileIndex([str(tree)], watch=False)
+        index.refresh()
+        
+        names = [relative for _, relative in index.iter_tree(str(tree), recursive=True)]
+        resumed = [relative for _, relative in index.iter_tree(str(tree), recursive=True, resume_after=["pkg"])]
+        hidden = [relative for _, relative in index.iter_tree(str(tree), include_hidden=True)]
+        
+        assert names == ["a.txt", "pkg", "pkg/mod.py"]
+        assert resumed == ["pkg/mod.py"]
+        assert hidden == [".git", "a.txt", "pkg"]
+    
+    def test_dirty_paths_refresh_only_marked_directories(self, tree):
+        index = FileIndex([str(tree)], watch=False)
+        index.refresh()
+        
+        (tree / "pkg" / "extra.py").write_text("x")
+        index.mark_dirty(str(tree / "pkg" / "extra.py"))
+        with index._dirty_lock:
+            dirty = set(index._dirty)
+        
+        stats = index.refresh_paths(dirty)
+        
+        assert stats["directories_listed"] == 1
+        assert index.get(str(tree / "pkg" / "extra.py")) is not None
+    
+    def test_ensure_fresh_applies_marks_before_max_age(self, tree):
+        (tree / "pkg" / "deep").mkdir()
+        index = FileIndex([str(tree)], watch=False, max_age=60)
+        index.ensure_fresh()
+        
+        (tree / "pkg" / "deep" / "x.py").write_text("x")
+        index.mark_dirty(str(tree / "pkg"), recursive=True)
+        
+        assert index.ensure_fresh() is not None
+        assert index.get(str(tree / "pkg" / "deep" / "x.py")) is not None
+        assert index.ensure_fresh() is None
+    
+    def test_ensure_fresh_respects_max_age(self, tree):
+        index = FileIndex([str(tree)], watch=False, max_age=60)
+        
+        assert index.ensure_fresh() is not None
+        assert index.ensure_fresh() is None
+    
+    def test_sqlite_persistence_survives_restart(self, tree, tmp_path_factory):
+        db_path = str(tmp_path_factory.mktemp("db") / "index.db")
+        first = FileIndex([str(tree)], db_path=db_path, watch=False)
+        first.refresh()
+        first.close()
+        
+        second = FileIndex([str(tree)], db_path=db_path, watch=False)
+        
+        assert len(second) == len(first)
+        assert [relative for _, relative in second.iter_tree(str(tree))] == ["a.txt", "pkg"]
+        stats = second.refresh()
+        assert stats["files_hashed"] == 0
+        assert stats["directories_listed"] == 0
+        second.close()
+    
+    def test_create_from_env(self, tree):
+        with patch.dict(os.environ, {"MCP_FILE_INDEX_ROOTS": str(tree), "MCP_FILE_INDEX_MAX_AGE": "2"}):
+            index = create_file_index_from_env()
+        with patch.dict(os.environ, {"MCP_FILE_INDEX_ROOTS": ""}):
+            assert create_file_index_from_env() is None
+        
+        assert index.roots == [str(tree)]
+        assert index.max_age == 2.0
+        index.close()
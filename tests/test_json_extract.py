@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+import pytest
+from ai_navigator.json_extract import JSONObjectScanner, extract_json_object
+
+
+class TestJSONObjectScanner:
+    
+    def test_detects_object_split_across_chunks(self):
+        scanner = JSONObjectScanner()
+        
+        assert scanner.feed('{"start": "北') is None
+        assert scanner.feed('京", "end": ') is None
+        assert scanner.feed('"上海"} and some trailing text') == '{"start": "北京", "end": "上海"}'
+        assert scanner.done
+    
+    def test_nested_object(self):
+        scanner = JSONObjectScanner()
+        text = '{"tool_name": "maps_geo", "arguments": {"address": "北京"}, "reasoning": "r"}'
+        
+        for ch in text:
+            result = scanner.feed(ch)
+        
+        assert result == text
+    
+    def test_braces_inside_strings_are_ignored(self):
+        scanner = JSONObjectScanner()
+        
+        result = scanner.feed('{"description": "use } and { \\" carefully"} tail')
+        
+        assert result == '{"description": "use } and { \\" carefully"}'
+    
+    def test_skips_invalid_candidate_in_prose(self):
+        scanner = JSONObjectScanner()
+        
+        result = scanner.feed('Note {not json} result: {"mode": "car"}')
+        
+        assert result == '{"mode": "car"}'
+    
+    def test_finds_object_nested_in_invalid_candidate(self):
+        scanner = JSONObjectScanner()
+        
+        result = scanner.feed('Note {see {"mode": "car"} below} tail')
+        
+        assert result == '{"mode": "car"}'
+        assert scanner.value == {"mode": "car"}
+    
+    def test_single_character_chunks_keep_full_text(self):
+        scanner = JSONObjectScanner()
+        text = 'prose {' + '"k": "' + "x" * 20000 + '"}'
+        
+        for ch in text[:-1]:
+            assert scanner.feed(ch) is None
+        
+        assert scanner.text == text[:-1]
+        assert scanner.feed(text[-1]) == text[len("prose "):]
+    
+    def test_deeply_nested_invalid_candidate_is_scanned_once(self):
+        scanner = JSONObjectScanner()
+        depth = 20000
+        
+        for chunk in ("{x" * depth, "}" * depth, ' {"mode": "car"}'):
+            result = scanner.feed(chunk)
+        
+        assert result == '{"mode": "car"}'
+    
+    def test_incomplete_object_returns_none(self):
+        scanner = JSONObjectScanner()
+        
+        assert scanner.feed('{"mode": "car"') is None
+        assert not scanner.done
+
+
+class TestExtractJSONObject:
+    
+    def test_bare_json(self):
+        assert extract_json_object('{"start": "A", "end": "B"}') == {"start": "A", "end": "B"}
+    
+    def test_nested_arguments(self):
+        text = 'Here you go: {"tool_name": "maps_geo", "arguments": {"address": "北京", "city": {"code": 1}}, "reasoning": "r"}'
+        
+        result = extract_json_object(text)
+        
+        assert result["arguments"] == {"address": "北京", "city": {"code": 1}}
+    
+    def test_code_fence(self):
+        text = '```json\n{"mode": "car", "policy": 1}\n```'
+        
+        assert extract_json_object(text) == {"mode": "car", "policy": 1}
+    
+    def test_trailing_prose_with_braces(self):
+        text = '{"mode": "walk"}\nI chose walking {because it is close}.'
+        
+        assert extract_json_object(text) == {"mode": "walk"}
+    
+    def test_escaped_quotes_in_strings(self):
+        text = 'Result: {"description": "say \\"hi\\" {here}"}'
+        
+        assert extract_json_object(text) == {"description": 'say "hi" {here}'}
+    
+    def test_no_object_raises(self):
+        with pytest.raises(ValueError, match="Failed to parse AI response"):
+            extract_json_object("no json here [1, 2]")
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import pytest
+import asyncio
 import uuid
 from unittest.mock import Mock, patch, AsyncMock
 from ai_navigator.mcp_client import (
@@ -16,6 +17,8 @@ from ai_navigator.mcp_client import (
     MCPClient,
     create_mcp_client
 )
+from ai_navigator.retry_policy import RetryPolicy
+from ai_navigator.circuit_breaker import CircuitOpenError, CircuitState
 
 
 class TestMCPConfig:
@@ -90,6 +93,7 @@ class TestHTTPSSETransport:
         
         mock_response = Mock()
         mock_response.raise_for_status = Mock()
+        mock_response.headers = {"content-type": "application/json"}
         mock_response.json = Mock(return_value={"result": {"data": "test"}})
         transport.client.post = AsyncMock(return_value=mock_response)
         
@@ -118,6 +122,7 @@ class TestHTTPSSETransport:
         
         mock_response = Mock()
         mock_response.raise_for_status = Mock()
+        mock_response.headers = {"content-type": "application/json"}
         mock_response.json = Mock(return_value={"result": {}})
         transport.client.post = AsyncMock(return_value=mock_response)
         
@@ -140,6 +145,7 @@ class TestHTTPSSETransport:
         
         mock_response = Mock()
         mock_response.raise_for_status = Mock()
+        mock_response.headers = {"content-type": "application/json"}
         mock_response.json = Mock(return_value={"result": {}})
         transport.client.post = AsyncMock(return_value=mock_response)
         
@@ -158,12 +164,42 @@ class TestHTTPSSETransport:
         
         mock_response = Mock()
         mock_response.raise_for_status = Mock()
+        mock_response.headers = {"content-type": "application/json"}
         mock_response.json = Mock(return_value={"error": {"message": "Server error"}})
         transport.client.post = AsyncMock(return_value=mock_response)
         
         with pytest.raises(Exception, match="Server error"):
             await transport.send_request("test", {})
     
+    @pytest.mark.asyncio
+    async def test_event_stream_reply_routes_notifications(self):
+        transport = HTTPSSETransport(MCPConfig(server_url="https://test.com"))
+        transport.connected = True
+        transport.client = Mock()
+        transport.notification_handler = Mock()
+        
+        mock_response = Mock()
+        mock_response.raise_for_status = Mock()
+        mock_response.headers = {"content-type": "text/event-stream"}
+        transport.client.post = AsyncMock(return_value=mock_response)
+        
+        def reply(*args, **kwargs):
+            request_id = kwargs["json"]["id"]
+            mock_response.text = (
+                'event: message\ndata: {"jsonrpc": "2.0", "method": "notifications/tools/list_changed"}\n\n'
+                f'event: message\ndata: {{"jsonrpc": "2.0", "id": "{request_id}", "result": {{"data": "test"}}}}\n\n'
+            )
+            return mock_response
+        
+        transport.client.post.side_effect = reply
+        
+        result = await transport.send_request("tools/call", {})
+        
+        assert result == {"data": "test"}
+        transport.notification_handler.assert_called_once_with(
+            {"jsonrpc": "2.0", "method": "notifications/tools/list_changed"}
+        )
+    
     def test_generate_request_id(self):
         config = MCPConfig()
         transport = HTTPSSETransport(config)
@@ -196,6 +232,7 @@ class TestStreamableHTTPTransport:
         
         mock_response = Mock()
         mock_response.raise_for_status = Mock()
+        mock_response.headers = {"content-type": "application/json"}
         
         async def mock_aiter_bytes():
             yield b'{"result": {"data": "test"}}'
@@ -210,6 +247,37 @@ class TestStreamableHTTPTransport:
         result = await transport.send_request("test_method", {})
         
         assert result == {"data": "test"}
+    
+    @pytest.mark.asyncio
+    async def test_json_batch_reply_routes_notifications(self):
+        transport = StreamableHTTPTransport(MCPConfig(server_url="https://test.com"))
+        transport.connected = True
+        transport.client = Mock()
+        transport.notification_handler = Mock()
+        
+        mock_response = Mock()
+        mock_response.raise_for_status = Mock()
+        mock_response.headers = {"content-type": "application/json"}
+        
+        async def mock_aiter_bytes():
+            yield b'[{"method": "notifications/resources/list_changed"}, {"id": "x", "result": {"data": "test"}}]'
+        
+        mock_response.aiter_bytes = mock_aiter_bytes
+        mock_stream = AsyncMock()
+        mock_stream.__aenter__.return_value = mock_response
+        mock_stream.__aexit__.return_value = None
+        transport.client.stream = Mock(return_value=mock_stream)
+        
+        result = await transport.send_request("test_method", {})
+        
+        assert result == {"data": "test"}
+        transport.notification_handler.assert_called_once_with({"method": "notifications/resources/list_changed"})
+    
+    def test_client_wires_notifications_for_http_transports(self):
+        for transport_type in (TransportType.HTTP_SSE, TransportType.HTTP_STREAM):
+            client = MCPClient(MCPConfig(server_url="https://test.com", transport_type=transport_type))
+            
+            assert client._create_transport().notification_handler == client.handle_notification
 
 
 class TestMCPClient:
@@ -304,6 +372,36 @@ class TestMCPClient:
         
         assert result == {"content": "result"}
     
+    @pytest.mark.asyncio
+    async def test_call_tool_retries_idempotent_tool(self):
+        config = MCPConfig(retry_policy=RetryPolicy(max_retries=2, base_delay=0.001))
+        client = MCPClient(config)
+        client.connected = True
+        client.transport = Mock()
+        client.transport.send_request = AsyncMock(side_effect=[TimeoutError(), {"content": "result"}])
+        client.tools = {"maps_geo": Tool(
+            name="maps_geo", description="", parameters={}, annotations={"readOnlyHint": True}
+        )}
+        
+        result = await client.call_tool("maps_geo", {"address": "北京"})
+        
+        assert result == {"content": "result"}
+        assert client.transport.send_request.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_call_tool_does_not_retry_non_idempotent_after_send(self):
+        config = MCPConfig(retry_policy=RetryPolicy(max_retries=2, base_delay=0.001))
+        client = MCPClient(config)
+        client.connected = True
+        client.transport = Mock()
+        client.transport.send_request = AsyncMock(side_effect=TimeoutError())
+        client.tools = {"write": Tool(name="write", description="", parameters={})}
+        
+        with pytest.raises(TimeoutError):
+            await client.call_tool("write", {})
+        
+        assert client.transport.send_request.call_count == 1
+    
     @pytest.mark.asyncio
     async def test_call_tool_not_connected(self):
         config = MCPConfig()
@@ -368,6 +466,283 @@ class TestMCPClient:
         assert client.is_connected() is True
 
 
+class TestMCPClientCircuitBreaker:
+    
+    def _client(self, **kwargs):
+        config = MCPConfig(
+            server_url="https://test.com",
+            retry_policy=RetryPolicy(max_retries=0, base_delay=0.001, jitter=False),
+            circuit_failure_threshold=2,
+            **kwargs
+        )
+        client = MCPClient(config)
+        client.connected = True
+        client.transport = Mock()
+        client.transport.disconnect = AsyncMock()
+        client.tools = {"maps_geo": Tool(name="maps_geo", description="", parameters={})}
+        return client
+    
+    @pytest.mark.asyncio
+    async def test_circuit_opens_and_fails_fast(self):
+        client = self._client(auto_reconnect=False)
+        client.transport.send_request = AsyncMock(side_effect=TimeoutError())
+        
+        for _ in range(2):
+            with pytest.raises(TimeoutError):
+                await client.call_tool("maps_geo", {})
+        
+        with pytest.raises(CircuitOpenError):
+            await client.call_tool("maps_geo", {})
+        
+        assert client.transport.send_request.call_count == 2
+        assert client.get_circuit_state() == CircuitState.OPEN
+    
+    @pytest.mark.asyncio
+    async def test_server_errors_do_not_open_circuit(self):
+        client = self._client(auto_reconnect=False)
+        client.transport.send_request = AsyncMock(side_effect=Exception("Server error: invalid params"))
+        
+        for _ in range(3):
+            with pytest.raises(Exception, match="Server error"):
+                await client.call_tool("maps_geo", {})
+        
+        assert client.get_circuit_state() == CircuitState.CLOSED
+    
+    @pytest.mark.asyncio
+    async def test_half_open_probe_with_server_error_closes_circuit(self):
+        client = self._client(auto_reconnect=False, circuit_recovery_timeout=0)
+        client.circuit_breaker.record_failure()
+        client.circuit_breaker.record_failure()
+        client.transport.send_request = AsyncMock(side_effect=[
+            Exception("Server error: invalid params"),
+            {"content": "ok"}
+        ])
+        
+        with pytest.raises(Exception, match="Server error"):
+            await client.call_tool("maps_geo", {})
+        
+        assert client.get_circuit_state() == CircuitState.CLOSED
+        assert await client.call_tool("maps_geo", {}) == {"content": "ok"}
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_half_open_probe_releases_slot(self):
+        client = self._client(auto_reconnect=False, circuit_recovery_timeout=0)
+        client.circuit_breaker.record_failure()
+        client.circuit_breaker.record_failure()
+        client.transport.send_request = AsyncMock(side_effect=[asyncio.CancelledError(), {"content": "ok"}])
+        
+        with pytest.raises(asyncio.CancelledError):
+            await client.call_tool("maps_geo", {})
+        
+        assert client.get_circuit_state() == CircuitState.HALF_OPEN
+        assert await client.call_tool("maps_geo", {}) == {"content": "ok"}
+        assert client.get_circuit_state() == CircuitState.CLOSED
+    
+    @pytest.mark.asyncio
+    async def test_background_reconnect_resumes_calls(self):
+        client = self._client()
+        client.transport.send_request = AsyncMock(side_effect=TimeoutError())
+        
+        fresh_transport = Mock()
+        fresh_transport.connect = AsyncMock(return_value=True)
+        fresh_transport.disconnect = AsyncMock()
+        fresh_transport.send_request = AsyncMock(side_effect=[
+            {"serverInfo": {"name": "amap"}, "capabilities": {"tools": {}}},
+            {"content": "ok"}
+        ])
+        
+        with patch.object(client, '_create_transport', return_value=fresh_transport):
+            for _ in range(2):
+                with pytest.raises(TimeoutError):
+                    await client.call_tool("maps_geo", {})
+            
+            assert client.is_connected() is False
+            await asyncio.wait_for(client._reconnect_task, timeout=1.0)
+        
+        assert client.is_connected() is True
+        assert client.get_circuit_state() == CircuitState.CLOSED
+        assert await client.call_tool("maps_geo", {}) == {"content": "ok"}
+        assert "maps_geo" in client.tools
+        
+        await client.disconnect()
+
+
+class TestMCPClientDiscovery:
+    
+    HANDSHAKE = {
+        "serverInfo": {"name": "amap", "version": "1.2.0"},
+        "capabilities": {"tools": {"listChanged": True}, "resources": {}, "prompts": {}}
+    }
+    
+    def _transport(self, listings=None):
+        listings = listings or {}
+        calls = []
+        
+        async def send_request(method, params):
+            calls.append(method)
+            if method == "initialize":
+                return self.HANDSHAKE
+            if method in listings:
+                return listings[method]
+            return {"content": "ok"}
+        
+        transport = Mock()
+        transport.connect = AsyncMock(return_value=True)
+        transport.disconnect = AsyncMock()
+        transport.send_request = send_request
+        transport.calls = calls
+        return transport
+    
+    def _listings(self):
+        return {
+            "tools/list": {"tools": [{"name": "maps_geo", "inputSchema": {}}]},
+            "resources/list": {"resources": [{"uri": "amap://cities", "name": "cities"}]},
+            "prompts/list": {"prompts": [{"name": "route"}]}
+        }
+    
+    @pytest.mark.asyncio
+    async def test_eager_discovery_lists_all_kinds(self):
+        client = MCPClient(MCPConfig(server_url="https://test.com"))
+        transport = self._transport(self._listings())
+        
+        with patch.object(client, '_create_transport', return_value=transport):
+            assert await client.connect() is True
+        
+        assert sorted(transport.calls[1:]) == ["prompts/list", "resources/list", "tools/list"]
+        assert [t.name for t in client.list_tools()] == ["maps_geo"]
+        assert "amap://cities" in client.resources
+        assert "route" in client.prompts
+    
+    @pytest.mark.asyncio
+    async def test_lazy_discovery_fetches_on_first_use_only(self):
+        client = MCPClient(MCPConfig(server_url="https://test.com", eager_discovery=()))
+        transport = self._transport(self._listings())
+        
+        with patch.object(client, '_create_transport', return_value=transport):
+            await client.connect()
+        
+        assert transport.calls == ["initialize"]
+        assert client.list_tools() == []
+        
+        tools = await client.discover_tools()
+        await client.discover_tools()
+        
+        assert [t.name for t in tools] == ["maps_geo"]
+        assert transport.calls.count("tools/list") == 1
+        assert "resources/list" not in transport.calls
+    
+    @pytest.mark.asyncio
+    async def test_call_tool_discovers_tools_lazily(self):
+        client = MCPClient(MCPConfig(server_url="https://test.com", eager_discovery=()))
+        transport = self._transport(self._listings())
+        
+        with patch.object(client, '_create_transport', return_value=transport):
+            await client.connect()
+        
+        assert await client.call_tool("maps_geo", {"address": "x"}) == {"content": "ok"}
+        assert transport.calls == ["initialize", "tools/list", "tools/call"]
+    
+    @pytest.mark.asyncio
+    async def test_unadvertised_kind_is_not_requested(self):
+        client = MCPClient(MCPConfig(server_url="https://test.com", eager_discovery=()))
+        client.transport = self._transport()
+        client.capabilities = {"tools": {}}
+        
+        assert await client.discover_prompts() == []
+        assert client.transport.calls == []
+    
+    @pytest.mark.asyncio
+    async def test_warm_start_uses_disk_cache(self, tmp_path):
+        config = dict(
+            server_url="https://test.com",
+            eager_discovery=("tools",),
+            capability_cache_dir=str(tmp_path)
+        )
+        
+        cold = MCPClient(MCPConfig(**config))
+        cold_transport = self._transport(self._listings())
+        with patch.object(cold, '_create_transport', return_value=cold_transport):
+            await cold.connect()
+        assert "tools/list" in cold_transport.calls
+        
+        warm = MCPClient(MCPConfig(**config))
+        warm_transport = self._transport(self._listings())
+        with patch.object(warm, '_create_transport', return_value=warm_transport):
+            await warm.connect()
+        
+        assert warm_transport.calls == ["initialize"]
+        assert "maps_geo" in warm.tools
+    
+    @pytest.mark.asyncio
+    async def test_disk_cache_is_keyed_by_server_version(self, tmp_path):
+        config = dict(
+            server_url="https://test.com",
+            eager_discovery=("tools",),
+            capability_cache_dir=str(tmp_path)
+        )
+        
+        cold = MCPClient(MCPConfig(**config))
+        with patch.object(cold, '_create_transport', return_value=self._transport(self._listings())):
+            await cold.connect()
+        
+        upgraded = MCPClient(MCPConfig(**config))
+        transport = self._transport(self._listings())
+        self.HANDSHAKE = {**self.HANDSHAKE, "serverInfo": {"name": "amap", "version": "2.0.0"}}
+        with patch.object(upgraded, '_create_transport', return_value=transport):
+            await upgraded.connect()
+        
+        assert "tools/list" in transport.calls
+    
+    @pytest.mark.asyncio
+    async def test_list_changed_notification_refreshes_tools(self, tmp_path):
+        client = MCPClient(MCPConfig(
+            server_url="https://test.com",
+            eager_discovery=("tools",),
+            capability_cache_dir=str(tmp_path)
+        ))
+        listings = self._listings()
+        transport = self._transport(listings)
+        
+        with patch.object(client, '_create_transport', return_value=transport):
+            await client.connect()
+        
+        listings["tools/list"] = {"tools": [{"name": "maps_text_search", "inputSchema": {}}]}
+        client.handle_notification({"jsonrpc": "2.0", "method": "notifications/tools/list_changed"})
+        await asyncio.gather(*client._refresh_tasks)
+        
+        assert list(client.tools) == ["maps_text_search"]
+        assert transport.calls.count("tools/list") == 2
+        
+        warm = MCPClient(MCPConfig(
+            server_url="https://test.com",
+            eager_discovery=("tools",),
+            capability_cache_dir=str(tmp_path)
+        ))
+        with patch.object(warm, '_create_transport', return_value=self._transport(listings)):
+            await warm.connect()
+        assert list(warm.tools) == ["maps_text_search"]
+    
+    def test_websocket_receive_loop_dispatches_notifications(self):
+        transport = WebSocketTransport(MCPConfig(server_url="wss://test.com"))
+        received = []
+        transport.notification_handler = received.append
+        
+        class FakeSocket:
+            def __aiter__(self):
+                return self
+            
+            async def __anext__(self):
+                if getattr(self, "sent", False):
+                    raise StopAsyncIteration
+                self.sent = True
+                return '{"jsonrpc": "2.0", "method": "notifications/tools/list_changed"}'
+        
+        transport.websocket = FakeSocket()
+        asyncio.run(transport._receive_loop())
+        
+        assert received == [{"jsonrpc": "2.0", "method": "notifications/tools/list_changed"}]
+
+
 class TestCreateMCPClient:
     
     @pytest.mark.asyncio
@@ -1,5 +1,22 @@
 """Tests for MCP File Server"""
+import asyncio
+import base64
+import json
+import os
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
 import pytest
+from unittest.mock import AsyncMock, Mock, PropertyMock, patch
+
+mcp_file_server = pytest.importorskip("ai_navigator.mcp_file_server")
+
+
+async def call(name, **arguments):
+    result = await mcp_file_server.handle_call_tool(name, arguments)
+    return json.loads(result[0].text)
 
 
 class TestMCPFileServer:
@@ -106,3 +123,989 @@ class TestMCPFileServer:
         
         with pytest.raises(FileNotFoundError):
             nonexistent.read_text()
+
+
+class TestReadFile:
+    """Tests for ranged and capped read_file"""
+    
+    @pytest.mark.asyncio
+    async def test_reads_whole_small_file(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_text("hello\nworld\n")
+        
+        data = await call("read_file", path=str(path))
+        
+        assert data["success"] is True
+        assert data["content"] == "hello\nworld\n"
+        assert data["truncated"] is False
+        assert data["file_size"] == 12
+    
+    @pytest.mark.asyncio
+    async def test_offset_and_length(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_text("0123456789")
+        
+        data = await call("read_file", path=str(path), offset=3, length=4)
+        
+        assert data["content"] == "3456"
+        assert data["offset"] == 3
+        assert data["truncated"] is False
+    
+    @pytest.mark.asyncio
+    async def test_max_bytes_truncates_on_character_boundary(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_text("北京上海", encoding="utf-8")
+        
+        first = await call("read_file", path=str(path), max_bytes=4)
+        rest = await call("read_file", path=str(path), offset=first["next_offset"])
+        
+        assert first["content"] == "北"
+        assert first["truncated"] is True
+        assert first["next_offset"] == 3
+        assert rest["content"] == "京上海"
+        assert "next_offset" not in rest
+    
+    @pytest.mark.asyncio
+    async def test_line_range(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_text("".join(f"line {i}\n" for i in range(1, 11)))
+        
+        data = await call("read_file", path=str(path), start_line=3, end_line=4)
+        tail = await call("read_file", path=str(path), start_line=10)
+        past_end = await call("read_file", path=str(path), start_line=20)
+        
+        assert data["content"] == "line 3\nline 4\n"
+        assert tail["content"] == "line 10\n"
+        assert past_end["content"] == ""
+    
+    @pytest.mark.asyncio
+    async def test_line_range_rejects_offset(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_text("x")
+        
+        data = await call("read_file", path=str(path), start_line=1, offset=0)
+        
+        assert data["success"] is False
+        assert data["type"] == "ValueError"
+    
+    @pytest.mark.asyncio
+    async def test_base64_mode_reads_binary(self, tmp_path):
+        path = tmp_path / "a.bin"
+        path.write_bytes(bytes(range(256)))
+        
+        data = await call("read_file", path=str(path), encoding="base64", offset=250)
+        
+        assert base64.b64decode(data["content"]) == bytes(range(250, 256))
+        assert data["bytes_read"] == 6
+    
+    @pytest.mark.asyncio
+    async def test_large_file_is_memory_mapped(self, tmp_path):
+        path = tmp_path / "big.log"
+        path.write_bytes(b"a" * 100 + b"\nneedle\n" + b"b" * 100)
+        
+        with patch.object(mcp_file_server, "MMAP_THRESHOLD", 64), \
+                patch.object(mcp_file_server.mmap, "mmap", wraps=mcp_file_server.mmap.mmap) as mapped:
+            data = await call("read_file", path=str(path), start_line=2, end_line=2)
+            window = await call("read_file", path=str(path), offset=101, length=6)
+        
+        assert mapped.call_count == 2
+        assert data["content"] == "needle\n"
+        assert window["content"] == "needle"
+
+
+class TestListDirectory:
+    """Tests for scandir-based, paginated list_directory"""
+    
+    @pytest.fixture
+    def tree(self, tmp_path):
+        (tmp_path / "b.txt").write_text("bb")
+        (tmp_path / "a.py").write_text("a")
+        (tmp_path / ".hidden").write_text("h")
+        (tmp_path / "pkg").mkdir()
+        (tmp_path / "pkg" / "mod.py").write_text("m")
+        (tmp_path / "pkg" / "deep").mkdir()
+        (tmp_path / "pkg" / "deep" / "x.py").write_text("x")
+        return tmp_path
+    
+    def _names(self, data, root):
+        return [os.path.relpath(entry["path"], root) for entry in data["entries"]]
+    
+    @pytest.mark.asyncio
+    async def test_flat_listing(self, tree):
+        data = await call("list_directory", path=str(tree))
+        
+        assert self._names(data, tree) == ["a.py", "b.txt", "pkg"]
+        assert data["entries"][1]["size"] == 2
+        assert data["entries"][2]["type"] == "directory"
+        assert data["has_more"] is False
+        assert data["next_cursor"] is None
+    
+    @pytest.mark.asyncio
+    async def test_recursive_depth_and_pattern(self, tree):
+        full = await call("list_directory", path=str(tree), recursive=True)
+        shallow = await call("list_directory", path=str(tree), recursive=True, max_depth=2)
+        python = await call("list_directory", path=str(tree), recursive=True, pattern="*.py")
+        
+        assert self._names(full, tree) == [
+            "a.py", "b.txt", "pkg", "pkg/deep", "pkg/deep/x.py", "pkg/mod.py"
+        ]
+        assert self._names(shallow, tree) == ["a.py", "b.txt", "pkg", "pkg/deep", "pkg/mod.py"]
+        assert self._names(python, tree) == ["a.py", "pkg/deep/x.py", "pkg/mod.py"]
+    
+    @pytest.mark.asyncio
+    async def test_cursor_pagination_covers_tree(self, tree):
+        pages = []
+        cursor = None
+        while True:
+            data = await call("list_directory", path=str(tree), recursive=True, include_hidden=True,
+                              max_entries=2, **({"cursor": cursor} if cursor else {}))
+            pages.append(self._names(data, tree))
+            cursor = data["next_cursor"]
+            if not data["has_more"]:
+                break
+        
+        assert pages == [
+            [".hidden", "a.py"],
+            ["b.txt", "pkg"],
+            ["pkg/deep", "pkg/deep/x.py"],
+            ["pkg/mod.py"]
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_missing_directory(self, tmp_path):
+        data = await call("list_directory", path=str(tmp_path / "nope"))
+        
+        assert data["success"] is False
+
+
+class TestSearchFiles:
+    """Tests for the search_files tool"""
+    
+    @pytest.fixture
+    def tree(self, tmp_path):
+        (tmp_path / "a.py").write_text("import os\n\ndef main():\n    return os.getcwd()\n")
+        (tmp_path / "notes.txt").write_text("TODO: fix\nnothing here\ntodo later\n")
+        (tmp_path / "image.bin").write_bytes(b"\x00\x01TODO")
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "b.py").write_text("# TODO refactor\n")
+        return tmp_path
+    
+    @pytest.mark.asyncio
+    async def test_literal_search_skips_binary(self, tree):
+        data = await call("search_files", path=str(tree), query="TODO")
+        
+        assert [(os.path.relpath(m["path"], tree), m["line"]) for m in data["matches"]] == [
+            ("notes.txt", 1), ("sub/b.py", 1)
+        ]
+        assert data["files_skipped"] == 1
+        assert data["truncated"] is False
+    
+    @pytest.mark.asyncio
+    async def test_match_past_returned_text_length(self, tmp_path):
+        (tmp_path / "bundle.min.js").write_text("x" * 600 + "needle" + "y" * 600 + "\n" + "z" * 800 + "\n")
+        
+        data = await call("search_files", path=str(tmp_path), query="needle", context_lines=1)
+        
+        assert data["count"] == 1
+        match = data["matches"][0]
+        assert match["column"] == 601
+        assert len(match["text"]) == mcp_file_server.MAX_MATCH_LINE_LENGTH
+        assert match["text"][600 - match["text_offset"]:].startswith("needle")
+        assert match["after"] == ["z" * mcp_file_server.MAX_MATCH_LINE_LENGTH]
+    
+    @pytest.mark.asyncio
+    async def test_case_insensitive_regex_with_pattern(self, tree):
+        data = await call("search_files", path=str(tree), query=r"^todo", regex=True,
+                          case_sensitive=False, pattern="*.txt")
+        
+        assert [m["text"] for m in data["matches"]] == ["TODO: fix", "todo later"]
+        assert data["matches"][1]["column"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_literal_mode_escapes_regex_characters(self, tree):
+        data = await call("search_files", path=str(tree), query="main()")
+        
+        assert data["count"] == 1
+        assert data["matches"][0]["line"] == 3
+    
+    @pytest.mark.asyncio
+    async def test_context_lines(self, tree):
+        data = await call("search_files", path=str(tree / "a.py"), query="def", context_lines=1)
+        
+        match = data["matches"][0]
+        assert match["before"] == [""]
+        assert match["after"] == ["    return os.getcwd()"]
+    
+    @pytest.mark.asyncio
+    async def test_result_cap_and_size_limit(self, tree):
+        capped = await call("search_files", path=str(tree), query="o", max_results=2)
+        small_only = await call("search_files", path=str(tree), query="TODO", max_file_size=20)
+        
+        assert capped["count"] == 2
+        assert capped["truncated"] is True
+        assert [os.path.basename(m["path"]) for m in small_only["matches"]] == ["b.py"]
+    
+    @pytest.mark.asyncio
+    async def test_invalid_regex_returns_error(self, tree):
+        data = await call("search_files", path=str(tree), query="(", regex=True)
+        
+        assert data["success"] is False
+
+
+class TestFileIndexIntegration:
+    """Tests for serving listings, file_info and search from the file index"""
+    
+    @pytest.fixture
+    def indexed_tree(self, tmp_path):
+        from ai_navigator.file_index import FileIndex
+        (tmp_path / "a.py").write_text("needle\n")
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "b.py").write_text("needle\n")
+        index = FileIndex([str(tmp_path)], watch=False, max_age=60)
+        with patch.object(mcp_file_server, "_file_index", index):
+            yield tmp_path, index
+        index.close()
+    
+    @pytest.mark.asyncio
+    async def test_listing_served_from_index(self, indexed_tree):
+        tree, index = indexed_tree
+        
+        with patch.object(mcp_file_server, "_scan_directory") as scan:
+            data = await call("list_directory", path=str(tree), recursive=True)
+        
+        scan.assert_not_called()
+        assert [e["path"] for e in data["entries"]] == [
+            str(tree / "a.py"), str(tree / "sub"), str(tree / "sub" / "b.py")
+        ]
+        assert data["entries"][0]["size"] == 7
+    
+    @pytest.mark.asyncio
+    async def test_file_info_includes_content_hash(self, indexed_tree):
+        tree, index = indexed_tree
+        
+        data = await call("file_info", path=str(tree / "a.py"))
+        
+        assert data["content_hash"] == index.get(str(tree / "a.py")).content_hash
+    
+    @pytest.mark.asyncio
+    async def test_search_enumerates_from_index(self, indexed_tree):
+        tree, index = indexed_tree
+        
+        with patch.object(mcp_file_server, "_scan_directory") as scan:
+            data = await call("search_files", path=str(tree), query="needle")
+        
+        scan.assert_not_called()
+        assert data["count"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_own_writes_are_visible_immediately(self, indexed_tree):
+        tree, index = indexed_tree
+        await call("list_directory", path=str(tree))
+        
+        await call("write_file", path=str(tree / "new.txt"), content="needle\n")
+        listed = await call("list_directory", path=str(tree))
+        found = await call("search_files", path=str(tree), query="needle", pattern="new.txt")
+        await call("delete_file", path=str(tree / "a.py"))
+        after_delete = await call("list_directory", path=str(tree))
+        
+        assert str(tree / "new.txt") in [e["path"] for e in listed["entries"]]
+        assert found["count"] == 1
+        assert str(tree / "a.py") not in [e["path"] for e in after_delete["entries"]]
+    
+    @pytest.mark.asyncio
+    async def test_subtree_writes_are_visible_immediately(self, indexed_tree, tmp_path_factory):
+        tree, index = indexed_tree
+        await call("list_directory", path=str(tree))
+        source = tmp_path_factory.mktemp("src")
+        (source / "sub").mkdir()
+        (source / "sub" / "c.py").write_text("c")
+        archive = tmp_path_factory.mktemp("archives") / "sub.zip"
+        await call("archive_create", source=str(source / "sub"), destination=str(archive))
+        
+        await call("archive_extract", path=str(archive), destination=str(tree))
+        await call("batch_operations", operations=[
+            {"op": "create_directory", "path": str(tree / "made")}
+        ])
+        data = await call("list_directory", path=str(tree), recursive=True)
+        
+        paths = [e["path"] for e in data["entries"]]
+        assert str(tree / "sub" / "c.py") in paths
+        assert str(tree / "made") in paths
+    
+    @pytest.mark.asyncio
+    async def test_paths_outside_roots_use_filesystem(self, indexed_tree, tmp_path_factory):
+        other = tmp_path_factory.mktemp("other")
+        (other / "c.txt").write_text("c")
+        
+        data = await call("list_directory", path=str(other))
+        
+        assert [e["name"] for e in data["entries"]] == ["c.txt"]
+
+
+class TestBlockingOperations:
+    """Tests for running filesystem calls on the I/O pool with cancellation and progress"""
+    
+    @pytest.mark.asyncio
+    async def test_operations_run_on_io_pool(self, tmp_path):
+        source = tmp_path / "src"
+        source.mkdir()
+        (source / "f.txt").write_text("x")
+        threads = []
+        original_copy2 = mcp_file_server.shutil.copy2
+        
+        def recording_copy2(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return original_copy2(*args, **kwargs)
+        
+        with patch.object(mcp_file_server.shutil, "copy2", side_effect=recording_copy2):
+            data = await call("copy_file", source=str(source), destination=str(tmp_path / "dst"))
+        
+        assert data["success"] is True
+        assert (tmp_path / "dst" / "f.txt").read_text() == "x"
+        assert threads and all(name.startswith("mcp-file-io") for name in threads)
+    
+    @pytest.mark.asyncio
+    async def test_cancellation_stops_worker(self):
+        progress = mcp_file_server._FileProgress()
+        steps = []
+        
+        def slow_operation(progress):
+            for step in range(200):
+                progress.advance()
+                steps.append(step)
+                time.sleep(0.01)
+        
+        task = asyncio.create_task(mcp_file_server._run_blocking(slow_operation, progress=progress))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        
+        stopped_at = len(steps)
+        await asyncio.sleep(0.05)
+        assert 0 < stopped_at < 200
+        assert len(steps) == stopped_at
+    
+    @pytest.mark.asyncio
+    async def test_progress_notifications_for_recursive_delete(self, tmp_path):
+        target = tmp_path / "tree"
+        (target / "sub").mkdir(parents=True)
+        for i in range(3):
+            (target / f"f{i}.txt").write_text("x")
+        (target / "sub" / "g.txt").write_text("x")
+        os.symlink(tmp_path, target / "link")
+        
+        session = Mock()
+        session.send_progress_notification = AsyncMock()
+        context = Mock(meta=Mock(progressToken="tok"), session=session)
+        
+        with patch.object(type(mcp_file_server.server), "request_context", new_callable=PropertyMock,
+                          return_value=context):
+            data = await call("delete_file", path=str(target), recursive=True)
+        await asyncio.sleep(0)
+        
+        assert data["success"] is True
+        assert not target.exists()
+        assert tmp_path.exists()
+        last = session.send_progress_notification.call_args_list[-1]
+        assert last.args == ("tok", 4, 4)
+    
+    @pytest.mark.asyncio
+    async def test_large_write_is_chunked(self, tmp_path):
+        path = tmp_path / "big.txt"
+        
+        with patch.object(mcp_file_server, "WRITE_CHUNK_SIZE", 4):
+            data = await call("write_file", path=str(path), content="abcdefghij")
+        
+        assert data["success"] is True
+        assert path.read_text() == "abcdefghij"
+
+
+class TestBatchOperations:
+    """Tests for the batch_operations tool"""
+    
+    @pytest.mark.asyncio
+    async def test_runs_operations_and_reports_each(self, tmp_path):
+        data = await call("batch_operations", operations=[
+            {"op": "write_file", "path": str(tmp_path / "a.txt"), "content": "A"},
+            {"op": "copy_file", "source": str(tmp_path / "a.txt"), "destination": str(tmp_path / "b.txt")},
+            {"op": "create_directory", "path": str(tmp_path / "dir")},
+            {"op": "move_file", "source": str(tmp_path / "b.txt"), "destination": str(tmp_path / "dir" / "b.txt")},
+        ])
+        
+        assert data["success"] is True
+        assert [result["success"] for result in data["results"]] == [True] * 4
+        assert (tmp_path / "dir" / "b.txt").read_text() == "A"
+        assert not (tmp_path / "b.txt").exists()
+    
+    @pytest.mark.asyncio
+    async def test_independent_operations_run_concurrently(self, tmp_path):
+        active = 0
+        peak = 0
+        original = mcp_file_server._write_file
+        
+        def slow_write(*args, **kwargs):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            time.sleep(0.05)
+            active -= 1
+            return original(*args, **kwargs)
+        
+        with patch.object(mcp_file_server, "_write_file", side_effect=slow_write):
+            data = await call("batch_operations", operations=[
+                {"op": "write_file", "path": str(tmp_path / f"{i}.txt"), "content": str(i)} for i in range(3)
+            ] + [
+                {"op": "write_file", "path": str(tmp_path / "0.txt"), "content": "last"}
+            ])
+        
+        assert data["success"] is True
+        assert peak >= 2
+        assert (tmp_path / "0.txt").read_text() == "last"
+    
+    @pytest.mark.asyncio
+    async def test_dependent_operation_skipped_after_failure(self, tmp_path):
+        data = await call("batch_operations", operations=[
+            {"op": "move_file", "source": str(tmp_path / "missing"), "destination": str(tmp_path / "m")},
+            {"op": "delete_file", "path": str(tmp_path / "m")},
+            {"op": "write_file", "path": str(tmp_path / "other.txt"), "content": "ok"},
+        ])
+        
+        assert data["success"] is False
+        assert data["rolled_back"] is False
+        assert data["results"][1]["skipped"] is True
+        assert data["results"][2]["success"] is True
+    
+    @pytest.mark.asyncio
+    async def test_atomic_batch_rolls_back(self, tmp_path):
+        (tmp_path / "keep.txt").write_text("original")
+        (tmp_path / "tree").mkdir()
+        (tmp_path / "tree" / "x.txt").write_text("x")
+        staging_before = {name for name in os.listdir(tempfile.gettempdir()) if name.startswith("mcp-batch-")}
+        
+        data = await call("batch_operations", atomic=True, operations=[
+            {"op": "write_file", "path": str(tmp_path / "keep.txt"), "content": "changed"},
+            {"op": "write_file", "path": str(tmp_path / "new" / "deep" / "f.txt"), "content": "new"},
+            {"op": "delete_file", "path": str(tmp_path / "tree"), "recursive": True},
+            {"op": "copy_file", "source": str(tmp_path / "missing"), "destination": str(tmp_path / "c")},
+        ])
+        
+        assert data["success"] is False
+        assert data["rolled_back"] is True
+        assert (tmp_path / "keep.txt").read_text() == "original"
+        assert (tmp_path / "tree" / "x.txt").read_text() == "x"
+        assert not (tmp_path / "new").exists()
+        assert {name for name in os.listdir(tempfile.gettempdir()) if name.startswith("mcp-batch-")} == staging_before
+    
+    @pytest.mark.asyncio
+    async def test_atomic_batch_commits(self, tmp_path):
+        data = await call("batch_operations", atomic=True, operations=[
+            {"op": "write_file", "path": str(tmp_path / "a.txt"), "content": "A"},
+            {"op": "delete_file", "path": str(tmp_path / "a.txt")},
+        ])
+        
+        assert data["success"] is True
+        assert data["rolled_back"] is False
+        assert not (tmp_path / "a.txt").exists()
+    
+    @pytest.mark.asyncio
+    async def test_rejects_unknown_operation(self, tmp_path):
+        data = await call("batch_operations", operations=[{"op": "format_disk", "path": str(tmp_path)}])
+        
+        assert data["success"] is False
+        assert data["type"] == "ValueError"
+
+
+class TestAtomicWrites:
+    """Tests for atomic, durable and compare-and-swap write_file"""
+    
+    @pytest.mark.asyncio
+    async def test_overwrite_replaces_file_atomically(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_text("old")
+        os.chmod(path, 0o640)
+        inode = path.stat().st_ino
+        
+        with patch.object(mcp_file_server.os, "fsync", wraps=os.fsync) as fsync:
+            data = await call("write_file", path=str(path), content="new", fsync=True)
+        
+        assert data["success"] is True
+        assert path.read_text() == "new"
+        assert path.stat().st_ino != inode
+        assert oct(path.stat().st_mode)[-3:] == "640"
+        assert data["modified"] == path.stat().st_mtime
+        assert fsync.call_count >= 2
+        assert os.listdir(tmp_path) == ["a.txt"]
+    
+    @pytest.mark.asyncio
+    async def test_failed_write_leaves_original_and_no_temp_file(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_text("old")
+        
+        data = await call("write_file", path=str(path), content="héllo", encoding="ascii")
+        
+        assert data["success"] is False
+        assert path.read_text() == "old"
+        assert os.listdir(tmp_path) == ["a.txt"]
+    
+    @pytest.mark.asyncio
+    async def test_write_through_symlink_updates_target(self, tmp_path):
+        target = tmp_path / "target.txt"
+        target.write_text("old")
+        link = tmp_path / "link.txt"
+        os.symlink(target, link)
+        
+        await call("write_file", path=str(link), content="new")
+        
+        assert link.is_symlink()
+        assert target.read_text() == "new"
+    
+    @pytest.mark.asyncio
+    async def test_non_atomic_write_keeps_inode(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_text("old")
+        inode = path.stat().st_ino
+        
+        await call("write_file", path=str(path), content="new", atomic=False)
+        
+        assert path.stat().st_ino == inode
+        assert path.read_text() == "new"
+    
+    @pytest.mark.asyncio
+    async def test_compare_and_swap_by_mtime(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_text("v1")
+        info = await call("file_info", path=str(path))
+        
+        first = await call("write_file", path=str(path), content="v2", expected_mtime=info["modified"])
+        stale = await call("write_file", path=str(path), content="v3", expected_mtime=info["modified"] - 10)
+        
+        assert first["success"] is True
+        assert stale["success"] is False
+        assert stale["type"] == "WriteConflict"
+        assert path.read_text() == "v2"
+    
+    @pytest.mark.asyncio
+    async def test_compare_and_swap_by_hash(self, tmp_path):
+        from ai_navigator.file_index import hash_file
+        path = tmp_path / "a.txt"
+        path.write_text("v1")
+        
+        ok = await call("write_file", path=str(path), content="v2", expected_hash=hash_file(str(path)))
+        conflict = await call("write_file", path=str(path), content="v3", expected_hash="0" * 64)
+        missing = await call("write_file", path=str(tmp_path / "gone.txt"), content="x", expected_hash="0" * 64)
+        
+        assert ok["success"] is True
+        assert conflict["type"] == "WriteConflict"
+        assert missing["type"] == "WriteConflict"
+        assert path.read_text() == "v2"
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_appends_are_not_interleaved(self, tmp_path):
+        path = tmp_path / "log.txt"
+        lines = [f"entry {i}\n" for i in range(20)]
+        
+        results = await asyncio.gather(*(
+            call("write_file", path=str(path), content=line, append=True) for line in lines
+        ))
+        
+        assert all(result["success"] for result in results)
+        assert sorted(path.read_text().splitlines(keepends=True)) == sorted(lines)
+    
+    @pytest.mark.asyncio
+    async def test_non_ascii_append_reports_progress_in_characters(self, tmp_path):
+        path = tmp_path / "log.txt"
+        path.write_text("start\n")
+        wide = tmp_path / "wide.txt"
+        content = "héllo wörld ✓\n" * 5
+        session = Mock()
+        session.send_progress_notification = AsyncMock()
+        context = Mock(meta=Mock(progressToken="tok"), session=session)
+    
+        with patch.object(mcp_file_server, "WRITE_CHUNK_SIZE", 8), \
+             patch.object(type(mcp_file_server.server), "request_context", new_callable=PropertyMock,
+                          return_value=context):
+            data = await call("write_file", path=str(path), content=content, append=True)
+            await call("write_file", path=str(wide), content=content, append=True, encoding="utf-16")
+        await asyncio.sleep(0)
+    
+        assert data["success"] is True
+        last = session.send_progress_notification.call_args_list[-1]
+        assert last.args == ("tok", len(content), len(content))
+        assert all(c.args[1] <= c.args[2] for c in session.send_progress_notification.call_args_list)
+        assert path.read_text() == "start\n" + content
+        # Chunked encoding must not repeat the byte order mark
+        assert wide.read_bytes() == content.encode("utf-16")
+    
+    @pytest.mark.asyncio
+    async def test_write_locks_do_not_grow_with_paths(self, tmp_path):
+        for i in range(200):
+            await call("write_file", path=str(tmp_path / f"f{i}.txt"), content="x")
+    
+        assert len(mcp_file_server._write_locks) == mcp_file_server.WRITE_LOCK_STRIPES
+        assert mcp_file_server._write_lock(str(tmp_path / "a")) is \
+            mcp_file_server._write_lock(str(tmp_path / "b" / ".." / "a"))
+
+
+class TestHashingAndChanges:
+    """Tests for the file_hash and files_changed_since tools"""
+    
+    @pytest.mark.asyncio
+    async def test_file_hash_is_cached_until_file_changes(self, tmp_path):
+        from ai_navigator.file_index import hash_file
+        path = tmp_path / "a.txt"
+        path.write_text("one")
+        
+        first = await call("file_hash", paths=[str(path)])
+        second = await call("file_hash", paths=[str(path)])
+        path.write_text("three")
+        third = await call("file_hash", paths=[str(path)])
+        
+        assert first["hashes"][str(path)]["hash"] == second["hashes"][str(path)]["hash"]
+        assert first["hashes"][str(path)]["cached"] is False
+        assert second["hashes"][str(path)]["cached"] is True
+        assert third["hashes"][str(path)]["cached"] is False
+        assert third["hashes"][str(path)]["hash"] == hash_file(str(path))
+    
+    @pytest.mark.asyncio
+    async def test_file_hash_reports_errors_per_path(self, tmp_path):
+        (tmp_path / "a.txt").write_text("a")
+        
+        data = await call("file_hash", paths=[str(tmp_path / "a.txt"), str(tmp_path / "nope"), str(tmp_path)],
+                          algorithm="sha256")
+        
+        assert data["success"] is False
+        assert list(data["hashes"]) == [str(tmp_path / "a.txt")]
+        assert len(data["hashes"][str(tmp_path / "a.txt")]["hash"]) == 64
+        assert set(data["errors"]) == {str(tmp_path / "nope"), str(tmp_path)}
+    
+    @pytest.mark.asyncio
+    async def test_hash_reused_from_file_index(self, tmp_path):
+        from ai_navigator.file_index import FileIndex
+        (tmp_path / "a.txt").write_text("a")
+        index = FileIndex([str(tmp_path)], watch=False)
+        index.refresh()
+        
+        with patch.object(mcp_file_server, "_file_index", index), \
+                patch.object(mcp_file_server, "_hash_cache", mcp_file_server._HashCache()), \
+                patch.object(mcp_file_server, "hash_file") as hash_file:
+            data = await call("file_hash", paths=[str(tmp_path / "a.txt")])
+        
+        hash_file.assert_not_called()
+        assert data["hashes"][str(tmp_path / "a.txt")]["hash"] == index.get(str(tmp_path / "a.txt")).content_hash
+        index.close()
+    
+    @pytest.mark.asyncio
+    async def test_changed_since_known_hashes(self, tmp_path):
+        for name in ("a", "b"):
+            (tmp_path / name).write_text(name)
+        known = (await call("file_hash", paths=[str(tmp_path / "a"), str(tmp_path / "b")]))["hashes"]
+        (tmp_path / "b").write_text("bb")
+        (tmp_path / "a").rename(tmp_path / "c")
+        (tmp_path / "a").write_text("a")
+        
+        data = await call("files_changed_since", known={
+            str(tmp_path / "a"): known[str(tmp_path / "a")]["hash"],
+            str(tmp_path / "b"): known[str(tmp_path / "b")]["hash"],
+            str(tmp_path / "gone"): "0" * 64,
+        })
+        
+        assert data["unchanged"] == [str(tmp_path / "a")]
+        assert data["changed"] == [str(tmp_path / "b")]
+        assert data["missing"] == [str(tmp_path / "gone")]
+        assert str(tmp_path / "b") in data["hashes"]
+    
+    @pytest.mark.asyncio
+    async def test_changed_since_time(self, tmp_path):
+        (tmp_path / "old.txt").write_text("old")
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "new.txt").write_text("new")
+        os.utime(tmp_path / "old.txt", (1000, 1000))
+        
+        data = await call("files_changed_since", path=str(tmp_path), since=2000)
+        
+        assert [entry["path"] for entry in data["changed"]] == [str(tmp_path / "sub" / "new.txt")]
+        assert data["truncated"] is False
+    
+    @pytest.mark.asyncio
+    async def test_changed_since_requires_arguments(self, tmp_path):
+        data = await call("files_changed_since", path=str(tmp_path))
+        
+        assert data["success"] is False
+
+
+class TestWatchPath:
+    
+    @staticmethod
+    def _context():
+        session = Mock()
+        session.send_log_message = AsyncMock()
+        return Mock(meta=None, session=session), session
+    
+    @staticmethod
+    async def _wait_for(mock, timeout=3.0):
+        deadline = time.monotonic() + timeout
+        while not mock.call_args_list and time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+        return mock.call_args_list
+    
+    @pytest.mark.asyncio
+    async def test_polling_watch_sends_debounced_changes(self, tmp_path):
+        (tmp_path / "existing.txt").write_text("a")
+        context, session = self._context()
+        
+        with patch.object(mcp_file_server, "Observer", None), \
+             patch.object(mcp_file_server, "WATCH_POLL_INTERVAL", 0.05), \
+             patch.object(type(mcp_file_server.server), "request_context", new_callable=PropertyMock,
+                          return_value=context):
+            data = await call("watch_path", path=str(tmp_path), debounce=0.1)
+            assert data["success"] is True
+            assert data["backend"] == "polling"
+            
+            (tmp_path / "new.txt").write_text("b")
+            (tmp_path / "existing.txt").write_text("changed")
+            (tmp_path / ".hidden").write_text("c")
+            calls = await self._wait_for(session.send_log_message)
+            
+            assert (await call("unwatch_path", watch_id=data["watch_id"]))["success"] is True
+        
+        assert len(calls) == 1
+        kwargs = calls[0].kwargs
+        assert kwargs["logger"] == mcp_file_server.WATCH_LOGGER
+        assert kwargs["data"]["watch_id"] == data["watch_id"]
+        changes = {change["path"]: change["type"] for change in kwargs["data"]["changes"]}
+        assert changes == {
+            str(tmp_path / "new.txt"): "created",
+            str(tmp_path / "existing.txt"): "modified",
+        }
+    
+    @pytest.mark.asyncio
+    async def test_unwatch_stops_notifications(self, tmp_path):
+        context, session = self._context()
+        
+        with patch.object(mcp_file_server, "Observer", None), \
+             patch.object(mcp_file_server, "WATCH_POLL_INTERVAL", 0.02), \
+             patch.object(type(mcp_file_server.server), "request_context", new_callable=PropertyMock,
+                          return_value=context):
+            data = await call("watch_path", path=str(tmp_path), debounce=0)
+            assert (await call("unwatch_path", watch_id=data["watch_id"]))["success"] is True
+            
+            (tmp_path / "late.txt").write_text("x")
+            await asyncio.sleep(0.1)
+        
+        session.send_log_message.assert_not_called()
+        assert data["watch_id"] not in mcp_file_server._watches
+        assert (await call("unwatch_path", watch_id=data["watch_id"]))["success"] is False
+    
+    @pytest.mark.asyncio
+    async def test_changes_are_coalesced_and_filtered(self, tmp_path):
+        session = Mock()
+        session.send_log_message = AsyncMock()
+        watch = mcp_file_server._Watch(str(tmp_path), session, pattern="*.py", debounce=0.05)
+        
+        watch.add_change("created", str(tmp_path / "tmp.py"))
+        watch.add_change("modified", str(tmp_path / "tmp.py"))
+        watch.add_change("deleted", str(tmp_path / "tmp.py"))
+        watch.add_change("created", str(tmp_path / "kept.py"))
+        watch.add_change("modified", str(tmp_path / "kept.py"))
+        watch.add_change("created", str(tmp_path / "notes.txt"))
+        watch.add_change("created", str(tmp_path.parent / "outside.py"))
+        calls = await self._wait_for(session.send_log_message)
+        
+        assert len(calls) == 1
+        assert calls[0].kwargs["data"]["changes"] == [{"type": "created", "path": str(tmp_path / "kept.py")}]
+    
+    @pytest.mark.asyncio
+    async def test_watchdog_events_are_forwarded(self, tmp_path):
+        session = Mock()
+        session.send_log_message = AsyncMock()
+        watch = mcp_file_server._Watch(str(tmp_path), session, debounce=0.01)
+        handler = mcp_file_server._WatchdogHandler(watch)
+        
+        handler.on_any_event(Mock(event_type="modified", is_directory=True, src_path=str(tmp_path / "d")))
+        handler.on_any_event(Mock(event_type="opened", is_directory=False, src_path=str(tmp_path / "a")))
+        handler.on_any_event(Mock(event_type="moved", is_directory=False, src_path=str(tmp_path / "a"),
+                                  dest_path=str(tmp_path / "b")))
+        calls = await self._wait_for(session.send_log_message)
+        
+        assert calls[0].kwargs["data"]["changes"] == [
+            {"type": "moved", "path": str(tmp_path / "a"), "dest_path": str(tmp_path / "b")}
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_watch_requires_session(self, tmp_path):
+        data = await call("watch_path", path=str(tmp_path))
+        
+        assert data["success"] is False
+        assert "session" in data["error"]
+
+
+class TestArchives:
+    
+    @staticmethod
+    def _tree(root):
+        (root / "model" / "conf").mkdir(parents=True)
+        (root / "model" / "am.bin").write_bytes(os.urandom(3000))
+        (root / "model" / "conf" / "model.conf").write_text("--sample-frequency=16000\n")
+        (root / "model" / ".cache").write_text("hidden")
+        return root / "model"
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("suffix", [".zip", ".tar.gz"])
+    async def test_round_trip(self, tmp_path, suffix):
+        source = self._tree(tmp_path)
+        archive = tmp_path / f"model{suffix}"
+        
+        created = await call("archive_create", source=str(source), destination=str(archive))
+        extracted = await call("archive_extract", path=str(archive), destination=str(tmp_path / "out"))
+        
+        assert created["success"] is True
+        assert created["format"] == suffix[1:]
+        assert created["entries"] == 5
+        assert extracted["success"] is True
+        assert extracted["format"] == suffix[1:]
+        out = tmp_path / "out" / "model"
+        assert (out / "am.bin").read_bytes() == (source / "am.bin").read_bytes()
+        assert (out / "conf" / "model.conf").read_text() == "--sample-frequency=16000\n"
+        assert (out / ".cache").exists()
+    
+    @pytest.mark.asyncio
+    async def test_zstd_round_trip(self, tmp_path):
+        pytest.importorskip("zstandard")
+        source = self._tree(tmp_path)
+        archive = tmp_path / "model.tar.zst"
+        
+        assert (await call("archive_create", source=str(source), destination=str(archive)))["success"] is True
+        data = await call("archive_extract", path=str(archive), destination=str(tmp_path / "out"))
+        
+        assert data["format"] == "tar.zst"
+        assert (tmp_path / "out" / "model" / "am.bin").read_bytes() == (source / "am.bin").read_bytes()
+    
+    @pytest.mark.asyncio
+    async def test_zstd_requires_zstandard(self, tmp_path):
+        source = self._tree(tmp_path)
+        
+        with patch.object(mcp_file_server, "zstandard", None):
+            data = await call("archive_create", source=str(source), destination=str(tmp_path / "m.tar.zst"))
+        
+        assert data["success"] is False
+        assert "zstandard" in data["error"]
+        assert not list(tmp_path.glob("*.tar.zst*"))
+    
+    @pytest.mark.asyncio
+    async def test_explicit_format_and_hidden_files(self, tmp_path):
+        source = self._tree(tmp_path)
+        archive = tmp_path / "model.bin"
+        
+        data = await call("archive_create", source=str(source), destination=str(archive),
+                          format="tar.gz", include_hidden=False)
+        
+        assert data["entries"] == 4
+        extracted = await call("archive_extract", path=str(archive), destination=str(tmp_path / "out"))
+        assert extracted["format"] == "tar.gz"
+        assert not (tmp_path / "out" / "model" / ".cache").exists()
+    
+    @pytest.mark.asyncio
+    async def test_archive_inside_source_is_skipped(self, tmp_path):
+        source = self._tree(tmp_path)
+        archive = source / "self.zip"
+        
+        data = await call("archive_create", source=str(source), destination=str(archive))
+        
+        assert data["success"] is True
+        with zipfile.ZipFile(archive) as zf:
+            assert not any(name.endswith(".zip") or name.endswith(".tmp") for name in zf.namelist())
+    
+    @pytest.mark.asyncio
+    async def test_relative_source_skips_archive_inside_it(self, tmp_path, monkeypatch):
+        (tmp_path / "data").mkdir()
+        (tmp_path / "data" / "a.txt").write_text("a")
+        monkeypatch.chdir(tmp_path)
+        
+        data = await call("archive_create", source="data", destination="data/out.zip")
+        
+        assert data["success"] is True
+        with zipfile.ZipFile(tmp_path / "data" / "out.zip") as zf:
+            assert zf.namelist() == ["data/", "data/a.txt"]
+    
+    @pytest.mark.asyncio
+    async def test_unsafe_entries_are_refused(self, tmp_path):
+        archive = tmp_path / "evil.zip"
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("../escaped.txt", "x")
+        tar_archive = tmp_path / "evil.tar.gz"
+        with tarfile.open(tar_archive, "w:gz") as tf:
+            link = tarfile.TarInfo("link")
+            link.type = tarfile.SYMTYPE
+            link.linkname = "/etc/passwd"
+            tf.addfile(link)
+        
+        zip_data = await call("archive_extract", path=str(archive), destination=str(tmp_path / "out"))
+        tar_data = await call("archive_extract", path=str(tar_archive), destination=str(tmp_path / "out"))
+        
+        assert zip_data["success"] is False
+        assert not (tmp_path / "escaped.txt").exists()
+        assert tar_data["success"] is False
+        assert not (tmp_path / "out" / "link").is_symlink()
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("suffix", [".zip", ".tar.gz"])
+    async def test_overwrite_does_not_follow_existing_symlink(self, tmp_path, suffix):
+        archive = tmp_path / f"evil{suffix}"
+        if suffix == ".zip":
+            with zipfile.ZipFile(archive, "w") as zf:
+                zf.writestr("evil", "payload")
+        else:
+            payload = tmp_path / "payload"
+            payload.write_text("payload")
+            with tarfile.open(archive, "w:gz") as tf:
+                tf.add(payload, "evil")
+        outside = tmp_path / "outside.txt"
+        outside.write_text("original")
+        out = tmp_path / "out"
+        out.mkdir()
+        os.symlink(outside, out / "evil")
+        
+        refused = await call("archive_extract", path=str(archive), destination=str(out))
+        data = await call("archive_extract", path=str(archive), destination=str(out), overwrite=True)
+        
+        assert refused["success"] is False
+        assert data["success"] is True
+        assert outside.read_text() == "original"
+        assert not (out / "evil").is_symlink()
+        assert (out / "evil").read_text() == "payload"
+    
+    @pytest.mark.asyncio
+    async def test_existing_files_need_overwrite(self, tmp_path):
+        source = self._tree(tmp_path)
+        archive = tmp_path / "model.zip"
+        await call("archive_create", source=str(source), destination=str(archive))
+        
+        out = tmp_path / "out"
+        (out / "model").mkdir(parents=True)
+        (out / "model" / "am.bin").write_text("old")
+        
+        refused = await call("archive_extract", path=str(archive), destination=str(out))
+        replaced = await call("archive_extract", path=str(archive), destination=str(out), overwrite=True)
+        
+        assert refused["success"] is False
+        assert replaced["success"] is True
+        assert (out / "model" / "am.bin").read_bytes() == (source / "am.bin").read_bytes()
+    
+    @pytest.mark.asyncio
+    async def test_create_reports_byte_progress(self, tmp_path):
+        source = self._tree(tmp_path)
+        session = Mock()
+        session.send_progress_notification = AsyncMock()
+        context = Mock(meta=Mock(progressToken="tok"), session=session)
+        
+        with patch.object(mcp_file_server, "ARCHIVE_CHUNK_SIZE", 1000), \
+             patch.object(type(mcp_file_server.server), "request_context", new_callable=PropertyMock,
+                          return_value=context):
+            data = await call("archive_create", source=str(source), destination=str(tmp_path / "m.zip"))
+        await asyncio.sleep(0)
+        
+        assert data["success"] is True
+        total = 3000 + len("--sample-frequency=16000\n") + len("hidden")
+        assert session.send_progress_notification.call_args_list[-1].args == ("tok", total, total)
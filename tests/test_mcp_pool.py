@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+import asyncio
+import os
+import pytest
+from unittest.mock import Mock, patch, AsyncMock
+from ai_navigator.amap_mcp_client import AmapMCPClient, amap_server_config
+from ai_navigator.mcp_client import AuthType, TransportType, create_mcp_client
+from ai_navigator.mcp_pool import MCPConnectionPool, make_pool_key
+from ai_navigator.circuit_breaker import CircuitState
+
+
+def _fake_client_class(connect_result=True):
+    created = []
+
+    def factory(config):
+        client = Mock()
+        client.config = config
+        client.connected = False
+
+        async def connect():
+            await asyncio.sleep(0)
+            client.connected = connect_result
+            return connect_result
+
+        client.connect = AsyncMock(side_effect=connect)
+        client.disconnect = AsyncMock()
+        client.ping = AsyncMock(return_value=True)
+        client.is_connected = Mock(side_effect=lambda: client.connected)
+        client.get_circuit_state = Mock(return_value=CircuitState.CLOSED)
+        created.append(client)
+        return client
+
+    return factory, created
+
+
+class TestMakePoolKey:
+
+    def test_key_includes_transport_and_auth(self):
+        base = make_pool_key("https://a.com", TransportType.HTTP_SSE)
+
+        assert base != make_pool_key("https://a.com", TransportType.HTTP_STREAM)
+        assert base != make_pool_key("https://a.com", TransportType.HTTP_SSE, AuthType.API_KEY, "k")
+        assert make_pool_key("https://a.com", TransportType.HTTP_SSE, AuthType.API_KEY, "k") != \
+            make_pool_key("https://a.com", TransportType.HTTP_SSE, AuthType.API_KEY, "other")
+
+    def test_token_is_not_stored_in_clear(self):
+        key = make_pool_key("https://a.com", TransportType.HTTP_SSE, AuthType.BEARER, "secret-token")
+
+        assert "secret-token" not in key
+
+
+class TestMCPConnectionPool:
+
+    @pytest.mark.asyncio
+    async def test_acquire_shares_client_per_key(self):
+        factory, created = _fake_client_class()
+        pool = MCPConnectionPool()
+
+        with patch('ai_navigator.mcp_pool.MCPClient', side_effect=factory):
+            first, second = await asyncio.gather(
+                pool.acquire("https://a.com"),
+                pool.acquire("https://a.com")
+            )
+            other = await pool.acquire("https://a.com", auth_type=AuthType.API_KEY, auth_token="k")
+
+        assert first is second
+        assert other is not first
+        assert len(created) == 2
+        created[0].connect.assert_called_once()
+        assert pool.stats()["https://a.com (http_sse, none)"]["refcount"] == 2
+
+    @pytest.mark.asyncio
+    async def test_release_keeps_connection_until_idle_timeout(self):
+        factory, created = _fake_client_class()
+        pool = MCPConnectionPool(idle_timeout=0.05)
+
+        with patch('ai_navigator.mcp_pool.MCPClient', side_effect=factory):
+            client = await pool.acquire("https://a.com")
+            await pool.release(client)
+
+            assert len(pool) == 1
+            assert await pool.evict_idle() == 0
+
+            await asyncio.sleep(0.06)
+            assert await pool.evict_idle() == 1
+
+        assert len(pool) == 0
+        client.disconnect.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_in_use_connection_is_not_evicted(self):
+        factory, created = _fake_client_class()
+        pool = MCPConnectionPool(idle_timeout=0)
+
+        with patch('ai_navigator.mcp_pool.MCPClient', side_effect=factory):
+            client = await pool.acquire("https://a.com")
+
+        assert await pool.evict_idle() == 0
+        client.disconnect.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_unhealthy_connection_is_replaced(self):
+        factory, created = _fake_client_class()
+        pool = MCPConnectionPool(health_check_interval=0)
+
+        with patch('ai_navigator.mcp_pool.MCPClient', side_effect=factory):
+            first = await pool.acquire("https://a.com")
+            first.ping.return_value = False
+
+            second = await pool.acquire("https://a.com")
+
+            assert second is not first
+            first.disconnect.assert_not_called()
+
+            await pool.release(first)
+            first.disconnect.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_skips_ping(self):
+        factory, created = _fake_client_class()
+        pool = MCPConnectionPool()
+
+        with patch('ai_navigator.mcp_pool.MCPClient', side_effect=factory):
+            first = await pool.acquire("https://a.com")
+            await pool.release(first)
+            first.get_circuit_state.return_value = CircuitState.OPEN
+
+            second = await pool.acquire("https://a.com")
+
+        assert second is not first
+        first.ping.assert_not_called()
+        first.disconnect.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_failed_connect_raises_and_is_not_pooled(self):
+        factory, created = _fake_client_class(connect_result=False)
+        pool = MCPConnectionPool()
+
+        with patch('ai_navigator.mcp_pool.MCPClient', side_effect=factory):
+            with pytest.raises(ConnectionError):
+                await pool.acquire("https://a.com")
+
+        assert len(pool) == 0
+        created[0].disconnect.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_release_unknown_client_disconnects_it(self):
+        pool = MCPConnectionPool()
+        client = Mock()
+        client.disconnect = AsyncMock()
+
+        await pool.release(client)
+
+        client.disconnect.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_connection_context_manager_and_close(self):
+        factory, created = _fake_client_class()
+        pool = MCPConnectionPool()
+
+        with patch('ai_navigator.mcp_pool.MCPClient', side_effect=factory):
+            async with pool.connection("https://a.com") as client:
+                assert pool.stats()["https://a.com (http_sse, none)"]["refcount"] == 1
+
+        assert pool.stats()["https://a.com (http_sse, none)"]["refcount"] == 0
+
+        await pool.close()
+
+        assert len(pool) == 0
+        client.disconnect.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_create_mcp_client_pooled(self):
+        pool = MCPConnectionPool()
+        sentinel = Mock()
+
+        with patch('ai_navigator.mcp_pool.get_connection_pool', return_value=pool):
+            with patch.object(pool, 'acquire', new_callable=AsyncMock, return_value=sentinel) as acquire:
+                client = await create_mcp_client("https://a.com", pooled=True, eager_discovery=("tools",))
+
+        assert client is sentinel
+        acquire.assert_called_once_with(
+            "https://a.com",
+            transport_type=TransportType.HTTP_SSE,
+            auth_token=None,
+            auth_type=AuthType.NONE,
+            eager_discovery=("tools",)
+        )
+    
+    @pytest.mark.asyncio
+    async def test_main_path_and_amap_client_share_connection(self):
+        factory, created = _fake_client_class()
+        pool = MCPConnectionPool()
+        env = {"AMAP_MCP_SERVER_URL": "https://amap.example/mcp/stream", "AMAP_API_KEY": "k"}
+        
+        with patch.dict(os.environ, env), \
+             patch('ai_navigator.mcp_pool.get_connection_pool', return_value=pool), \
+             patch('ai_navigator.mcp_pool.MCPClient', side_effect=factory):
+            main_client = await create_mcp_client(
+                **amap_server_config(os.environ["AMAP_MCP_SERVER_URL"]),
+                pooled=True,
+                eager_discovery=("tools",)
+            )
+            amap = await AmapMCPClient().connect()
+        
+        assert amap.client is main_client
+        assert len(created) == 1
+        assert created[0].config.transport_type == TransportType.HTTP_STREAM
+        assert created[0].config.auth_type == AuthType.API_KEY
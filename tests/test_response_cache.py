@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+import pytest
+from unittest.mock import patch
+from ai_navigator.response_cache import ResponseCache, make_cache_key, create_response_cache
+
+
+class TestMakeCacheKey:
+    
+    def test_whitespace_is_normalized(self):
+        key1 = make_cache_key("openai", "gpt", "parse", [{"role": "user", "content": "从北京  到\n上海"}])
+        key2 = make_cache_key("openai", "gpt", "parse", [{"role": "user", "content": "从北京 到 上海"}])
+        
+        assert key1 == key2
+    
+    def test_key_depends_on_provider_model_and_method(self):
+        messages = [{"role": "user", "content": "prompt"}]
+        keys = {
+            make_cache_key("openai", "gpt", "parse", messages),
+            make_cache_key("anthropic", "gpt", "parse", messages),
+            make_cache_key("openai", "gpt-4", "parse", messages),
+            make_cache_key("openai", "gpt", "select", messages),
+        }
+        
+        assert len(keys) == 4
+
+
+class TestResponseCache:
+    
+    def test_set_and_get(self):
+        cache = ResponseCache()
+        cache.set("k", {"start": "A"})
+        
+        assert cache.get("k") == {"start": "A"}
+        assert cache.hits == 1
+    
+    def test_get_returns_copy(self):
+        cache = ResponseCache()
+        cache.set("k", {"start": "A"})
+        
+        cache.get("k")["start"] = "B"
+        
+        assert cache.get("k") == {"start": "A"}
+    
+    def test_lru_eviction(self):
+        cache = ResponseCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+    
+    def test_ttl_expiry(self):
+        cache = ResponseCache(ttl=10)
+        with patch("ai_navigator.response_cache.time.time", return_value=1000.0):
+            cache.set("k", "v")
+        with patch("ai_navigator.response_cache.time.time", return_value=1011.0):
+            assert cache.get("k") is None
+        
+        assert len(cache) == 0
+    
+    def test_disk_store_survives_new_instance(self, tmp_path):
+        cache = ResponseCache(cache_dir=str(tmp_path))
+        cache.set("k", {"mode": "car"})
+        
+        fresh = ResponseCache(cache_dir=str(tmp_path))
+        
+        assert fresh.get("k") == {"mode": "car"}
+    
+    def test_clear_removes_disk_entries(self, tmp_path):
+        cache = ResponseCache(cache_dir=str(tmp_path))
+        cache.set("k", 1)
+        cache.clear()
+        
+        assert list(tmp_path.glob("*.json")) == []
+        assert cache.get("k") is None
+
+
+class TestCreateResponseCache:
+    """Tests for building the cache from environment variables"""
+    
+    def test_disabled_by_default(self):
+        with patch.dict("os.environ", {}, clear=True):
+            assert create_response_cache() is None
+    
+    def test_enabled_explicitly(self):
+        with patch.dict("os.environ", {"AI_CACHE_ENABLED": "true", "AI_CACHE_TTL": "0"}, clear=True):
+            cache = create_response_cache()
+        
+        assert isinstance(cache, ResponseCache)
+        assert cache.ttl is None
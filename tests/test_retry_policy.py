@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+import pytest
+import asyncio
+import httpx
+from unittest.mock import AsyncMock, patch
+from ai_navigator.retry_policy import RetryPolicy, is_retryable_error, is_request_unsent
+
+
+def _status_error(status):
+    request = httpx.Request("POST", "https://test.com")
+    response = httpx.Response(status, request=request)
+    return httpx.HTTPStatusError("status", request=request, response=response)
+
+
+def _wrapped(error):
+    try:
+        try:
+            raise error
+        except httpx.HTTPError as e:
+            raise ConnectionError(f"HTTP request failed: {e}") from e
+    except ConnectionError as wrapped:
+        return wrapped
+
+
+class TestErrorClassification:
+    
+    def test_timeouts_and_resets_are_retryable(self):
+        assert is_retryable_error(TimeoutError())
+        assert is_retryable_error(ConnectionResetError())
+        assert is_retryable_error(httpx.ReadTimeout("slow"))
+    
+    def test_server_errors_are_retryable(self):
+        assert is_retryable_error(_wrapped(_status_error(503)))
+        assert is_retryable_error(_wrapped(_status_error(429)))
+    
+    def test_client_errors_are_not_retryable(self):
+        assert not is_retryable_error(_wrapped(_status_error(404)))
+        assert not is_retryable_error(ValueError("bad arguments"))
+        assert not is_retryable_error(Exception("Server error: invalid params"))
+    
+    def test_wrapped_errors_are_classified_by_cause(self):
+        assert is_retryable_error(_wrapped(httpx.ReadTimeout("slow")))
+        assert is_retryable_error(_wrapped(httpx.ConnectError("refused")))
+        assert is_retryable_error(_wrapped(httpx.ReadError("reset")))
+        assert not is_retryable_error(_wrapped(httpx.RemoteProtocolError("bad frame")))
+        assert not is_retryable_error(_wrapped(httpx.DecodingError("bad gzip")))
+        assert not is_retryable_error(_wrapped(httpx.UnsupportedProtocol("ftp")))
+    
+    def test_unwrapped_connection_error_is_retryable(self):
+        assert is_retryable_error(ConnectionError("Not connected to server"))
+    
+    def test_connect_errors_are_unsent(self):
+        assert is_request_unsent(_wrapped(httpx.ConnectError("refused")))
+        assert not is_request_unsent(_wrapped(httpx.ReadTimeout("slow")))
+
+
+class TestRetryPolicy:
+    
+    def test_exponential_delay_without_jitter(self):
+        policy = RetryPolicy(base_delay=1.0, multiplier=2.0, max_delay=5.0, jitter=False)
+        
+        assert [policy.compute_delay(n) for n in (1, 2, 3, 4)] == [1.0, 2.0, 4.0, 5.0]
+    
+    def test_jitter_stays_within_bounds(self):
+        policy = RetryPolicy(base_delay=1.0, jitter=True)
+        
+        for _ in range(50):
+            assert 0 <= policy.compute_delay(2) <= 2.0
+    
+    @pytest.mark.asyncio
+    async def test_retries_transient_failures(self):
+        policy = RetryPolicy(max_retries=3, base_delay=0.001)
+        operation = AsyncMock(side_effect=[TimeoutError(), ConnectionResetError(), {"ok": True}])
+        
+        result = await policy.run(operation)
+        
+        assert result == {"ok": True}
+        assert operation.call_count == 3
+    
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self):
+        policy = RetryPolicy(max_retries=2, base_delay=0.001)
+        operation = AsyncMock(side_effect=TimeoutError("still slow"))
+        
+        with pytest.raises(TimeoutError):
+            await policy.run(operation)
+        
+        assert operation.call_count == 3
+    
+    @pytest.mark.asyncio
+    async def test_does_not_retry_permanent_errors(self):
+        policy = RetryPolicy(max_retries=3, base_delay=0.001)
+        operation = AsyncMock(side_effect=ValueError("bad"))
+        
+        with pytest.raises(ValueError):
+            await policy.run(operation)
+        
+        assert operation.call_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_non_idempotent_only_retries_unsent_requests(self):
+        policy = RetryPolicy(max_retries=3, base_delay=0.001)
+        
+        sent = AsyncMock(side_effect=_wrapped(httpx.ReadTimeout("slow")))
+        with pytest.raises(ConnectionError):
+            await policy.run(sent, idempotent=False)
+        assert sent.call_count == 1
+        
+        unsent = AsyncMock(side_effect=[_wrapped(httpx.ConnectError("refused")), "done"])
+        assert await policy.run(unsent, idempotent=False) == "done"
+    
+    @pytest.mark.asyncio
+    async def test_deadline_bounds_total_time(self):
+        policy = RetryPolicy(max_retries=10, base_delay=0.05, jitter=False, deadline=0.1)
+        
+        async def slow():
+            await asyncio.sleep(1)
+        
+        with pytest.raises((TimeoutError, asyncio.TimeoutError)):
+            await asyncio.wait_for(policy.run(slow), timeout=1.0)
@@ -1,6 +1,22 @@
 """Tests for SystemMCPManager"""
+import asyncio
+import gzip
+import logging
 import pytest
-from ai_navigator.system_mcp_manager import SystemMCPManager, PermissionLevel, TransportMethod, ToolMetadata
+from unittest.mock import Mock, patch, AsyncMock
+from ai_navigator.system_mcp_manager import (
+    SystemMCPManager,
+    MCPServerConnection,
+    AuditLogger,
+    AuditLogEntry,
+    PermissionLevel,
+    TransportMethod,
+    ToolMetadata,
+    _Sanitized,
+    _infer_permission_level,
+    _sanitize_sensitive_data
+)
+from ai_navigator.mcp_client import TransportType, AuthType
 
 
 class TestSystemMCPManager:
@@ -61,3 +77,631 @@ class TestSystemMCPManager:
         assert metadata.server_name == "test_server"
         assert metadata.permission_level == PermissionLevel.SAFE
         assert metadata.requires_confirmation is False
+
+
+class TestRemoteTransports:
+    """Tests for HTTP, WebSocket and remote server connections"""
+    
+    def _mock_client(self, connect_result=True):
+        from ai_navigator.mcp_client import Tool
+        
+        client = Mock()
+        client.connect = AsyncMock(return_value=connect_result)
+        client.disconnect = AsyncMock()
+        client.discover_tools = AsyncMock(return_value=[
+            Tool(name="maps_geo", description="Geocode", parameters={"type": "object"}),
+            Tool(name="delete_file", description="Delete", parameters={})
+        ])
+        client.call_tool = AsyncMock(return_value={"content": [{"type": "text", "text": "ok"}]})
+        return client
+    
+    @pytest.mark.parametrize("url,expected", [
+        ("wss://tools.example.com/mcp", TransportType.WEBSOCKET),
+        ("https://mcp.amap.com/sse", TransportType.HTTP_SSE),
+        ("http://tools:8080/mcp", TransportType.HTTP_STREAM),
+        ("ftp://example.com", None),
+        (None, None),
+    ])
+    def test_infer_transport_type(self, url, expected):
+        assert MCPServerConnection._infer_transport_type(url) == expected
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("transport,url,expected", [
+        (TransportMethod.HTTP, "https://tools.example.com/mcp", TransportType.HTTP_STREAM),
+        (TransportMethod.WEBSOCKET, "wss://tools.example.com/mcp", TransportType.WEBSOCKET),
+        (TransportMethod.REMOTE, "https://mcp.amap.com/sse", TransportType.HTTP_SSE),
+    ])
+    async def test_register_remote_server_routes_through_client(self, tmp_path, transport, url, expected):
+        manager = SystemMCPManager(
+            enable_security=True,
+            enable_confirmation=False,
+            audit_log_file=str(tmp_path / "audit.log")
+        )
+        client = self._mock_client()
+        
+        with patch('ai_navigator.system_mcp_manager.MCPClient', return_value=client) as client_class:
+            success = await manager.register_server(
+                name="remote",
+                server_path="",
+                transport=transport,
+                server_url=url,
+                auth_token="secret-token",
+                auth_type=AuthType.BEARER
+            )
+        
+        assert success is True
+        config = client_class.call_args[0][0]
+        assert config.transport_type == expected
+        assert config.auth_token == "secret-token"
+        assert config.auth_type == AuthType.BEARER
+        
+        tools = manager.get_server_capabilities("remote")
+        assert {tool.name for tool in tools} == {"maps_geo", "delete_file"}
+        assert manager.servers["remote"].tools_metadata["delete_file"].permission_level == PermissionLevel.DANGEROUS
+        
+        result = await manager.call_tool("remote", "maps_geo", {"address": "北京"})
+        
+        assert result == {"content": [{"type": "text", "text": "ok"}]}
+        client.call_tool.assert_called_once_with("maps_geo", {"address": "北京"})
+        assert manager.get_audit_logs(1)[0].result_status == "success"
+        
+        await manager.disconnect_all()
+        client.disconnect.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_remote_server_without_url_fails(self):
+        connection = MCPServerConnection(name="remote", server_path="", transport=TransportMethod.HTTP)
+        
+        assert await connection.connect() is False
+        assert connection.connected is False
+    
+    @pytest.mark.asyncio
+    async def test_failed_remote_connect_is_not_registered(self, tmp_path):
+        manager = SystemMCPManager(enable_security=False, audit_log_file=str(tmp_path / "audit.log"))
+        client = self._mock_client(connect_result=False)
+        
+        with patch('ai_navigator.system_mcp_manager.MCPClient', return_value=client):
+            success = await manager.register_server(
+                name="remote",
+                server_path="",
+                transport=TransportMethod.WEBSOCKET,
+                server_url="wss://down.example.com"
+            )
+        
+        assert success is False
+        assert "remote" not in manager.servers
+        client.disconnect.assert_called_once()
+
+
+class TestRegisterServers:
+    """Tests for concurrent and lazy server registration"""
+    
+    def _fake_connect(self, manager, started, delay=0.05, failing=()):
+        async def start_server(connection):
+            started.append(connection.name)
+            await asyncio.sleep(delay)
+            if connection.name in failing:
+                return False
+            connection.connected = True
+            connection.tools_metadata = {
+                "open_url": ToolMetadata(
+                    name="open_url",
+                    server_name=connection.name,
+                    description="",
+                    permission_level=PermissionLevel.SAFE
+                )
+            }
+            return True
+        
+        return patch.object(manager, '_start_server', side_effect=start_server)
+    
+    @pytest.mark.asyncio
+    async def test_servers_start_concurrently(self, tmp_path):
+        manager = SystemMCPManager(enable_security=False, audit_log_file=str(tmp_path / "audit.log"))
+        started = []
+        
+        with self._fake_connect(manager, started, delay=0.1, failing={"network"}):
+            loop = asyncio.get_running_loop()
+            begin = loop.time()
+            results = await manager.register_servers([
+                {"name": "browser", "server_path": "browser.py"},
+                {"name": "file", "server_path": "file.py"},
+                {"name": "network", "server_path": "network.py"},
+            ])
+            elapsed = loop.time() - begin
+        
+        assert elapsed < 0.25
+        assert sorted(started) == ["browser", "file", "network"]
+        assert results["browser"].success is True
+        assert results["browser"].tool_count == 1
+        assert results["network"].success is False
+        assert results["network"].error == "connection failed"
+        assert set(manager.servers) == {"browser", "file"}
+    
+    @pytest.mark.asyncio
+    async def test_duplicate_names_are_reported(self, tmp_path):
+        manager = SystemMCPManager(enable_security=False, audit_log_file=str(tmp_path / "audit.log"))
+        started = []
+        
+        with self._fake_connect(manager, started, delay=0):
+            await manager.register_server(name="browser", server_path="browser.py")
+            results = await manager.register_servers([
+                {"name": "browser", "server_path": "browser.py"},
+                {"name": "file", "server_path": "file.py"},
+                {"name": "file", "server_path": "other.py"},
+            ])
+        
+        assert results["browser"].error == "already registered"
+        assert results["file"].success is True
+        assert started == ["browser", "file"]
+    
+    @pytest.mark.asyncio
+    async def test_lazy_server_starts_on_first_tool_call(self, tmp_path):
+        manager = SystemMCPManager(enable_security=False, audit_log_file=str(tmp_path / "audit.log"))
+        started = []
+        
+        with self._fake_connect(manager, started, delay=0.01):
+            results = await manager.register_servers(
+                [{"name": "browser", "server_path": "browser.py"}],
+                lazy=True
+            )
+            
+            assert results["browser"].success is True
+            assert results["browser"].lazy is True
+            assert started == []
+            
+            server = manager.servers["browser"]
+            server.call_tool = AsyncMock(return_value={"content": []})
+            
+            await asyncio.gather(
+                manager.call_tool("browser", "open_url", {"url": "https://example.com"}),
+                manager.call_tool("browser", "open_url", {"url": "https://example.org"})
+            )
+        
+        assert started == ["browser"]
+        assert server.call_tool.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_lazy_server_start_failure_raises(self, tmp_path):
+        manager = SystemMCPManager(enable_security=False, audit_log_file=str(tmp_path / "audit.log"))
+        started = []
+        
+        with self._fake_connect(manager, started, delay=0, failing={"browser"}):
+            await manager.register_servers(
+                [{"name": "browser", "server_path": "browser.py", "lazy": True}]
+            )
+            
+            with pytest.raises(ConnectionError):
+                await manager.call_tool("browser", "open_url", {})
+
+
+FAKE_STDIO_SERVER = r'''
+import json, os, sys, time
+
+hung = False
+for line in sys.stdin:
+    message = json.loads(line)
+    if "id" not in message:
+        continue
+    method = message["method"]
+    if method == "initialize":
+        result = {"protocolVersion": "2024-11-05", "capabilities": {"tools": {}}, "serverInfo": {"name": "fake"}}
+    elif method == "ping":
+        if hung:
+            continue
+        result = {}
+    elif method == "tools/list":
+        result = {"tools": [{"name": "slow_echo", "inputSchema": {}}]}
+    else:
+        arguments = message["params"]["arguments"]
+        if arguments.get("crash"):
+            sys.exit(1)
+        hung = arguments.get("hang", False)
+        time.sleep(arguments.get("delay", 0))
+        result = {"content": [{"type": "text", "text": str(os.getpid())}]}
+    sys.stdout.write(json.dumps({"jsonrpc": "2.0", "id": message["id"], "result": result}) + "\n")
+    sys.stdout.flush()
+'''
+
+
+class TestStdioReplicas:
+    """Tests for replicated stdio servers"""
+    
+    async def _register(self, tmp_path, **kwargs):
+        script = tmp_path / "fake_server.py"
+        script.write_text(FAKE_STDIO_SERVER)
+        manager = SystemMCPManager(enable_security=False, audit_log_file=str(tmp_path / "audit.log"))
+        success = await manager.register_server(
+            name="fake",
+            server_path=str(script),
+            transport=TransportMethod.STDIO,
+            **kwargs
+        )
+        assert success is True
+        return manager
+    
+    async def _wait_for(self, predicate, timeout=5.0):
+        deadline = asyncio.get_running_loop().time() + timeout
+        while not predicate():
+            assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+            await asyncio.sleep(0.05)
+    
+    @pytest.mark.asyncio
+    async def test_calls_are_spread_across_replicas(self, tmp_path):
+        manager = await self._register(tmp_path, replicas=2)
+        try:
+            stats = manager.get_replica_stats("fake")
+            assert len(stats) == 2
+            assert all(replica["alive"] for replica in stats)
+            
+            loop = asyncio.get_running_loop()
+            begin = loop.time()
+            results = await asyncio.gather(*(
+                manager.call_tool("fake", "slow_echo", {"delay": 0.3}) for _ in range(2)
+            ))
+            elapsed = loop.time() - begin
+            
+            pids = {result["content"][0]["text"] for result in results}
+            assert pids == {str(replica["pid"]) for replica in stats}
+            assert elapsed < 0.55
+        finally:
+            await manager.disconnect_all()
+    
+    @pytest.mark.asyncio
+    async def test_crashed_replica_is_respawned(self, tmp_path):
+        manager = await self._register(tmp_path, replicas=1)
+        server = manager.servers["fake"]
+        server.MIN_RESPAWN_INTERVAL = 0
+        try:
+            with pytest.raises(ConnectionError):
+                await manager.call_tool("fake", "slow_echo", {"crash": True})
+            
+            await self._wait_for(lambda: server.replicas[0].alive and server.replicas[0].restarts == 1)
+            
+            result = await manager.call_tool("fake", "slow_echo", {})
+            assert result["content"][0]["text"] == str(server.replicas[0].process.pid)
+        finally:
+            await manager.disconnect_all()
+    
+    @pytest.mark.asyncio
+    async def test_unresponsive_replica_is_replaced(self, tmp_path):
+        manager = await self._register(
+            tmp_path,
+            replicas=1,
+            health_check_interval=0.1,
+            health_check_timeout=0.2
+        )
+        server = manager.servers["fake"]
+        server.MIN_RESPAWN_INTERVAL = 0
+        try:
+            first_pid = server.replicas[0].process.pid
+            await manager.call_tool("fake", "slow_echo", {"hang": True})
+            
+            await self._wait_for(lambda: server.replicas[0].restarts == 1 and server.replicas[0].alive)
+            
+            assert server.replicas[0].process.pid != first_pid
+        finally:
+            await manager.disconnect_all()
+    
+    @pytest.mark.asyncio
+    async def test_disconnect_stops_all_replicas(self, tmp_path):
+        manager = await self._register(tmp_path, replicas=2)
+        processes = [replica.process for replica in manager.servers["fake"].replicas]
+        
+        await manager.disconnect_all()
+        
+        assert all(process.returncode is not None for process in processes)
+
+
+class TestAuditLogger:
+    """Tests for the batched, rotating audit writer"""
+    
+    def _entry(self, index=0, status="success"):
+        return AuditLogEntry(
+            timestamp=f"2025-01-01T00:00:{index:02d}",
+            server_name="browser",
+            tool_name="open_url",
+            permission_level="safe",
+            arguments={"url": "https://example.com", "api_key": "sk-1234567890"},
+            result_status=status,
+            result_message=""
+        )
+    
+    def _data_lines(self, path):
+        return [line for line in path.read_text().splitlines() if line and not line.startswith("#")]
+    
+    def test_entries_are_written_in_background_and_flushed(self, tmp_path):
+        log_file = tmp_path / "audit.log"
+        audit_logger = AuditLogger(log_file=str(log_file), flush_interval=5.0)
+        
+        for index in range(3):
+            audit_logger.log_call(self._entry(index))
+        audit_logger.flush()
+        
+        lines = self._data_lines(log_file)
+        assert len(lines) == 3
+        assert "sk-1234567890" not in log_file.read_text()
+        audit_logger.close()
+    
+    def test_close_flushes_and_stops_writer(self, tmp_path):
+        log_file = tmp_path / "audit.log"
+        audit_logger = AuditLogger(log_file=str(log_file), flush_interval=5.0)
+        
+        audit_logger.log_call(self._entry())
+        writer = audit_logger._writer
+        audit_logger.close()
+        
+        assert not writer.is_alive()
+        assert len(self._data_lines(log_file)) == 1
+        
+        audit_logger.log_call(self._entry(1))
+        audit_logger.close()
+        assert len(self._data_lines(log_file)) == 2
+    
+    def test_size_based_rotation_with_gzip(self, tmp_path):
+        log_file = tmp_path / "audit.log"
+        audit_logger = AuditLogger(
+            log_file=str(log_file),
+            max_bytes=200,
+            backup_count=2,
+            compress=True,
+            batch_size=1,
+            flush_interval=0
+        )
+        
+        for index in range(6):
+            audit_logger.log_call(self._entry(index))
+            audit_logger.flush()
+        audit_logger.close()
+        
+        assert (tmp_path / "audit.log.1.gz").exists()
+        assert (tmp_path / "audit.log.2.gz").exists()
+        assert not (tmp_path / "audit.log.3.gz").exists()
+        with gzip.open(tmp_path / "audit.log.1.gz", "rt") as f:
+            assert '"open_url"' in f.read()
+        assert log_file.read_text().startswith("# MCP Audit Log")
+    
+    def test_time_based_rotation(self, tmp_path):
+        log_file = tmp_path / "audit.log"
+        audit_logger = AuditLogger(log_file=str(log_file), rotate_interval=3600, flush_interval=0)
+        
+        audit_logger.log_call(self._entry(0))
+        audit_logger.flush()
+        audit_logger._segment_started -= 7200
+        audit_logger.log_call(self._entry(1))
+        audit_logger.close()
+        
+        assert len(self._data_lines(tmp_path / "audit.log.1")) == 1
+        assert len(self._data_lines(log_file)) == 1
+    
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_recent_logs_continue_into_rotated_segments(self, tmp_path, compress):
+        audit_logger = AuditLogger(
+            log_file=str(tmp_path / "audit.log"),
+            max_bytes=200,
+            backup_count=5,
+            compress=compress,
+            batch_size=1,
+            flush_interval=0
+        )
+        
+        for index in range(6):
+            audit_logger.log_call(self._entry(index, status="error" if index == 0 else "success"))
+            audit_logger.flush()
+        
+        recent = audit_logger.get_recent_logs(6)
+        failed = audit_logger.query_logs(status="error")
+        audit_logger.close()
+        
+        assert [entry.timestamp[-2:] for entry in recent] == ["05", "04", "03", "02", "01", "00"]
+        assert [entry.timestamp[-2:] for entry in failed] == ["00"]
+    
+    def test_recent_logs_include_queued_entries(self, tmp_path):
+        audit_logger = AuditLogger(log_file=str(tmp_path / "audit.log"), flush_interval=5.0)
+        
+        audit_logger.log_call(self._entry(0, status="denied"))
+        audit_logger.log_call(self._entry(1))
+        
+        logs = audit_logger.get_recent_logs(count=5)
+        
+        assert [log.result_status for log in logs] == ["success", "denied"]
+        audit_logger.close()
+    
+    @pytest.mark.asyncio
+    async def test_manager_exit_flushes_audit_log(self, tmp_path):
+        log_file = tmp_path / "audit.log"
+        audit_logger = AuditLogger(log_file=str(log_file), flush_interval=5.0)
+        
+        async with SystemMCPManager(enable_security=False, audit_logger=audit_logger) as manager:
+            manager.audit_logger.log_call(self._entry())
+        
+        assert len(self._data_lines(log_file)) == 1
+        assert audit_logger._writer is None
+
+
+class TestAuditQueries:
+    """Tests for tail reads and indexed audit queries"""
+    
+    def _log(self, audit_logger, count):
+        servers = ["browser", "file"]
+        statuses = ["success", "error", "denied"]
+        for index in range(count):
+            audit_logger.log_call(AuditLogEntry(
+                timestamp=f"2025-01-01T00:{index // 60:02d}:{index % 60:02d}",
+                server_name=servers[index % 2],
+                tool_name=f"tool_{index % 4}",
+                permission_level="safe",
+                arguments={"index": index},
+                result_status=statuses[index % 3],
+                result_message=""
+            ))
+        audit_logger.flush()
+    
+    def test_tail_read_spans_block_boundaries(self, tmp_path):
+        audit_logger = AuditLogger(log_file=str(tmp_path / "audit.log"))
+        audit_logger.TAIL_BLOCK_SIZE = 64
+        self._log(audit_logger, 50)
+        
+        logs = audit_logger.get_recent_logs(count=50)
+        
+        assert [log.arguments["index"] for log in logs] == list(range(49, -1, -1))
+        audit_logger.close()
+    
+    def test_tail_read_does_not_read_whole_file(self, tmp_path):
+        audit_logger = AuditLogger(log_file=str(tmp_path / "audit.log"))
+        self._log(audit_logger, 2000)
+        
+        with patch.object(AuditLogger, '_parse_line', wraps=AuditLogger._parse_line) as parse:
+            logs = audit_logger.get_recent_logs(count=5)
+        
+        assert [log.arguments["index"] for log in logs] == [1999, 1998, 1997, 1996, 1995]
+        assert parse.call_count < 1000
+        audit_logger.close()
+    
+    @pytest.mark.parametrize("use_index", [False, True])
+    def test_filtered_paginated_queries(self, tmp_path, use_index):
+        audit_logger = AuditLogger(
+            log_file=str(tmp_path / "audit.log"),
+            index_path=str(tmp_path / "audit.db") if use_index else None
+        )
+        self._log(audit_logger, 120)
+        
+        page1 = audit_logger.query_logs(server_name="file", status="error", limit=5)
+        page2 = audit_logger.query_logs(server_name="file", status="error", limit=5, offset=5)
+        
+        expected = [i for i in range(119, -1, -1) if i % 2 == 1 and i % 3 == 1]
+        assert [log.arguments["index"] for log in page1] == expected[:5]
+        assert [log.arguments["index"] for log in page2] == expected[5:10]
+        
+        window = audit_logger.query_logs(
+            tool_name="tool_0",
+            since="2025-01-01T00:00:10",
+            until="2025-01-01T00:00:30",
+            limit=100
+        )
+        assert [log.arguments["index"] for log in window] == [28, 24, 20, 16, 12]
+        audit_logger.close()
+    
+    def test_index_covers_rotated_segments(self, tmp_path):
+        audit_logger = AuditLogger(
+            log_file=str(tmp_path / "audit.log"),
+            max_bytes=2000,
+            backup_count=1,
+            index_path=str(tmp_path / "audit.db"),
+            batch_size=10
+        )
+        self._log(audit_logger, 100)
+        
+        logs = audit_logger.query_logs(limit=200)
+        
+        assert len(logs) == 100
+        assert (tmp_path / "audit.log.1").exists()
+        audit_logger.close()
+    
+    def test_new_index_imports_existing_log(self, tmp_path):
+        log_file = str(tmp_path / "audit.log")
+        plain = AuditLogger(log_file=log_file)
+        self._log(plain, 10)
+        plain.close()
+        
+        indexed = AuditLogger(log_file=log_file, index_path=str(tmp_path / "audit.db"))
+        
+        assert len(indexed.query_logs(limit=100)) == 10
+        indexed.close()
+    
+    def test_manager_get_audit_logs_filters(self, tmp_path):
+        audit_logger = AuditLogger(log_file=str(tmp_path / "audit.log"), index_path=str(tmp_path / "audit.db"))
+        manager = SystemMCPManager(enable_security=False, audit_logger=audit_logger)
+        self._log(audit_logger, 12)
+        
+        logs = manager.get_audit_logs(count=2, server_name="browser", status="success", offset=1)
+        
+        assert [log.arguments["index"] for log in logs] == [0]
+        audit_logger.close()
+
+
+class TestSanitization:
+    """Tests for log sanitization and permission inference"""
+    
+    def test_sanitize_masks_nested_keys_case_insensitively(self):
+        data = {
+            "Authorization": "Bearer abcdefghijkl",
+            "params": {"arguments": {"API_KEY": "short", "city": "北京"}},
+            "items": [{"refreshToken": 123}]
+        }
+        
+        result = _sanitize_sensitive_data(data)
+        
+        assert result["Authorization"] == "Bear...ijkl"
+        assert result["params"]["arguments"] == {"API_KEY": "***", "city": "北京"}
+        assert result["items"] == [{"refreshToken": "***"}]
+        assert data["params"]["arguments"]["API_KEY"] == "short"
+    
+    def test_sanitize_custom_keys(self):
+        data = {"pin": "1234", "token": "abc", 1: "numeric key"}
+        
+        assert _sanitize_sensitive_data(data, ["PIN"]) == {"pin": "***", "token": "abc", 1: "numeric key"}
+        assert _sanitize_sensitive_data(data, []) == data
+    
+    def test_sanitized_log_argument_is_lazy(self):
+        with patch('ai_navigator.system_mcp_manager._sanitize_sensitive_data') as sanitize:
+            logging.getLogger("test.sanitize").debug("payload: %s", _Sanitized({"token": "x"}))
+        
+        sanitize.assert_not_called()
+        assert str(_Sanitized({"token": "abcdefghij"})) == "{'token': 'abcd...ghij'}"
+    
+    def test_infer_permission_level_priority(self):
+        assert _infer_permission_level("format_and_list_disk") == PermissionLevel.CRITICAL
+        assert _infer_permission_level("Delete_File") == PermissionLevel.DANGEROUS
+        assert _infer_permission_level("read_file") == PermissionLevel.SAFE
+        assert _infer_permission_level("move_file") == PermissionLevel.NORMAL
+
+
+class TestBatchToolPermissions:
+    """Tests for checking batch tools at their most dangerous operation's level"""
+    
+    def _manager(self, tmp_path):
+        manager = SystemMCPManager(enable_security=True, audit_log_file=str(tmp_path / "audit.log"))
+        server = MCPServerConnection("files", "files.py", TransportMethod.STDIO)
+        server.connected = True
+        for name in ("batch_operations", "write_file", "delete_file"):
+            server.tools_metadata[name] = ToolMetadata(
+                name=name,
+                server_name="files",
+                description="",
+                permission_level=server._infer_permission_level(name),
+                requires_confirmation=server._infer_permission_level(name) == PermissionLevel.DANGEROUS
+            )
+        server.call_tool = AsyncMock(return_value={"content": []})
+        manager.servers["files"] = server
+        return manager, server
+    
+    @pytest.mark.asyncio
+    async def test_batch_with_delete_requires_one_confirmation(self, tmp_path):
+        manager, server = self._manager(tmp_path)
+        arguments = {"operations": [
+            {"op": "write_file", "path": "a", "content": ""},
+            {"op": "delete_file", "path": "b"},
+            {"op": "delete_file", "path": "c"},
+        ]}
+        
+        with patch.object(manager.security_validator, "request_confirmation", return_value=False) as confirm:
+            with pytest.raises(PermissionError):
+                await manager.call_tool("files", "batch_operations", arguments)
+        
+        confirm.assert_called_once()
+        assert confirm.call_args.args[0].permission_level == PermissionLevel.DANGEROUS
+        server.call_tool.assert_not_called()
+        manager.audit_logger.close()
+    
+    @pytest.mark.asyncio
+    async def test_batch_of_normal_operations_runs_without_confirmation(self, tmp_path):
+        manager, server = self._manager(tmp_path)
+        
+        with patch.object(manager.security_validator, "request_confirmation") as confirm:
+            await manager.call_tool("files", "batch_operations", {"operations": [{"op": "write_file"}]})
+        
+        confirm.assert_not_called()
+        server.call_tool.assert_called_once()
+        assert server.tools_metadata["batch_operations"].permission_level == PermissionLevel.NORMAL
+        manager.audit_logger.close()